@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BuzzConfig(AppConfig):
     name = 'buzz'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,254 @@
+import json
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from .models import Attendance
+from .serializers import serialize_attendance
+from .utils.attendance_upsert import aupsert_attendance
+from .utils.branch_index import aget_branch_index
+from .utils.timer_events import iter_timer_events
+from .utils.today_state import aload_today_state, get_today_payload
+
+
+# =====================================================
+# ASYNC PUNCH PATH (served by asgi.py)
+# =====================================================
+# Same behaviour and payloads as PunchInView / PunchOutView /
+# TodayAttendanceView, written as plain async Django views (DRF's APIView
+# has no async support) on top of the async ORM. The JWT is verified
+# from its claims only, like the polling views, so auth costs no query.
+
+
+jwt_authentication = JWTStatelessUserAuthentication()
+
+
+def api_response(data, status=200):
+    # DRF's encoder, so datetimes render exactly as on the sync views
+    return JsonResponse(data, status=status, encoder=JSONEncoder)
+
+
+def authenticate(request):
+    """
+    Returns (user_id, None) or (None, 401 response)
+    """
+    try:
+        result = jwt_authentication.authenticate(request)
+    except AuthenticationFailed as e:
+        # same body DRF would send for the exception
+        detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+        return None, api_response(detail, status=401)
+
+    if result is None:
+        return None, api_response(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    user, _ = result
+    return int(user.id), None
+
+
+def get_coordinates(request):
+    """
+    (lat, lon) from a JSON or form body, None if missing / invalid
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    else:
+        data = request.POST
+
+    try:
+        return float(data["latitude"]), float(data["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@csrf_exempt
+@require_POST
+async def punch_in(request):
+    user_id, error = authenticate(request)
+    if error:
+        return error
+
+    # 0️⃣ Validate input
+    coordinates = get_coordinates(request)
+    if coordinates is None:
+        return api_response(
+            {"status": "failed", "message": "latitude & longitude are required"},
+            status=400
+        )
+
+    user_lat, user_lon = coordinates
+
+    # 1️⃣ Check for today's attendance (unique user + date row)
+    attendance = await Attendance.objects.filter(
+        user_id=user_id,
+        date=timezone.localdate()
+    ).afirst()
+
+    # 2️⃣ Find the branch whose geofence contains the user
+    branch_index = await aget_branch_index()
+    nearest_branch, nearest_distance = branch_index.locate(user_lat, user_lon)
+
+    # 2.1️⃣ Check if user is in range
+    if nearest_branch is None:
+        nearest_branch, nearest_distance = branch_index.nearest(user_lat, user_lon)
+        return api_response({
+            "status": "failed",
+            "message": "You are out of range",
+            "nearest_branch": nearest_branch.name if nearest_branch else None,
+            "distance": round(nearest_distance, 2) if nearest_branch else None
+        }, status=400)
+
+    # 3️⃣ Handle punch-in logic
+    if attendance and attendance.punch_in_time:
+        if attendance.punch_out_time is None:
+            # Already punched in
+            return api_response({
+                "status": "failed",
+                "message": "You are already punched in today",
+                "data": serialize_attendance(attendance)
+            }, status=400)
+
+        # Punched out before, update with new punch-in
+        attendance.punch_in_time = timezone.now()
+        attendance.punch_in_lat = user_lat
+        attendance.punch_in_lon = user_lon
+        attendance.punch_out_time = None  # reset punch out
+        attendance.punch_out_lat = None
+        attendance.punch_out_lon = None
+        await aupsert_attendance(attendance)
+        message = "Punch in updated successfully"
+    elif attendance:
+        # Row exists for today without a punch (e.g. leave / absent marker)
+        attendance.punch_in_time = timezone.now()
+        attendance.punch_in_lat = user_lat
+        attendance.punch_in_lon = user_lon
+        attendance.branch_name = nearest_branch.name
+        attendance.work_status = "WFO"
+        await aupsert_attendance(attendance)
+        message = "Punch in successful"
+    else:
+        # No attendance today: insert, or take over a row a parallel
+        # tap just created (single-statement upsert, no duplicate key)
+        attendance = await aupsert_attendance(Attendance(
+            user_id=user_id,
+            date=timezone.localdate(),
+            punch_in_time=timezone.now(),
+            punch_in_lat=user_lat,
+            punch_in_lon=user_lon,
+            branch_name=nearest_branch.name,
+            work_status="WFO"
+        ))
+        message = "Punch in successful"
+
+    return api_response({
+        "status": "success",
+        "message": message + f" at {nearest_branch.name}",
+        "branch": nearest_branch.name,
+        "distance": round(nearest_distance, 2),
+        "data": serialize_attendance(attendance)
+    }, status=201)
+
+
+@csrf_exempt
+@require_POST
+async def punch_out(request):
+    user_id, error = authenticate(request)
+    if error:
+        return error
+
+    # 1️⃣ Validate inputs
+    coordinates = get_coordinates(request)
+    if coordinates is None:
+        return api_response(
+            {"status": "failed", "message": "latitude & longitude are required"},
+            status=400
+        )
+
+    user_lat, user_lon = coordinates
+
+    # 2️⃣ Find today’s active punch-in
+    attendance = await Attendance.objects.filter(
+        user_id=user_id,
+        date=timezone.localdate()
+    ).afirst()
+
+    if (
+        not attendance
+        or attendance.punch_in_time is None
+        or attendance.punch_out_time is not None
+    ):
+        return api_response({
+            "status": "failed",
+            "message": "You have not punched in today"
+        }, status=400)
+
+    # 3️⃣ Find the branch whose geofence contains the user
+    branch_index = await aget_branch_index()
+    nearest_branch, distance = branch_index.locate(user_lat, user_lon)
+
+    # Range check
+    if nearest_branch is None:
+        nearest_branch, distance = branch_index.nearest(user_lat, user_lon)
+        return api_response({
+            "status": "failed",
+            "message": f"You are out of range for {nearest_branch.name if nearest_branch else 'any branch'}",
+            "distance": round(distance, 2) if nearest_branch else None,
+            "branch": nearest_branch.name if nearest_branch else None
+        }, status=400)
+
+    # 4️⃣ Save punch-out
+    attendance.punch_out_time = timezone.now()
+    attendance.punch_out_lat = user_lat
+    attendance.punch_out_lon = user_lon
+    await attendance.asave()
+
+    return api_response({
+        "status": "success",
+        "message": "Punch out successful",
+        "branch": nearest_branch.name,
+        "distance": round(distance, 2),
+        "data": serialize_attendance(attendance)
+    }, status=200)
+
+
+@require_GET
+async def today_attendance(request):
+    user_id, error = authenticate(request)
+    if error:
+        return error
+
+    state = await aload_today_state(user_id, timezone.localdate())
+
+    return api_response({
+        "status": "success",
+        "data": get_today_payload(state)
+    }, status=200)
+
+
+@require_GET
+async def timer_stream(request):
+    """
+    text/event-stream of timer updates, pushed only when today's state
+    changes (punch in / out, WFH or correction approval). Async view over
+    an async generator: serve it from asgi.py, under WSGI the stream is
+    not sent until it ends.
+    """
+    user_id, error = authenticate(request)
+    if error:
+        return error
+
+    response = StreamingHttpResponse(
+        iter_timer_events(user_id, last_event_id=request.headers.get("Last-Event-ID")),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # nginx: do not buffer events
+    return response
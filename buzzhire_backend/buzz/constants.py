@@ -4,6 +4,8 @@
 
 
 
+# Initial branches only (seeded by migration 0011); live geofences are
+# buzz.models.Branch rows
 BRANCHES = [
     {
         "name": "Delhi",
@@ -17,4 +19,4 @@ BRANCHES = [
     },
 ]
 
-PUNCH_RADIUS = 300  # meters
+PUNCH_RADIUS = 300  # meters, default Branch.radius_m
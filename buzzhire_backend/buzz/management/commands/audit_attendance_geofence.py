@@ -0,0 +1,119 @@
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from buzz.models import Attendance, AttendanceGeoAudit, Branch
+from buzz.utils.conflict_target import get_conflict_target
+from buzz.utils.distance_utils import calculate_distances, nearest_branches
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-audit historical punch coordinates against active branch "
+        "geofences and write AttendanceGeoAudit flags in bulk"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--start-date", help="YYYY-MM-DD (inclusive)")
+        parser.add_argument("--end-date", help="YYYY-MM-DD (inclusive)")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size must be positive")
+
+        branches = list(
+            Branch.objects
+            .filter(is_active=True)
+            .order_by("id")
+            .values_list("name", "latitude", "longitude", "radius_m")
+        )
+        if not branches:
+            raise CommandError("No active branches to audit against")
+
+        branch_names = [name for name, _, _, _ in branches]
+        branch_lats = np.array([lat for _, lat, _, _ in branches])
+        branch_lons = np.array([lon for _, _, lon, _ in branches])
+        branch_radii = np.array([radius for _, _, _, radius in branches], dtype=float)
+
+        attendance_qs = Attendance.objects.filter(
+            Q(punch_in_lat__isnull=False) | Q(punch_out_lat__isnull=False)
+        )
+
+        for option, lookup in (("start_date", "date__gte"), ("end_date", "date__lte")):
+            if options[option]:
+                value = parse_date(options[option])
+                if not value:
+                    raise CommandError(f"Invalid --{option.replace('_', '-')}")
+                attendance_qs = attendance_qs.filter(**{lookup: value})
+
+        attendance_qs = attendance_qs.order_by("id").values_list(
+            "id", "punch_in_lat", "punch_in_lon", "punch_out_lat", "punch_out_lon"
+        )
+
+        audited = 0
+        flagged = 0
+        last_id = 0
+
+        # keyset chunks: constant memory however many rows are audited
+        while True:
+            rows = list(attendance_qs.filter(id__gt=last_id)[:chunk_size])
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+            columns = np.array(
+                [row[1:] for row in rows], dtype=float
+            )
+
+            results = []
+            for lat_col, lon_col in ((0, 1), (2, 3)):
+                distances = calculate_distances(
+                    columns[:, lat_col], columns[:, lon_col], branch_lats, branch_lons
+                )
+                branch_index, nearest_distance = nearest_branches(distances)
+
+                has_location = ~np.isnan(columns[:, lat_col])
+                inside_any = (distances <= branch_radii).any(axis=1)
+
+                results.append((branch_index, nearest_distance, has_location & ~inside_any))
+
+            (in_index, in_distance, in_outside), (out_index, out_distance, out_outside) = results
+            is_flagged = in_outside | out_outside
+            audited_at = timezone.now()
+
+            audits = []
+            for i, row in enumerate(rows):
+                audits.append(AttendanceGeoAudit(
+                    attendance_id=row[0],
+                    punch_in_branch=branch_names[in_index[i]] if in_index[i] >= 0 else None,
+                    punch_in_distance=None if np.isnan(in_distance[i]) else round(float(in_distance[i]), 2),
+                    punch_out_branch=branch_names[out_index[i]] if out_index[i] >= 0 else None,
+                    punch_out_distance=None if np.isnan(out_distance[i]) else round(float(out_distance[i]), 2),
+                    is_flagged=bool(is_flagged[i]),
+                    audited_at=audited_at,
+                ))
+
+            AttendanceGeoAudit.objects.bulk_create(
+                audits,
+                update_conflicts=True,
+                unique_fields=get_conflict_target(["attendance"]),
+                update_fields=[
+                    "punch_in_branch",
+                    "punch_in_distance",
+                    "punch_out_branch",
+                    "punch_out_distance",
+                    "is_flagged",
+                    "audited_at",
+                ],
+            )
+
+            audited += len(rows)
+            flagged += int(is_flagged.sum())
+            self.stdout.write(f"audited {audited} rows (up to attendance #{last_id})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Geofence audit done: {audited} rows audited, {flagged} flagged"
+        ))
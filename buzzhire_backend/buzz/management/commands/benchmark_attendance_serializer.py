@@ -0,0 +1,64 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from buzz.models import Attendance
+from buzz.serializers import ATTENDANCE_FAST_VALUES, AttendanceSerializer, serialize_attendance, serialize_attendance_row
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-call cost of AttendanceSerializer vs the fast path "
+        "(serialize_attendance / serialize_attendance_row) on stored "
+        "Attendance rows, and a byte-for-byte check of their JSON. "
+        "Read-only; timings depend on the machine, so nothing is asserted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="latest attendance rows to serialize")
+        parser.add_argument("--rounds", type=int, default=20, help="passes over those rows per serializer")
+
+    def handle(self, *args, **options):
+        if options["rows"] <= 0 or options["rounds"] <= 0:
+            raise CommandError("--rows and --rounds must be positive")
+
+        ids = list(Attendance.objects.order_by("-id").values_list("id", flat=True)[:options["rows"]])
+        if not ids:
+            raise CommandError("No attendance rows to benchmark")
+
+        instances = list(Attendance.objects.filter(id__in=ids).order_by("id"))
+        rows = list(Attendance.objects.filter(id__in=ids).order_by("id").values(*ATTENDANCE_FAST_VALUES))
+
+        # 1️⃣ Same bytes as the DRF serializer
+        renderer = JSONRenderer()
+        mismatches = sum(
+            1 for instance, row in zip(instances, rows)
+            if len({
+                renderer.render(AttendanceSerializer(instance).data),
+                renderer.render(serialize_attendance(instance)),
+                renderer.render(serialize_attendance_row(row)),
+            }) != 1
+        )
+
+        # 2️⃣ Per-call cost
+        results = [
+            ("AttendanceSerializer", instances, lambda instance: AttendanceSerializer(instance).data),
+            ("serialize_attendance", instances, serialize_attendance),
+            ("serialize_attendance_row", rows, serialize_attendance_row),
+        ]
+
+        baseline = None
+        for name, items, serialize in results:
+            per_call_us = self.time_per_call(serialize, items, options["rounds"])
+            baseline = baseline or per_call_us
+            self.stdout.write(f"{name:<26} {per_call_us:9.1f} us/call  {baseline / per_call_us:5.1f}x")
+
+        self.stdout.write(f"{len(instances)} rows, {mismatches} JSON mismatches")
+        if mismatches:
+            raise CommandError("Fast path output differs from AttendanceSerializer")
+
+    def time_per_call(self, serialize, items, rounds):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for item in items:
+                serialize(item)
+        return (time.perf_counter() - started) / (rounds * len(items)) * 1e6
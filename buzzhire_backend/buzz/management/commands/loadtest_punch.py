@@ -0,0 +1,156 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from buzz.models import Attendance, Branch, User
+
+
+LOADTEST_EMAIL = "{prefix}{index}@loadtest.buzzhire.local"
+
+
+def percentile(sorted_values, pct):
+    # nearest-rank percentile
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire N concurrent punch-ins at one or more running deployments and "
+        "compare p50 / p99 latency, e.g.\n"
+        "  gunicorn buzzhire_backend.wsgi -w 4 -b 127.0.0.1:8000\n"
+        "  uvicorn buzzhire_backend.asgi:application --workers 4 --port 8001\n"
+        "  manage.py loadtest_punch -c 200 "
+        "--target wsgi=http://127.0.0.1:8000/punch-in/ "
+        "--target asgi=http://127.0.0.1:8001/async/punch-in/\n"
+        "The servers must use the same (local) database as this command: "
+        "it creates the load-test users and clears their attendance for "
+        "today before every round."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", action="append", required=True,
+            help="NAME=URL of a punch-in endpoint; repeat to compare deployments"
+        )
+        parser.add_argument("-c", "--concurrency", type=int, default=50, help="simultaneous punch-ins (one per user)")
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--timeout", type=float, default=30, help="per request, seconds")
+        parser.add_argument("--prefix", default="loadtest", help="load-test user email prefix")
+        parser.add_argument("--cleanup", action="store_true", help="delete the load-test users afterwards")
+        parser.add_argument("--force", action="store_true", help="allow running with DEBUG=False")
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError("Refusing to create load-test users with DEBUG=False (use --force)")
+
+        concurrency = options["concurrency"]
+        if concurrency <= 0 or options["rounds"] <= 0:
+            raise CommandError("--concurrency and --rounds must be positive")
+
+        targets = []
+        for target in options["target"]:
+            name, sep, url = target.partition("=")
+            if not sep or not url:
+                raise CommandError(f"--target must be NAME=URL, got {target!r}")
+            targets.append((name, url))
+
+        branch = Branch.objects.filter(is_active=True).order_by("id").first()
+        if branch is None:
+            raise CommandError("No active branch to punch in at")
+
+        users = self.get_users(options["prefix"], concurrency)
+        headers = [
+            {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+            for user in users
+        ]
+        body = {"latitude": branch.latitude, "longitude": branch.longitude}
+
+        results = []
+        for name, url in targets:
+            latencies = []
+            failures = 0
+            elapsed = 0.0
+
+            for _ in range(options["rounds"]):
+                # every user punches in fresh each round
+                Attendance.objects.filter(user__in=users, date=timezone.localdate()).delete()
+
+                round_latencies, round_failures, round_elapsed = self.run_round(
+                    url, headers, body, options["timeout"]
+                )
+                latencies.extend(round_latencies)
+                failures += round_failures
+                elapsed += round_elapsed
+
+            latencies.sort()
+            results.append((name, latencies, failures, elapsed))
+
+        Attendance.objects.filter(user__in=users, date=timezone.localdate()).delete()
+        if options["cleanup"]:
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.report(results, concurrency, options["rounds"])
+
+    def get_users(self, prefix, count):
+        emails = [LOADTEST_EMAIL.format(prefix=prefix, index=i) for i in range(count)]
+        existing = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+
+        User.objects.bulk_create([
+            User(email=email, username=email, name=email.split("@")[0], password=make_password(None))
+            for email in emails
+            if email not in existing
+        ])
+
+        return list(User.objects.filter(email__in=emails).order_by("id"))
+
+    def run_round(self, url, headers, body, timeout):
+        """
+        All requests wait on a barrier and start together, like the 9:30
+        rush. Returns (latencies of 2xx responses in ms, failures, wall time)
+        """
+        barrier = threading.Barrier(len(headers))
+
+        def punch(user_headers):
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                response = requests.post(url, json=body, headers=user_headers, timeout=timeout)
+                ok = 200 <= response.status_code < 300
+            except requests.RequestException:
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(headers)) as pool:
+            outcomes = list(pool.map(punch, headers))
+        elapsed = time.perf_counter() - started
+
+        latencies = [latency for ok, latency in outcomes if ok]
+        return latencies, len(outcomes) - len(latencies), elapsed
+
+    def report(self, results, concurrency, rounds):
+        self.stdout.write(f"{concurrency} concurrent punch-ins x {rounds} rounds")
+        self.stdout.write(
+            f"{'target':<12}{'ok':>7}{'failed':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'req/s':>9}"
+        )
+
+        for name, latencies, failures, elapsed in results:
+            def fmt(value):
+                return f"{value:.1f}" if value is not None else "-"
+
+            self.stdout.write(
+                f"{name:<12}{len(latencies):>7}{failures:>8}"
+                f"{fmt(percentile(latencies, 50)):>10}"
+                f"{fmt(percentile(latencies, 99)):>10}"
+                f"{fmt(latencies[-1] if latencies else None):>10}"
+                f"{(len(latencies) + failures) / elapsed if elapsed else 0:>9.1f}"
+            )
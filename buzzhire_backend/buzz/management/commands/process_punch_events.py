@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from buzz.utils.punch_events import process_pending_punch_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold pending PunchEvents into Attendance with bulk upserts. "
+        "Run a single instance (events of one user must be applied in order); "
+        "use --loop to keep it running next to the web workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--loop", action="store_true", help="keep polling for new events")
+        parser.add_argument("--sleep", type=float, default=0.5, help="seconds between polls when idle (--loop)")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size <= 0:
+            raise CommandError("--batch-size must be positive")
+
+        while True:
+            fetched, applied, rejected = process_pending_punch_events(batch_size)
+
+            if fetched:
+                self.stdout.write(f"{fetched} events: {applied} applied, {rejected} rejected")
+
+            # a full batch means more are probably waiting
+            if fetched == batch_size:
+                continue
+
+            if not options["loop"]:
+                break
+
+            time.sleep(options["sleep"])
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils.dateparse import parse_date
+from buzz.models import Attendance, DailyAttendanceSummary
+from buzz.utils.daily_summary import ATTENDANCE_SUMMARY_COLUMNS, save_summaries, summarize_attendance_rows
+from buzz.utils.monthly_summary import get_month_start, refresh_months
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild DailyAttendanceSummary from Attendance (backfill after "
+        "migrate, or repair after raw data fixes). Walks Attendance by id "
+        "in chunks, upserts the rollup rows, deletes rollup rows whose "
+        "attendance no longer exists and re-aggregates the monthly rollup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start-date", help="YYYY-MM-DD, inclusive")
+        parser.add_argument("--end-date", help="YYYY-MM-DD, inclusive")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        start_date = self.get_date(options["start_date"], "--start-date")
+        end_date = self.get_date(options["end_date"], "--end-date")
+        chunk_size = options["chunk_size"]
+
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size must be positive")
+        if start_date and end_date and start_date > end_date:
+            raise CommandError("--start-date must be on or before --end-date")
+
+        attendances = Attendance.objects.filter(date__isnull=False)
+        summaries = DailyAttendanceSummary.objects.all()
+        if start_date:
+            attendances = attendances.filter(date__gte=start_date)
+            summaries = summaries.filter(date__gte=start_date)
+        if end_date:
+            attendances = attendances.filter(date__lte=end_date)
+            summaries = summaries.filter(date__lte=end_date)
+
+        # 1️⃣ Upsert rollup rows, keyset over Attendance.id
+        rebuilt = 0
+        last_id = 0
+        months = set()
+        while True:
+            rows = list(
+                attendances
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", *ATTENDANCE_SUMMARY_COLUMNS)[:chunk_size]
+            )
+            if not rows:
+                break
+
+            last_id = rows[-1][0]
+            months.update(get_month_start(row[2]) for row in rows)
+            with transaction.atomic():
+                save_summaries(summarize_attendance_rows(row[1:] for row in rows))
+            rebuilt += len(rows)
+
+        # 2️⃣ Drop rollup rows without attendance
+        orphans = summaries.filter(
+            ~Exists(Attendance.objects.filter(user_id=OuterRef("user_id"), date=OuterRef("date")))
+        )
+        months.update(
+            get_month_start(day)
+            for day in orphans.order_by().values_list("date", flat=True).distinct()
+        )
+        deleted, _ = orphans.delete()
+
+        # 3️⃣ Re-aggregate the monthly rollup of every touched month
+        monthly = refresh_months(months)
+
+        self.stdout.write(
+            f"{rebuilt} daily summaries rebuilt, {deleted} orphans deleted, "
+            f"{monthly} monthly summaries refreshed"
+        )
+
+    def get_date(self, value, option):
+        if value is None:
+            return None
+
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f"{option} must be YYYY-MM-DD")
+        return parsed
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from buzz.utils.monthly_summary import get_month_start, parse_month, refresh_months
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-aggregate MonthlyAttendanceSummary for whole months. Absent days "
+        "of the running month are counted up to the day of the last refresh, "
+        "so run this once a day (e.g. cron at 00:05) without --month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month", action="append",
+            help="YYYY-MM; repeat for several months (default: the running month)"
+        )
+
+    def handle(self, *args, **options):
+        months = []
+        for value in options["month"] or []:
+            month = parse_month(value)
+            if month is None:
+                raise CommandError(f"--month must be YYYY-MM, got {value!r}")
+            months.append(month)
+
+        if not months:
+            months = [get_month_start(timezone.localdate())]
+
+        refreshed = refresh_months(months)
+        self.stdout.write(f"{refreshed} monthly summaries refreshed")
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0009_companyworkingrules_companyholiday_holidayoverride'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['user', 'punch_in_time', 'punch_out_time'], name='attendance_user_punch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancecorrectionrequest',
+            index=models.Index(fields=['status', 'created_at'], name='correction_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'created_at'], name='leave_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wfhrequest',
+            index=models.Index(fields=['status', 'created_at'], name='wfh_status_created_idx'),
+        ),
+    ]
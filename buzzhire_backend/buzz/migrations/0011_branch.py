@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-17 10:40
+
+from django.db import migrations, models
+
+
+# branches that used to live in buzz/constants.py (BRANCHES / PUNCH_RADIUS)
+INITIAL_BRANCHES = [
+    {"name": "Delhi", "latitude": 28.519255, "longitude": 77.201274, "radius_m": 300},
+    {"name": "Noida", "latitude": 28.6068310, "longitude": 77.432003, "radius_m": 300},
+]
+
+
+def seed_branches(apps, schema_editor):
+    Branch = apps.get_model("buzz", "Branch")
+    for branch in INITIAL_BRANCHES:
+        Branch.objects.get_or_create(name=branch["name"], defaults=branch)
+
+
+def unseed_branches(apps, schema_editor):
+    Branch = apps.get_model("buzz", "Branch")
+    Branch.objects.filter(name__in=[b["name"] for b in INITIAL_BRANCHES]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0010_attendance_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Branch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('radius_m', models.PositiveIntegerField(default=300)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(seed_branches, unseed_branches),
+    ]
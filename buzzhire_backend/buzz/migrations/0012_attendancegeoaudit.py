@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-17 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0011_branch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceGeoAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('punch_in_branch', models.CharField(blank=True, max_length=100, null=True)),
+                ('punch_in_distance', models.FloatField(blank=True, null=True)),
+                ('punch_out_branch', models.CharField(blank=True, max_length=100, null=True)),
+                ('punch_out_distance', models.FloatField(blank=True, null=True)),
+                ('is_flagged', models.BooleanField(default=False)),
+                ('audited_at', models.DateTimeField()),
+                ('attendance', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='geo_audit', to='buzz.attendance')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_flagged', 'audited_at'], name='geo_audit_flagged_idx')],
+            },
+        ),
+    ]
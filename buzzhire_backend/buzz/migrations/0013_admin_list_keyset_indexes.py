@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0012_attendancegeoaudit'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancecorrectionrequest',
+            index=models.Index(fields=['created_at', 'id'], name='correction_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['created_at', 'id'], name='leave_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wfhrequest',
+            index=models.Index(fields=['created_at', 'id'], name='wfh_created_id_idx'),
+        ),
+    ]
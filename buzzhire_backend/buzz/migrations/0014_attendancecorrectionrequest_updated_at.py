@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 12:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0013_admin_list_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendancecorrectionrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-17 14:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0015_punchevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('punch_in_time', models.TimeField(blank=True, null=True)),
+                ('punch_out_time', models.TimeField(blank=True, null=True)),
+                ('worked_seconds', models.IntegerField(blank=True, null=True)),
+                ('expected_seconds', models.IntegerField(default=0)),
+                ('work_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('branch_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'user'], name='daily_summary_date_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='daily_summary_user_date_uniq')],
+            },
+        ),
+    ]
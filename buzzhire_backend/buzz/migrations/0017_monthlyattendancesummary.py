@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 01:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0016_dailyattendancesummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('worked_seconds', models.BigIntegerField(default=0)),
+                ('expected_seconds', models.BigIntegerField(default=0)),
+                ('present_days', models.IntegerField(default=0)),
+                ('leave_days', models.IntegerField(default=0)),
+                ('wfh_days', models.IntegerField(default=0)),
+                ('absent_days', models.IntegerField(default=0)),
+                ('as_of', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['month', 'user'], name='monthly_summary_month_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='monthly_summary_user_month_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0017_monthlyattendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wfhrequest',
+            name='batch_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 01:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0018_wfhrequest_batch_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['user', 'status', 'start_date', 'end_date'], name='leave_user_status_range_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-17 18:10
+
+from io import StringIO
+from django.core.management import call_command
+from django.db import migrations
+
+
+def backfill_summaries(apps, schema_editor):
+    # reports read only the rollups (0016 / 0017): fill them from the
+    # attendance already stored, same code path as the repair command
+    Attendance = apps.get_model("buzz", "Attendance")
+    if not Attendance.objects.exists():
+        return
+
+    call_command("rebuild_daily_summaries", stdout=StringIO())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0019_leave_user_status_range_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 18:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buzz', '0020_backfill_attendance_summaries'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendance',
+            name='attendance_user_punch_idx',
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from .managers import UserManager
+from .constants import PUNCH_RADIUS
 import uuid
 
 class User(AbstractBaseUser, PermissionsMixin): # <-- Inherit from AbstractBaseUser and PermissionsMixin
@@ -36,6 +37,28 @@ class User(AbstractBaseUser, PermissionsMixin): # <-- Inherit from AbstractBaseU
     def __str__(self):
         return self.username or self.email
 
+# ===========================
+# BRANCH MODEL
+# ===========================
+
+class Branch(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    # geofence radius for punch in / punch out
+    radius_m = models.PositiveIntegerField(default=PUNCH_RADIUS)
+
+    is_active = models.BooleanField(default=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.radius_m} m)"
+
+
 # ===========================
 # ATTENDANCE MODEL
 # ===========================
@@ -72,6 +95,7 @@ class Attendance(models.Model):
     work_status = models.CharField(max_length=20, choices=WORK_STATUS_CHOICES, null=True, blank=True)
 
     class Meta:
+        # punch / today lookups go through this unique (user, date) index
         unique_together = ("user", "date")
 
 
@@ -79,6 +103,167 @@ class Attendance(models.Model):
         return f"{self.user.email} | {self.punch_in_time}"
 
 
+class AttendanceGeoAudit(models.Model):
+    """
+    Result of the bulk geofence re-audit (manage.py audit_attendance_geofence)
+    """
+
+    attendance = models.OneToOneField(
+        Attendance,
+        on_delete=models.CASCADE,
+        related_name="geo_audit"
+    )
+
+    punch_in_branch = models.CharField(max_length=100, null=True, blank=True)
+    punch_in_distance = models.FloatField(null=True, blank=True)
+
+    punch_out_branch = models.CharField(max_length=100, null=True, blank=True)
+    punch_out_distance = models.FloatField(null=True, blank=True)
+
+    # a punch location outside every active branch geofence
+    is_flagged = models.BooleanField(default=False)
+
+    audited_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_flagged", "audited_at"], name="geo_audit_flagged_idx"),
+        ]
+
+    def __str__(self):
+        return f"Attendance {self.attendance_id} | flagged: {self.is_flagged}"
+
+
+class DailyAttendanceSummary(models.Model):
+    """
+    One row per (user, date) Attendance row, kept in step with it by
+    buzz/utils/daily_summary.py; reports read this instead of raw punches.
+    manage.py rebuild_daily_summaries backfills / repairs it.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="daily_summaries")
+    date = models.DateField()
+
+    # local (IST) wall-clock punch times
+    punch_in_time = models.TimeField(null=True, blank=True)
+    punch_out_time = models.TimeField(null=True, blank=True)
+
+    # punch_out - punch_in, only once both exist
+    worked_seconds = models.IntegerField(null=True, blank=True)
+
+    # company daily hours on a working day, 0 otherwise
+    expected_seconds = models.IntegerField(default=0)
+
+    work_status = models.CharField(max_length=20, null=True, blank=True)
+    branch_name = models.CharField(max_length=100, null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="daily_summary_user_date_uniq"),
+        ]
+        indexes = [
+            # report windows: all employees for a date range
+            models.Index(fields=["date", "user"], name="daily_summary_date_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} | {self.date} | {self.worked_seconds}"
+
+
+class MonthlyAttendanceSummary(models.Model):
+    """
+    One row per (user, month), re-aggregated from DailyAttendanceSummary
+    whenever one of that month's daily rows changes
+    (buzz/utils/monthly_summary.py). Payroll reads this.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="monthly_summaries")
+
+    # first day of the month
+    month = models.DateField()
+
+    worked_seconds = models.BigIntegerField(default=0)
+
+    # company calendar for the whole month (working days x daily hours)
+    expected_seconds = models.BigIntegerField(default=0)
+
+    present_days = models.IntegerField(default=0)
+    leave_days = models.IntegerField(default=0)
+    wfh_days = models.IntegerField(default=0)
+
+    # working days up to as_of with no punch, leave or WFH
+    absent_days = models.IntegerField(default=0)
+    as_of = models.DateField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "month"], name="monthly_summary_user_month_uniq"),
+        ]
+        indexes = [
+            # payroll: every employee for one month
+            models.Index(fields=["month", "user"], name="monthly_summary_month_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} | {self.month:%Y-%m} | {self.worked_seconds}"
+
+
+class PunchEvent(models.Model):
+    """
+    Append-only punch log. The request path only inserts here; the
+    process_punch_events worker folds pending events into Attendance.
+    """
+
+    KIND_CHOICES = (
+        ("IN", "Punch In"),
+        ("OUT", "Punch Out"),
+    )
+
+    STATUS_CHOICES = (
+        ("PENDING", "Pending"),
+        ("APPLIED", "Applied"),
+        ("REJECTED", "Rejected"),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="punch_events")
+
+    # client generated, one per tap; retries reuse it
+    idempotency_key = models.CharField(max_length=64)
+
+    kind = models.CharField(max_length=3, choices=KIND_CHOICES)
+    occurred_at = models.DateTimeField()
+
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    branch_name = models.CharField(max_length=100)
+    distance = models.FloatField()
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="PENDING")
+    result_message = models.CharField(max_length=255, blank=True, default="")
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "idempotency_key"],
+                name="punch_event_idempotency_key_uniq"
+            ),
+        ]
+        indexes = [
+            # worker scan: oldest pending first
+            models.Index(fields=["status", "id"], name="punch_event_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} | {self.kind} | {self.occurred_at} | {self.status}"
+
+
 class WFHRequest(models.Model):
 
     STATUS_CHOICES = (
@@ -92,6 +277,9 @@ class WFHRequest(models.Model):
     # 👉 jis date ke liye WFH chahiye
     date = models.DateField()
 
+    # same id on every day of one date-range application (None: single day)
+    batch_id = models.UUIDField(null=True, blank=True, db_index=True)
+
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -103,6 +291,10 @@ class WFHRequest(models.Model):
 
     class Meta:
         unique_together = ("user", "date")   # 🔥 same date pe 2 WFH request nahi
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="wfh_status_created_idx"),
+            models.Index(fields=["created_at", "id"], name="wfh_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} | {self.date} | {self.status}"
@@ -155,6 +347,13 @@ class AttendanceCorrectionRequest(models.Model):
     admin_comment = models.TextField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="correction_status_created_idx"),
+            models.Index(fields=["created_at", "id"], name="correction_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} | {self.request_type} | {self.status}"
@@ -184,6 +383,17 @@ class LeaveRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="leave_status_created_idx"),
+            models.Index(fields=["created_at", "id"], name="leave_created_id_idx"),
+            # overlap checks: user + status, then start_date <= end AND end_date >= start
+            models.Index(
+                fields=["user", "status", "start_date", "end_date"],
+                name="leave_user_status_range_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"User {self.user} | {self.start_date} - {self.end_date}"    
 
@@ -0,0 +1,43 @@
+from rest_framework.renderers import BaseRenderer
+from .utils.report_export import stream_csv, stream_xlsx, XLSX_CONTENT_TYPE
+
+
+# =====================================================
+# EXPORT RENDERERS
+# =====================================================
+# Report views stream their exports themselves (StreamingHttpResponse);
+# these renderers make ?format=csv / ?format=xlsx negotiable and render
+# the small non-streamed responses (e.g. validation errors).
+
+
+def flatten_for_export(data):
+    if isinstance(data, dict):
+        return list(data.keys()), [list(data.values())]
+    return ["detail"], [[data]]
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        header, rows = flatten_for_export(data)
+        return "".join(stream_csv(header, rows)).encode(self.charset)
+
+
+class XLSXRenderer(BaseRenderer):
+    media_type = XLSX_CONTENT_TYPE
+    format = "xlsx"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        header, rows = flatten_for_export(data)
+        return b"".join(stream_xlsx(header, rows))
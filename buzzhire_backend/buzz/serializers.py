@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from django.utils import timezone
 
-from .models import Attendance, User, WFHRequest, LeaveRequest, EmployeeLeaveBucket, RoleChoices, CompanyWorkingRules, CompanyHoliday, HolidayOverride
+from .models import Attendance, User, WFHRequest, LeaveRequest, EmployeeLeaveBucket, RoleChoices, CompanyWorkingRules, CompanyHoliday, HolidayOverride, Branch
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
@@ -57,6 +58,60 @@ class AttendanceSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+# =====================================================
+# ATTENDANCE FAST PATH (punch in / out / today)
+# =====================================================
+
+def to_iso_datetime(value):
+    # DRF DateTimeField: local time, ISO 8601, UTC offset as "Z"
+    value = timezone.localtime(value).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def to_iso_date(value):
+    return value.isoformat()
+
+
+# (output key, attname, converter) in AttendanceSerializer's key order:
+# pk, declared fields, model fields, then the user FK as its id
+ATTENDANCE_FAST_FIELDS = (
+    ("id", "id", None),
+    ("punch_in_time", "punch_in_time", to_iso_datetime),
+    ("punch_out_time", "punch_out_time", to_iso_datetime),
+    ("date", "date", to_iso_date),
+    ("punch_in_lat", "punch_in_lat", float),
+    ("punch_in_lon", "punch_in_lon", float),
+    ("punch_out_lat", "punch_out_lat", float),
+    ("punch_out_lon", "punch_out_lon", float),
+    ("branch_name", "branch_name", str),
+    ("work_status", "work_status", str),
+    ("user", "user_id", None),
+)
+
+
+ATTENDANCE_FAST_VALUES = tuple(attname for _, attname, _ in ATTENDANCE_FAST_FIELDS)
+
+
+def serialize_attendance_row(row):
+    """
+    Same dict as AttendanceSerializer(...).data, built from a
+    values(*ATTENDANCE_FAST_VALUES) row without DRF field machinery
+    """
+    data = {}
+    for key, attname, convert in ATTENDANCE_FAST_FIELDS:
+        value = row[attname]
+        data[key] = convert(value) if convert is not None and value is not None else value
+    return data
+
+
+def serialize_attendance(attendance):
+    # a loaded (not deferred) instance keeps every column in __dict__
+    # under its attname, i.e. it already is a values() row
+    return serialize_attendance_row(vars(attendance))
+
+
 class WFHRequestSerializer(serializers.ModelSerializer): 
     # readable fields (response only)
     user_name = serializers.CharField(source="user.name", read_only=True)
@@ -70,11 +125,13 @@ class WFHRequestSerializer(serializers.ModelSerializer):
             "user_name",     # response ke time
             "user_email",    # response ke time
             "date",
+            "batch_id",
             "status",
             "created_at",
             "updated_at",
         ]
         read_only_fields = [
+            "batch_id",
             "status",
             "created_at",
             "updated_at",
@@ -246,4 +303,31 @@ class CalendarOverrideSerializer(serializers.ModelSerializer):
             "date",
             "override_type",
             "reason",
-        ]
\ No newline at end of file
+        ]
+
+
+class BranchSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Branch
+        fields = [
+            "id",
+            "name",
+            "latitude",
+            "longitude",
+            "radius_m",
+            "is_active",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["created_at", "updated_at"]
+
+    def validate_latitude(self, value):
+        if not -90 <= value <= 90:
+            raise serializers.ValidationError("latitude must be between -90 and 90")
+        return value
+
+    def validate_longitude(self, value):
+        if not -180 <= value <= 180:
+            raise serializers.ValidationError("longitude must be between -180 and 180")
+        return value
@@ -0,0 +1,97 @@
+from datetime import date
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import CompanyWorkingRules, CompanyHoliday, HolidayOverride, Branch, LeaveRequest, EmployeeLeaveBucket, Attendance
+from .utils.company_calendar import invalidate_company_calendar
+from .utils.branch_index import invalidate_branch_index
+from .utils.leave_summary import invalidate_leave_summary
+from .utils.today_state import write_today_state, invalidate_today_state
+from .utils.daily_summary import sync_daily_summary, delete_daily_summary, refresh_calendar_change
+
+
+# ===========================
+# COMPANY CALENDAR
+# ===========================
+
+def get_changed_calendar_ranges(instance):
+    """
+    (start, end) ranges of the days a calendar row can change: a
+    holiday / override its own date (and the old one when moved), working
+    rules the current year - older years go through rebuild_daily_summaries
+    """
+    if isinstance(instance, CompanyWorkingRules):
+        year = timezone.localdate().year
+        return [(date(year, 1, 1), date(year, 12, 31))]
+
+    days = {instance.date, getattr(instance, "_previous_date", None)} - {None}
+    return [(day, day) for day in sorted(days)]
+
+
+@receiver(pre_save, sender=CompanyHoliday)
+@receiver(pre_save, sender=HolidayOverride)
+def remember_calendar_date(sender, instance, **kwargs):
+    # moving a holiday changes its old date too
+    instance._previous_date = (
+        sender.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=CompanyWorkingRules)
+@receiver(post_delete, sender=CompanyWorkingRules)
+@receiver(post_save, sender=CompanyHoliday)
+@receiver(post_delete, sender=CompanyHoliday)
+@receiver(post_save, sender=HolidayOverride)
+@receiver(post_delete, sender=HolidayOverride)
+def company_calendar_changed(sender, instance, **kwargs):
+    invalidate_company_calendar()
+    # rollups follow the calendar, for the changed days / months only
+    ranges = get_changed_calendar_ranges(instance)
+    transaction.on_commit(lambda: refresh_calendar_change(ranges))
+
+
+# ===========================
+# BRANCH GEOFENCES
+# ===========================
+
+@receiver(post_save, sender=Branch)
+@receiver(post_delete, sender=Branch)
+def branch_changed(sender, **kwargs):
+    invalidate_branch_index()
+
+
+# ===========================
+# LEAVE SUMMARY CACHE
+# ===========================
+
+@receiver(post_save, sender=LeaveRequest)
+@receiver(post_delete, sender=LeaveRequest)
+@receiver(post_save, sender=EmployeeLeaveBucket)
+@receiver(post_delete, sender=EmployeeLeaveBucket)
+def leave_rows_changed(sender, instance, **kwargs):
+    # after commit, so a read inside the open transaction cannot re-cache
+    # the old numbers
+    transaction.on_commit(lambda: invalidate_leave_summary(instance.user_id))
+
+
+# ===========================
+# TODAY STATE CACHE + DAILY ROLLUP
+# ===========================
+
+# Attendance saves (punch out, correction approval, ...) keep the daily
+# rollup and the today-state cache in step from here once the transaction
+# commits; the raw-SQL upserts in utils/attendance_upsert.py do the same
+# themselves
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: sync_daily_summary(instance))
+    transaction.on_commit(lambda: write_today_state(instance))
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: delete_daily_summary(instance.user_id, instance.date))
+    transaction.on_commit(lambda: invalidate_today_state(instance.user_id, instance.date))
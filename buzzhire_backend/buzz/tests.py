@@ -1,3 +1,1602 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import io
+import math
+import time as clock
+import zipfile
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+from xml.etree import ElementTree
+from datetime import date, datetime, time, timedelta
+import rsa
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from google.auth import crypt, jwt as google_jwt
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from .models import User, Attendance, AttendanceGeoAudit, Branch, PunchEvent, WFHRequest, LeaveRequest, AttendanceCorrectionRequest, EmployeeLeaveBucket, CompanyWorkingRules, CompanyHoliday, HolidayOverride, DailyAttendanceSummary, MonthlyAttendanceSummary
+from .utils.google_auth import StaticCertProvider, set_cert_provider
+from .utils.attendance_upsert import upsert_attendance, bulk_upsert_attendance
+from .utils.company_calendar import is_working_day, get_calendar_index, invalidate_company_calendar
+from .utils.branch_index import get_branch_index, invalidate_branch_index
+from .utils.punch_events import apply_punch_events
+from .utils.daily_summary import build_summary, save_summaries
+from .utils.today_state import load_today_state
+from .utils.leave_summary import get_leave_summary
+from .utils.intervals import IntervalSet
+from .utils.attendance_report import REPORT_EXPORT_HEADER
+from .utils.attendance_utils import seconds_to_hh_mm
+from .utils.report_export import XLSX_CONTENT_TYPE
+from .utils.distance_utils import EARTH_RADIUS_M, calculate_distance, calculate_distances
+from .serializers import AttendanceSerializer, ATTENDANCE_FAST_VALUES, serialize_attendance, serialize_attendance_row
+from rest_framework.renderers import JSONRenderer
 
-# Create your tests here.
+
+# =====================================================
+# QUERY PLANS (hot-path indexes)
+# =====================================================
+
+class HotPathIndexPlanTests(TestCase):
+    """
+    Guards the composite indexes added for the attendance hot paths:
+    if a lookup stops using its index, the plan assertion fails.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("plan@buzzhire.in", "plan@buzzhire.in", name="Plan")
+        today = timezone.localdate()
+
+        for offset in range(30):
+            day = today - timedelta(days=offset)
+            Attendance.objects.create(
+                user=cls.user,
+                date=day,
+                punch_in_time=timezone.make_aware(datetime.combine(day, time(9, 30))),
+                punch_out_time=timezone.make_aware(datetime.combine(day, time(18, 30))),
+                work_status="WFO"
+            )
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=f"expected {index_name} in plan:\n{plan}")
+
+    def get_unique_index_name(self, model, columns):
+        # backend-generated name of a unique_together index
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+        return next(
+            name for name, constraint in constraints.items()
+            if constraint["unique"] and constraint["columns"] == columns
+        )
+
+    def test_today_attendance_lookup_uses_user_date_index(self):
+        # same query as get_attendance_for_day
+        qs = Attendance.objects.filter(user_id=self.user.id, date=timezone.localdate()).order_by("pk")[:1]
+
+        self.assertUsesIndex(qs, self.get_unique_index_name(Attendance, ["user_id", "date"]))
+
+    def test_status_filtered_lists_use_status_created_index(self):
+        for model, index_name in (
+            (WFHRequest, "wfh_status_created_idx"),
+            (LeaveRequest, "leave_status_created_idx"),
+            (AttendanceCorrectionRequest, "correction_status_created_idx"),
+        ):
+            with self.subTest(model=model.__name__):
+                qs = model.objects.filter(status="PENDING").order_by("-created_at")
+                self.assertUsesIndex(qs, index_name)
+
+    def test_leave_overlap_check_uses_range_index(self):
+        today = timezone.localdate()
+
+        qs = LeaveRequest.objects.filter(
+            user=self.user,
+            status__in=["PENDING", "APPROVED"],
+            start_date__lte=today + timedelta(days=3),
+            end_date__gte=today
+        )
+
+        self.assertUsesIndex(qs, "leave_user_status_range_idx")
+
+
+# =====================================================
+# GOOGLE LOGIN (offline, static certificates)
+# =====================================================
+
+@override_settings(
+    GOOGLE_CLIENT_ID="test-client-id",
+    WHITELISTED_EMAILS=["login@buzzhire.in"]
+)
+class GoogleAuthOfflineTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        public_key, private_key = rsa.newkeys(1024)
+        cls.signer = crypt.RSASigner.from_string(
+            private_key.save_pkcs1().decode(), key_id="test-key"
+        )
+        set_cert_provider(StaticCertProvider({"test-key": public_key.save_pkcs1().decode()}))
+
+    @classmethod
+    def tearDownClass(cls):
+        set_cert_provider(None)
+        super().tearDownClass()
+
+    def make_token(self, **claims):
+        now = int(clock.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": "test-client-id",
+            "iat": now,
+            "exp": now + 3600,
+            "email": "login@buzzhire.in",
+            "name": "Login User",
+        }
+        payload.update(claims)
+        return google_jwt.encode(self.signer, payload).decode()
+
+    def test_login_with_valid_token(self):
+        response = APIClient().post("/google/", {"id_token": self.make_token()}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "login@buzzhire.in")
+        self.assertIn("access", response.data)
+
+    def test_login_rejects_wrong_audience(self):
+        response = APIClient().post(
+            "/google/", {"id_token": self.make_token(aud="someone-else")}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+# =====================================================
+# PUNCH STATUS POLLING (today-state cache)
+# =====================================================
+
+class TodayStatePollingBenchmarkTests(TestCase):
+    """
+    Queries per poll of the punch-status endpoints, with a real JWT so
+    authentication is part of the count.
+    """
+
+    POLL_URLS = ("/today/", "/total-working-time/")
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("poll@buzzhire.in", "poll@buzzhire.in", name="Poll")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def queries_per_poll(self, url, polls=20):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(polls):
+                self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries.captured_queries) / polls
+
+    def test_warm_polls_make_no_queries(self):
+        for url in self.POLL_URLS:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as cold:
+                    self.client.get(url)
+
+                warm = self.queries_per_poll(url)
+                numbers = f"{url}: cold poll {len(cold.captured_queries)} queries, warm poll {warm} queries"
+
+                self.assertEqual(len(cold.captured_queries), 1, msg=numbers)
+                self.assertEqual(warm, 0, msg=numbers)
+
+    def test_punch_writes_through_to_cached_state(self):
+        self.client.get("/today/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance = Attendance.objects.create(
+                user=self.user,
+                date=timezone.localdate(),
+                punch_in_time=timezone.now(),
+                branch_name="Delhi",
+                work_status="WFO"
+            )
+
+        with self.assertNumQueries(0):
+            data = self.client.get("/today/").data["data"]
+        self.assertTrue(data["is_punched_in"])
+        self.assertEqual(data["branch"], "Delhi")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attendance.punch_out_time = timezone.now()
+            attendance.save()
+
+        with self.assertNumQueries(0):
+            data = self.client.get("/today/").data["data"]
+        self.assertTrue(data["has_punched_out"])
+
+
+# =====================================================
+# TIMER STREAM (SSE)
+# =====================================================
+
+@override_settings(TIMER_STREAM_POLL_SECONDS=60, TIMER_STREAM_MAX_SECONDS=600)
+class TimerStreamTests(TestCase):
+    """
+    The stream is an async generator: the first event must arrive right
+    away, not when the stream ends (10 minutes here).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("stream@buzzhire.in", "stream@buzzhire.in", name="Stream")
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_first_event_arrives_before_the_stream_ends(self):
+        response = await AsyncClient().get(
+            "/timer/stream/",
+            headers={"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        # async iterator: ASGI sends each event as it is yielded
+        self.assertTrue(response.is_async)
+
+        chunks = aiter(response.streaming_content)
+        try:
+            retry = await asyncio.wait_for(anext(chunks), timeout=5)
+            event = await asyncio.wait_for(anext(chunks), timeout=5)
+        finally:
+            await chunks.aclose()
+
+        self.assertTrue(retry.startswith(b"retry: "))
+        self.assertIn(b"event: timer", event)
+        self.assertIn(b'"is_punched_in": false', event)
+
+    async def test_stream_requires_a_token(self):
+        response = await AsyncClient().get("/timer/stream/")
+        self.assertEqual(response.status_code, 401)
+
+
+# =====================================================
+# ASYNC PUNCH VIEWS
+# =====================================================
+
+class AsyncPunchViewTests(TestCase):
+    """
+    The ASGI punch path through AsyncClient: a full in / today / out
+    round with a token, and a 401 without one.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Branch.objects.all().delete()
+        self.branch = Branch.objects.create(name="Async", latitude=28.5, longitude=77.2, radius_m=300)
+        self.user = User.objects.create_user("async@buzzhire.in", "async@buzzhire.in", name="Async")
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.location = {"latitude": 28.5, "longitude": 77.2}
+
+    async def test_authenticated_punch_round(self):
+        client = AsyncClient()
+
+        response = await client.post("/async/punch-in/", self.location, content_type="application/json", headers=self.headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["branch"], "Async")
+
+        response = await client.get("/async/today/", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["is_punched_in"], True)
+        self.assertEqual(response.json()["data"]["branch"], "Async")
+
+        response = await client.post("/async/punch-out/", self.location, content_type="application/json", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+        attendance = await Attendance.objects.aget(user=self.user, date=timezone.localdate())
+        self.assertIsNotNone(attendance.punch_out_time)
+
+    async def test_unauthenticated_requests_get_401(self):
+        client = AsyncClient()
+
+        for response in (
+            await client.post("/async/punch-in/", self.location, content_type="application/json"),
+            await client.post("/async/punch-out/", self.location, content_type="application/json"),
+            await client.get("/async/today/"),
+        ):
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json(), {"detail": "Authentication credentials were not provided."})
+
+        self.assertFalse(await Attendance.objects.filter(user=self.user).aexists())
+
+
+# =====================================================
+# ATTENDANCE UPSERT PRIMITIVE
+# =====================================================
+
+class AttendanceUpsertTests(TestCase):
+    """
+    Runs the backend's native upsert (ON CONFLICT on SQLite / PostgreSQL,
+    ON DUPLICATE KEY UPDATE on MySQL).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("upsert@buzzhire.in", "upsert@buzzhire.in", name="Upsert")
+        self.day = timezone.localdate()
+        self.punch_in = timezone.make_aware(datetime.combine(self.day, time(9, 30)))
+
+    def test_insert_is_a_single_statement(self):
+        with self.assertNumQueries(1):
+            attendance = upsert_attendance(Attendance(
+                user=self.user, date=self.day, punch_in_time=self.punch_in, work_status="WFO"
+            ))
+
+        stored = Attendance.objects.get(user=self.user, date=self.day)
+        self.assertEqual(attendance.pk, stored.pk)
+        self.assertEqual(stored.work_status, "WFO")
+
+    def test_conflict_updates_only_update_fields(self):
+        existing = Attendance.objects.create(
+            user=self.user, date=self.day, punch_in_time=self.punch_in,
+            branch_name="NOIDA", work_status="WFO"
+        )
+
+        with self.assertNumQueries(1):
+            attendance = upsert_attendance(
+                Attendance(user=self.user, date=self.day, work_status="LEAVE"),
+                update_fields=["work_status"]
+            )
+
+        stored = Attendance.objects.get(pk=existing.pk)
+        self.assertEqual(attendance.pk, existing.pk)
+        self.assertEqual(stored.work_status, "LEAVE")
+        self.assertEqual(stored.punch_in_time, self.punch_in)
+        self.assertEqual(stored.branch_name, "NOIDA")
+        self.assertEqual(Attendance.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_upsert_inserts_and_updates_together(self):
+        Attendance.objects.create(user=self.user, date=self.day, punch_in_time=self.punch_in, work_status="WFO")
+        days = [self.day + timedelta(days=offset) for offset in range(3)]
+
+        with self.assertNumQueries(1):
+            bulk_upsert_attendance(
+                [Attendance(user=self.user, date=day, work_status="LEAVE") for day in days],
+                update_fields=["work_status"]
+            )
+
+        rows = Attendance.objects.filter(user=self.user).order_by("date")
+        self.assertEqual([row.work_status for row in rows], ["LEAVE"] * 3)
+        self.assertEqual(rows[0].punch_in_time, self.punch_in)
+
+    def test_bulk_upsert_passes_no_conflict_target_on_mysql(self):
+        # MySQL reports no conflict-target support; Django would raise
+        # NotSupportedError for unique_fields. (SQLite then emits a plain
+        # INSERT, so only new rows are used here.)
+        days = [self.day + timedelta(days=offset) for offset in range(2)]
+
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            bulk_upsert_attendance(
+                [Attendance(user=self.user, date=day, work_status="LEAVE") for day in days],
+                update_fields=["work_status"]
+            )
+
+        self.assertEqual(Attendance.objects.filter(user=self.user, work_status="LEAVE").count(), 2)
+
+    def test_daily_summary_save_passes_no_conflict_target_on_mysql(self):
+        # sync_daily_summary saves through this after every Attendance save
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            save_summaries([build_summary(self.user.id, self.day, self.punch_in, None, "WFO", "NOIDA", 0)])
+
+        summary = DailyAttendanceSummary.objects.get(user=self.user, date=self.day)
+        self.assertEqual(summary.work_status, "WFO")
+
+
+class PunchEventReplayTests(TestCase):
+    """
+    The worker writes back only the punch columns an event changed.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("replay@buzzhire.in", "replay@buzzhire.in", name="Replay")
+        self.day = timezone.localdate()
+        self.punch_in = timezone.make_aware(datetime.combine(self.day, time(9, 30)))
+
+    def make_event(self, kind, occurred_at):
+        return PunchEvent.objects.create(
+            user=self.user, idempotency_key=f"{kind}-{occurred_at.isoformat()}", kind=kind,
+            occurred_at=occurred_at, latitude=28.5, longitude=77.3, branch_name="NOIDA", distance=10
+        )
+
+    def test_punch_out_keeps_work_status_set_meanwhile(self):
+        Attendance.objects.create(
+            user=self.user, date=self.day, punch_in_time=self.punch_in,
+            branch_name="NOIDA", work_status="WFO"
+        )
+        event = self.make_event("OUT", self.punch_in + timedelta(hours=8))
+
+        # WFH approved after the event was queued
+        Attendance.objects.filter(user=self.user, date=self.day).update(work_status="WFH")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(apply_punch_events([event]), (1, 0))
+
+        upserts = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("INSERT")]
+        self.assertEqual(len(upserts), 1)
+        # the conflict clause (UPDATE SET / UPDATE) lists the written columns
+        written = upserts[0].rsplit("UPDATE", 1)[1]
+        self.assertIn("punch_out_time", written)
+        self.assertNotIn("work_status", written)
+        self.assertNotIn("punch_in_time", written)
+
+        stored = Attendance.objects.get(user=self.user, date=self.day)
+        self.assertEqual(stored.work_status, "WFH")
+        self.assertEqual(stored.punch_out_time, event.occurred_at)
+
+    def test_first_punch_in_creates_the_row(self):
+        event = self.make_event("IN", self.punch_in)
+
+        self.assertEqual(apply_punch_events([event]), (1, 0))
+
+        stored = Attendance.objects.get(user=self.user, date=self.day)
+        self.assertEqual(stored.punch_in_time, self.punch_in)
+        self.assertEqual(stored.branch_name, "NOIDA")
+        self.assertEqual(stored.work_status, "WFO")
+
+
+# =====================================================
+# BULK ADMIN ACTIONS (query count vs batch size)
+# =====================================================
+
+class BulkActionQueryTests(TestCase):
+    """
+    A bulk action must cost the same number of queries for 2 items as
+    for 20: everything is set-based.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user("bulk-admin@buzzhire.in", "bulk-admin@buzzhire.in", name="Admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.day = timezone.localdate()
+
+        # build the per-process calendar index up front, outside the counts
+        is_working_day(self.day)
+
+    def make_users(self, count, prefix):
+        # create_user also gives every user a leave bucket
+        return [
+            User.objects.create_user(f"{prefix}{i}@buzzhire.in", f"{prefix}{i}@buzzhire.in", name=f"{prefix}{i}")
+            for i in range(count)
+        ]
+
+    def approve(self, url, ids):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"ids": ids, "action": "APPROVE"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["processed"], len(ids))
+        return len(queries)
+
+    def test_leave_bulk_approve_is_constant_in_batch_size(self):
+        counts = []
+        for size, prefix in [(2, "leave-a"), (20, "leave-b")]:
+            # create(), not bulk_create(): MySQL leaves bulk-created ids unset
+            leaves = [
+                LeaveRequest.objects.create(
+                    user=user, start_date=self.day, end_date=self.day + timedelta(days=2),
+                    total_days=3, reason="trip"
+                )
+                for user in self.make_users(size, prefix)
+            ]
+            counts.append(self.approve("/api/admin/leaves/bulk-action/", [leave.id for leave in leaves]))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(
+            set(EmployeeLeaveBucket.objects.exclude(user=self.admin).values_list("taken_leave", flat=True)), {3}
+        )
+        self.assertFalse(LeaveRequest.objects.filter(status="PENDING").exists())
+
+    def test_wfh_bulk_approve_is_constant_in_batch_size(self):
+        counts = []
+        for size, prefix in [(2, "wfh-a"), (20, "wfh-b")]:
+            wfhs = [
+                WFHRequest.objects.create(user=user, date=self.day) for user in self.make_users(size, prefix)
+            ]
+            counts.append(self.approve("/wfh/admin/bulk-action/", [wfh.id for wfh in wfhs]))
+
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(Attendance.objects.filter(date=self.day, work_status="WFH").count(), 22)
+
+    def test_correction_bulk_reports_per_item_results(self):
+        user = self.make_users(1, "corr")[0]
+        punch_in = timezone.make_aware(datetime.combine(self.day, time(9, 30)))
+        attendance = Attendance.objects.create(user=user, date=self.day, punch_in_time=punch_in)
+
+        corrections = [
+            AttendanceCorrectionRequest.objects.create(
+                user=user, attendance=attendance, request_type="PUNCH_OUT",
+                requested_time=punch_in + timedelta(hours=9), reason="forgot"
+            ),
+            AttendanceCorrectionRequest.objects.create(
+                user=user, attendance=attendance, request_type="PUNCH_OUT",
+                requested_time=punch_in - timedelta(hours=1), reason="typo"
+            ),
+        ]
+
+        response = self.client.post(
+            "/api/admin/attendance-regularization/bulk-action/",
+            {"ids": [correction.id for correction in corrections] + [0], "action": "APPROVE"},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result["ok"] for result in response.data["results"]], [True, False, False])
+        attendance.refresh_from_db()
+        self.assertEqual(attendance.punch_out_time, punch_in + timedelta(hours=9))
+
+
+# =====================================================
+# DATE-RANGE WFH
+# =====================================================
+
+class WFHRangeTests(TestCase):
+    """
+    A range application covers working days only, reports conflicts per
+    date and is capped at WFH_MAX_RANGE_DAYS.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("wfh-range@buzzhire.in", "wfh-range@buzzhire.in", name="WFH Range")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        CompanyWorkingRules.objects.create(
+            company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+            daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+        )
+
+        # a full future week, Monday .. Sunday, with a Wednesday holiday
+        today = timezone.localdate()
+        self.monday = today + timedelta(days=7 - today.weekday())
+        self.week = [self.monday + timedelta(days=offset) for offset in range(7)]
+        CompanyHoliday.objects.create(name="Festival", date=self.week[2], holiday_type="FIXED")
+
+    def apply(self, start_date, end_date):
+        return self.client.post(
+            "/wfh/apply/",
+            {"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+            format="json"
+        )
+
+    def test_range_skips_weekends_and_holidays(self):
+        response = self.apply(self.week[0], self.week[6])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["count"], 4)
+        self.assertEqual(
+            [result["date"] for result in response.data["results"]],
+            [self.week[i].isoformat() for i in (0, 1, 3, 4)]
+        )
+        self.assertEqual(
+            set(WFHRequest.objects.values_list("batch_id", flat=True)), {response.data["batch_id"]}
+        )
+
+    def test_duplicate_dates_are_reported(self):
+        WFHRequest.objects.create(user=self.user, date=self.week[1])
+
+        response = self.apply(self.week[0], self.week[4])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["dates"], [self.week[1].isoformat()])
+        self.assertEqual(WFHRequest.objects.count(), 1)
+
+    def test_approved_leave_dates_are_reported(self):
+        LeaveRequest.objects.create(
+            user=self.user, start_date=self.week[3], end_date=self.week[6],
+            total_days=2, reason="trip", status="APPROVED"
+        )
+
+        response = self.apply(self.week[0], self.week[6])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["dates"], [self.week[3].isoformat(), self.week[4].isoformat()])
+        self.assertFalse(WFHRequest.objects.exists())
+
+    @override_settings(WFH_MAX_RANGE_DAYS=5)
+    def test_range_longer_than_the_cap_is_rejected(self):
+        self.assertEqual(self.apply(self.week[0], self.week[4]).status_code, 201)
+
+        response = self.apply(self.week[0] + timedelta(days=7), self.week[5] + timedelta(days=7))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(WFHRequest.objects.count(), 4)
+
+    def test_batch_approve_marks_working_days_only(self):
+        batch_id = self.apply(self.week[0], self.week[4]).data["batch_id"]
+
+        # Friday becomes a holiday after the application
+        CompanyHoliday.objects.create(name="Bridge", date=self.week[4], holiday_type="FIXED")
+
+        response = self.client.post(
+            f"/wfh/admin/batch/{batch_id}/action/", {"action": "APPROVE"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["processed"], 4)
+        self.assertEqual(
+            list(Attendance.objects.filter(user=self.user, work_status="WFH").order_by("date").values_list("date", flat=True)),
+            [self.week[0], self.week[1], self.week[3]]
+        )
+
+
+# =====================================================
+# LEAVE OVERLAP (interval sets + import)
+# =====================================================
+
+class IntervalSetTests(SimpleTestCase):
+    """
+    Intervals are closed: sharing an end day merges, the next day does not.
+    """
+
+    def test_init_sorts_and_merges(self):
+        self.assertEqual(list(IntervalSet([(5, 8), (1, 3), (2, 4)])), [(1, 4), (5, 8)])
+
+    def test_add_to_empty_set(self):
+        intervals = IntervalSet()
+        intervals.add(3, 5)
+
+        self.assertEqual(list(intervals), [(3, 5)])
+        self.assertTrue(intervals.overlaps(5, 9))
+        self.assertFalse(intervals.overlaps(6, 9))
+
+    def test_add_overlapping_merges(self):
+        intervals = IntervalSet([(1, 5)])
+        intervals.add(3, 8)
+
+        self.assertEqual(list(intervals), [(1, 8)])
+
+    def test_add_touching_merges_adjacent_does_not(self):
+        intervals = IntervalSet([(1, 3)])
+        intervals.add(3, 5)
+        intervals.add(6, 7)
+
+        self.assertEqual(list(intervals), [(1, 5), (6, 7)])
+
+    def test_add_spanning_several_merges_them_all(self):
+        intervals = IntervalSet([(1, 2), (4, 5), (7, 8), (10, 11)])
+        intervals.add(3, 8)
+
+        self.assertEqual(list(intervals), [(1, 2), (3, 8), (10, 11)])
+
+        intervals.add(0, 12)
+        self.assertEqual(list(intervals), [(0, 12)])
+
+    def test_add_in_a_gap_keeps_order(self):
+        intervals = IntervalSet([(1, 2), (8, 9)])
+        intervals.add(5, 5)
+
+        self.assertEqual(list(intervals), [(1, 2), (5, 5), (8, 9)])
+        self.assertFalse(intervals.overlaps(3, 4))
+        self.assertTrue(intervals.overlaps(4, 6))
+
+
+class LeaveImportTests(TestCase):
+    """
+    Per-row results of the HR sheet import.
+    """
+
+    MONDAY = date(2026, 3, 2)
+
+    def setUp(self):
+        self.admin = User.objects.create_user("import-admin@buzzhire.in", "import-admin@buzzhire.in", name="Admin", is_staff=True)
+        self.employee = User.objects.create_user("import@buzzhire.in", "import@buzzhire.in", name="Import")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        CompanyWorkingRules.objects.create(
+            company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+            daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+        )
+
+    def row(self, start_offset, end_offset, user_id=None):
+        return {
+            "user_id": user_id or self.employee.id,
+            "start_date": (self.MONDAY + timedelta(days=start_offset)).isoformat(),
+            "end_date": (self.MONDAY + timedelta(days=end_offset)).isoformat(),
+            "reason": "sheet"
+        }
+
+    def post(self, rows):
+        return self.client.post("/api/admin/leaves/import/", {"leaves": rows}, format="json")
+
+    def errors(self, response):
+        return [result.get("error") for result in response.data["results"]]
+
+    def test_rows_overlapping_earlier_rows_are_rejected(self):
+        response = self.post([self.row(0, 2), self.row(2, 3), self.row(3, 4)])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.errors(response), [None, "Leave already applied for these dates", None])
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(LeaveRequest.objects.filter(user=self.employee).count(), 2)
+
+    def test_unknown_and_staff_users_are_rejected(self):
+        response = self.post([self.row(0, 0, user_id=999999), self.row(0, 0, user_id=self.admin.id)])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.errors(response), ["Employee not found"] * 2)
+        self.assertFalse(LeaveRequest.objects.exists())
+
+    def test_range_without_working_days_is_rejected(self):
+        # Saturday .. Sunday
+        response = self.post([self.row(5, 6), self.row(4, 7)])
+
+        self.assertEqual(self.errors(response), ["No working days in this range", None])
+        self.assertEqual(response.data["results"][1]["requested_days"], 2)
+
+
+class LeaveWorkingDayTests(TestCase):
+    """
+    Leave is charged for working days only: weekends, holidays and
+    overrides come from the company calendar.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("leave-days@buzzhire.in", "leave-days@buzzhire.in", name="Leave Days")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        CompanyWorkingRules.objects.create(
+            company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+            daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+        )
+
+        # future Monday .. Sunday: Wednesday holiday, Thursday comp-off,
+        # Saturday converted to a working day
+        today = timezone.localdate()
+        monday = today + timedelta(days=7 - today.weekday())
+        self.week = [monday + timedelta(days=offset) for offset in range(7)]
+
+        CompanyHoliday.objects.create(name="Festival", date=self.week[2], holiday_type="FIXED")
+        HolidayOverride.objects.create(date=self.week[3], override_type="COMP_OFF", reason="bridge")
+        HolidayOverride.objects.create(date=self.week[5], override_type="WORKING_DAY", reason="release")
+
+    def apply(self, start_date, end_date):
+        return self.client.post(
+            "/api/employee/leave/apply/",
+            {"start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "reason": "trip"},
+            format="json"
+        )
+
+    def test_week_is_charged_working_days_only(self):
+        response = self.apply(self.week[0], self.week[6])
+
+        self.assertEqual(response.status_code, 201)
+        # Mon, Tue, Fri and the working Saturday
+        self.assertEqual(response.data["requested_days"], 4)
+
+        response = self.client.post(
+            "/api/admin/leaves/bulk-action/",
+            {"ids": [response.data["leave_id"]], "action": "APPROVE"},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(EmployeeLeaveBucket.objects.get(user=self.user).taken_leave, 4)
+        self.assertEqual(
+            list(Attendance.objects.filter(user=self.user, work_status="LEAVE").order_by("date").values_list("date", flat=True)),
+            [self.week[i] for i in (0, 1, 4, 5)]
+        )
+
+    def test_range_of_holidays_only_is_rejected(self):
+        # Wednesday holiday + Thursday comp-off
+        response = self.apply(self.week[2], self.week[3])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["message"], "No working days in this range")
+        self.assertFalse(LeaveRequest.objects.filter(user=self.user).exists())
+
+
+# =====================================================
+# ATTENDANCE FAST SERIALIZER (vs DRF AttendanceSerializer)
+# =====================================================
+
+class AttendanceFastSerializerTests(TestCase):
+    """
+    The fast path must render the same JSON bytes as AttendanceSerializer
+    (existing clients parse it).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("fast@buzzhire.in", "fast@buzzhire.in", name="Fast")
+        day = timezone.localdate()
+        punch_in = timezone.make_aware(datetime.combine(day, time(9, 30, 12, 345678)))
+
+        # full row, half-filled row, empty row
+        Attendance.objects.create(
+            user=self.user, date=day, punch_in_time=punch_in, punch_out_time=punch_in + timedelta(hours=9),
+            punch_in_lat=28.5355, punch_in_lon=77, punch_out_lat=28.5355, punch_out_lon=77.391,
+            branch_name="NOIDA", work_status="WFO"
+        )
+        Attendance.objects.create(
+            user=self.user, date=day - timedelta(days=1), punch_in_time=punch_in - timedelta(days=1),
+            punch_in_lat=28.5, punch_in_lon=77.25, branch_name="SAKET", work_status="WFO"
+        )
+        Attendance.objects.create(user=self.user, date=day - timedelta(days=2))
+
+        self.attendances = list(Attendance.objects.order_by("id"))
+        self.renderer = JSONRenderer()
+
+    def test_output_is_byte_for_byte_compatible(self):
+        rows = Attendance.objects.order_by("id").values(*ATTENDANCE_FAST_VALUES)
+
+        for attendance, row in zip(self.attendances, rows):
+            with self.subTest(id=attendance.id):
+                expected = self.renderer.render(AttendanceSerializer(attendance).data)
+                self.assertEqual(self.renderer.render(serialize_attendance(attendance)), expected)
+                self.assertEqual(self.renderer.render(serialize_attendance_row(row)), expected)
+
+        # "Z" suffix, exactly like DRF, when the active timezone is UTC
+        with timezone.override("UTC"):
+            attendance = self.attendances[0]
+            self.assertEqual(
+                self.renderer.render(serialize_attendance(attendance)),
+                self.renderer.render(AttendanceSerializer(attendance).data)
+            )
+
+    def test_benchmark_command_reports_every_path(self):
+        # timings are printed, never asserted: they depend on the machine
+        out = StringIO()
+        call_command("benchmark_attendance_serializer", "--rounds", "2", stdout=out)
+
+        report = out.getvalue()
+        for name in ("AttendanceSerializer", "serialize_attendance ", "serialize_attendance_row"):
+            self.assertIn(name, report)
+        self.assertIn("3 rows, 0 JSON mismatches", report)
+
+    def test_uncached_today_state_is_built_from_a_values_row(self):
+        cache.clear()
+        today = self.attendances[0]
+
+        with self.assertNumQueries(1):
+            state = load_today_state(self.user.id, today.date)
+
+        self.assertEqual(
+            self.renderer.render(state["raw"]),
+            self.renderer.render(AttendanceSerializer(today).data)
+        )
+
+
+# =====================================================
+# PER-PROCESS INDEXES ON A PROCESS-LOCAL CACHE
+# =====================================================
+
+class LocalIndexRefreshTests(TestCase):
+    """
+    With LocMemCache a version bump never reaches other workers, so the
+    per-process indexes must also expire on their own.
+    """
+
+    def setUp(self):
+        invalidate_company_calendar()
+
+    def test_calendar_index_is_kept_within_ttl(self):
+        with override_settings(COMPANY_CALENDAR_LOCAL_TTL=3600):
+            self.assertIs(get_calendar_index(), get_calendar_index())
+
+    def test_calendar_index_is_rebuilt_after_ttl(self):
+        with override_settings(COMPANY_CALENDAR_LOCAL_TTL=0):
+            self.assertIsNot(get_calendar_index(), get_calendar_index())
+
+    def test_branch_index_is_rebuilt_after_ttl(self):
+        with override_settings(BRANCH_INDEX_LOCAL_TTL=3600):
+            self.assertIs(get_branch_index(), get_branch_index())
+
+        with override_settings(BRANCH_INDEX_LOCAL_TTL=0):
+            self.assertIsNot(get_branch_index(), get_branch_index())
+
+
+class BranchIndexLocateTests(TestCase):
+    """
+    Grid lookups against the exact haversine check, with the index only
+    refreshed by a Branch change.
+    """
+
+    def setUp(self):
+        Branch.objects.all().delete()
+        # ~390 m apart, so the two geofences overlap
+        self.first = Branch.objects.create(name="First", latitude=28.5, longitude=77.2, radius_m=300)
+        self.second = Branch.objects.create(name="Second", latitude=28.5, longitude=77.204, radius_m=300)
+
+    def north_of(self, branch, meters):
+        return branch.latitude + math.degrees(meters / EARTH_RADIUS_M), branch.longitude
+
+    def test_locate_picks_closest_containing_branch(self):
+        branch, distance = get_branch_index().locate(28.5, 77.2)
+        self.assertEqual((branch.id, distance), (self.first.id, 0))
+
+        # inside both geofences, closer to the second
+        branch, distance = get_branch_index().locate(28.5, 77.2025)
+        self.assertEqual(branch.id, self.second.id)
+        self.assertAlmostEqual(distance, calculate_distance(28.5, 77.2025, 28.5, 77.204))
+
+    def test_locate_at_boundary_radius(self):
+        lat, lon = self.north_of(self.first, 299.9)
+        branch, distance = get_branch_index().locate(lat, lon)
+        self.assertEqual(branch.id, self.first.id)
+        self.assertAlmostEqual(distance, 299.9, places=3)
+
+        lat, lon = self.north_of(self.first, 300.1)
+        self.assertEqual(get_branch_index().locate(lat, lon), (None, None))
+
+    def test_nearest_explains_out_of_range_punch(self):
+        lat, lon = self.north_of(self.first, 5000)
+        self.assertEqual(get_branch_index().locate(lat, lon), (None, None))
+
+        branch, distance = get_branch_index().nearest(lat, lon)
+        self.assertEqual(branch.id, self.first.id)
+        self.assertAlmostEqual(distance, 5000, places=3)
+
+    def test_no_active_branch(self):
+        Branch.objects.update(is_active=False)
+        invalidate_branch_index()
+
+        self.assertEqual(get_branch_index().locate(28.5, 77.2), (None, None))
+        self.assertEqual(get_branch_index().nearest(28.5, 77.2), (None, None))
+
+    def test_branch_save_invalidates_index(self):
+        with override_settings(BRANCH_INDEX_LOCAL_TTL=3600):
+            index = get_branch_index()
+            self.assertIs(get_branch_index(), index)
+
+            self.first.radius_m = 50
+            self.first.save()
+
+            self.assertIsNot(get_branch_index(), index)
+            lat, lon = self.north_of(self.first, 100)
+            self.assertEqual(get_branch_index().locate(lat, lon), (None, None))
+
+            self.first.delete()
+            self.assertEqual(get_branch_index().nearest(28.5, 77.2)[0].id, self.second.id)
+
+
+# =====================================================
+# CALENDAR CHANGE -> ROLLUP REFRESH
+# =====================================================
+
+class CalendarChangeRefreshTests(TestCase):
+    """
+    A holiday change re-applies expected_seconds to its own date and
+    month only, not to the whole rollup tables.
+    """
+
+    HOLIDAY = date(2026, 3, 4)    # Wednesday
+    OTHER_DAY = date(2026, 5, 6)  # Wednesday
+
+    def setUp(self):
+        self.user = User.objects.create_user("calendar@buzzhire.in", "calendar@buzzhire.in", name="Calendar")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyWorkingRules.objects.create(
+                company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+                daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+            )
+            for day in (self.HOLIDAY, self.OTHER_DAY):
+                Attendance.objects.create(user=self.user, date=day, work_status="WFO")
+
+    def expected_seconds(self, day):
+        return DailyAttendanceSummary.objects.get(user=self.user, date=day).expected_seconds
+
+    def test_holiday_refreshes_only_its_date(self):
+        self.assertEqual(self.expected_seconds(self.HOLIDAY), 8 * 3600)
+
+        # stale on purpose: a bounded refresh must not touch it
+        DailyAttendanceSummary.objects.filter(date=self.OTHER_DAY).update(expected_seconds=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            holiday = CompanyHoliday.objects.create(name="Holi", date=self.HOLIDAY, holiday_type="FIXED")
+
+        self.assertEqual(self.expected_seconds(self.HOLIDAY), 0)
+        self.assertEqual(self.expected_seconds(self.OTHER_DAY), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            holiday.delete()
+
+        self.assertEqual(self.expected_seconds(self.HOLIDAY), 8 * 3600)
+
+    def test_moved_holiday_refreshes_old_and_new_date(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            holiday = CompanyHoliday.objects.create(name="Holi", date=self.HOLIDAY, holiday_type="FIXED")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            holiday.date = self.OTHER_DAY
+            holiday.save()
+
+        self.assertEqual(self.expected_seconds(self.HOLIDAY), 8 * 3600)
+        self.assertEqual(self.expected_seconds(self.OTHER_DAY), 0)
+
+    def test_holiday_refreshes_only_its_month(self):
+        march = MonthlyAttendanceSummary.objects.get(user=self.user, month=date(2026, 3, 1))
+        MonthlyAttendanceSummary.objects.filter(month=date(2026, 5, 1)).update(expected_seconds=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyHoliday.objects.create(name="Holi", date=self.HOLIDAY, holiday_type="FIXED")
+
+        march_after = MonthlyAttendanceSummary.objects.get(pk=march.pk)
+        self.assertEqual(march_after.expected_seconds, march.expected_seconds - 8 * 3600)
+        self.assertEqual(
+            MonthlyAttendanceSummary.objects.get(user=self.user, month=date(2026, 5, 1)).expected_seconds, 1
+        )
+
+    def test_migration_backfills_existing_attendance(self):
+        # rows written before the rollup tables existed
+        DailyAttendanceSummary.objects.all().delete()
+        MonthlyAttendanceSummary.objects.all().delete()
+
+        backfill = import_module("buzz.migrations.0020_backfill_attendance_summaries").backfill_summaries
+        backfill(apps, None)
+
+        self.assertEqual(self.expected_seconds(self.HOLIDAY), 8 * 3600)
+        self.assertEqual(
+            set(MonthlyAttendanceSummary.objects.filter(user=self.user).values_list("month", flat=True)),
+            {date(2026, 3, 1), date(2026, 5, 1)}
+        )
+
+
+# =====================================================
+# MONTHLY ROLLUP (endpoint + refresh command)
+# =====================================================
+
+class MonthlySummaryTests(TestCase):
+    """
+    March 2026 has 22 weekdays, one of them a holiday: 21 working days.
+    """
+
+    MONTH = date(2026, 3, 1)
+    WORKING_DAYS = 21
+
+    def setUp(self):
+        self.admin = User.objects.create_user("month-admin@buzzhire.in", "month-admin@buzzhire.in", name="Admin", is_staff=True)
+        self.user = User.objects.create_user("month@buzzhire.in", "month@buzzhire.in", name="Month")
+        self.idle = User.objects.create_user("idle@buzzhire.in", "idle@buzzhire.in", name="Idle")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyWorkingRules.objects.create(
+                company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+                daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+            )
+            CompanyHoliday.objects.create(name="Holi", date=date(2026, 3, 4), holiday_type="FIXED")
+
+    def punch(self, day, start, end=None):
+        return {
+            "punch_in_time": timezone.make_aware(datetime.combine(day, start)),
+            "punch_out_time": timezone.make_aware(datetime.combine(day, end)) if end else None,
+        }
+
+    def record_month(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            # 9h present, open punch, leave, 9.5h WFH
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 2), work_status="WFO", **self.punch(date(2026, 3, 2), time(9, 30), time(18, 30)))
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 3), work_status="WFO", **self.punch(date(2026, 3, 3), time(9, 30)))
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 5), work_status="LEAVE")
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 6), work_status="WFH", **self.punch(date(2026, 3, 6), time(9, 30), time(19, 0)))
+
+    def assert_totals(self, summary):
+        self.assertEqual(summary.worked_seconds, 18 * 3600 + 1800)
+        self.assertEqual(summary.expected_seconds, self.WORKING_DAYS * 8 * 3600)
+        self.assertEqual(summary.present_days, 3)
+        self.assertEqual(summary.leave_days, 1)
+        self.assertEqual(summary.wfh_days, 1)
+        # 4 of the working days are covered
+        self.assertEqual(summary.absent_days, self.WORKING_DAYS - 4)
+        self.assertEqual(summary.as_of, date(2026, 3, 31))
+
+    def test_rollup_follows_attendance_saves(self):
+        self.record_month()
+
+        self.assert_totals(MonthlyAttendanceSummary.objects.get(user=self.user, month=self.MONTH))
+
+    def test_endpoint_reports_rollup_and_absent_only_employees(self):
+        self.record_month()
+
+        response = self.client.get("/api/admin/monthly-summary/", {"month": "2026-03"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["expected_hours"], self.WORKING_DAYS * 8)
+        emps = {emp["emp_id"]: emp for emp in response.data["emps"]}
+        self.assertEqual(set(emps), {self.user.id, self.idle.id})
+
+        self.assertEqual(emps[self.user.id]["worked_hours"], 18.5)
+        self.assertEqual(emps[self.user.id]["present_days"], 3)
+        self.assertEqual(emps[self.user.id]["absent_days"], self.WORKING_DAYS - 4)
+
+        # no attendance at all: every working day is absent
+        self.assertEqual(emps[self.idle.id]["worked_hours"], 0)
+        self.assertEqual(emps[self.idle.id]["absent_days"], self.WORKING_DAYS)
+
+    def test_refresh_command_rebuilds_the_month(self):
+        self.record_month()
+        MonthlyAttendanceSummary.objects.all().delete()
+
+        call_command("refresh_monthly_summaries", "--month", "2026-03", stdout=StringIO())
+
+        self.assert_totals(MonthlyAttendanceSummary.objects.get(user=self.user, month=self.MONTH))
+
+    def test_rollup_passes_no_conflict_target_on_mysql(self):
+        # one save runs both the daily and the monthly upsert
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            with self.captureOnCommitCallbacks(execute=True):
+                Attendance.objects.create(user=self.user, date=date(2026, 3, 5), work_status="LEAVE")
+
+        self.assertEqual(MonthlyAttendanceSummary.objects.get(user=self.user, month=self.MONTH).leave_days, 1)
+
+
+# =====================================================
+# GEOFENCE AUDIT (vectorized distances + command)
+# =====================================================
+
+class GeofenceAuditTests(TestCase):
+    """
+    Vectorized Haversine against the scalar one, and the bulk audit
+    flagging a punch outside every active geofence.
+    """
+
+    BRANCH = (28.6068310, 77.432003)
+
+    def setUp(self):
+        # only this branch is audited against
+        Branch.objects.update(is_active=False)
+        Branch.objects.create(name="Audit", latitude=self.BRANCH[0], longitude=self.BRANCH[1], radius_m=300)
+
+        self.user = User.objects.create_user("audit@buzzhire.in", "audit@buzzhire.in", name="Audit")
+
+    def test_distances_match_scalar_haversine(self):
+        points = [(28.5, 77.2), (28.61, 77.43)]
+        branches = [(28.519255, 77.201274), self.BRANCH]
+
+        distances = calculate_distances(
+            [lat for lat, _ in points], [lon for _, lon in points],
+            [lat for lat, _ in branches], [lon for _, lon in branches]
+        )
+
+        self.assertEqual(distances.shape, (2, 2))
+        for i, point in enumerate(points):
+            for j, branch in enumerate(branches):
+                self.assertAlmostEqual(distances[i, j], calculate_distance(*point, *branch), places=6)
+
+    def test_nearest_branch_and_missing_coordinates(self):
+        branch_index, distance = calculate_distances(
+            [28.61, None], [77.43, None], [28.519255, self.BRANCH[0]], [77.201274, self.BRANCH[1]],
+            nearest=True
+        )
+
+        self.assertEqual(list(branch_index), [1, -1])
+        self.assertLess(distance[0], 1000)
+        self.assertTrue(math.isnan(distance[1]))
+
+    def create_attendance(self, day_offset, lat, lon):
+        return Attendance.objects.create(
+            user=self.user, date=date(2026, 3, 2) + timedelta(days=day_offset),
+            punch_in_time=timezone.now(), punch_in_lat=lat, punch_in_lon=lon
+        )
+
+    def run_audit(self):
+        call_command("audit_attendance_geofence", stdout=StringIO())
+
+    def test_command_flags_punches_outside_the_geofence(self):
+        inside = self.create_attendance(0, self.BRANCH[0] + 0.001, self.BRANCH[1])   # ~110 m
+        outside = self.create_attendance(1, self.BRANCH[0] + 0.01, self.BRANCH[1])   # ~1.1 km
+
+        self.run_audit()
+
+        audits = {audit.attendance_id: audit for audit in AttendanceGeoAudit.objects.all()}
+        self.assertFalse(audits[inside.id].is_flagged)
+        self.assertTrue(audits[outside.id].is_flagged)
+        self.assertEqual(audits[outside.id].punch_in_branch, "Audit")
+        self.assertAlmostEqual(audits[outside.id].punch_in_distance, 1112, delta=5)
+        self.assertIsNone(audits[inside.id].punch_out_branch)
+
+        # re-run updates the same rows
+        Attendance.objects.filter(pk=inside.pk).update(punch_in_lat=self.BRANCH[0] + 0.02)
+        self.run_audit()
+
+        self.assertEqual(AttendanceGeoAudit.objects.count(), 2)
+        self.assertTrue(AttendanceGeoAudit.objects.get(attendance=inside).is_flagged)
+
+    def test_command_passes_no_conflict_target_on_mysql(self):
+        self.create_attendance(0, *self.BRANCH)
+
+        with mock.patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            self.run_audit()
+
+        self.assertEqual(AttendanceGeoAudit.objects.filter(is_flagged=False).count(), 1)
+
+
+# =====================================================
+# KEYSET PAGINATION (history lists)
+# =====================================================
+
+class KeysetPaginationTests(TestCase):
+    """
+    Pages walk (created_at, id) newest first: rows sharing a created_at
+    continue on id, nothing is skipped or repeated.
+    """
+
+    URL = "/wfh/my-requests/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("pages@buzzhire.in", "pages@buzzhire.in", name="Pages")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        today = timezone.localdate()
+        wfhs = [WFHRequest.objects.create(user=self.user, date=today + timedelta(days=i)) for i in range(7)]
+
+        # five rows share one timestamp, so page breaks fall inside the tie
+        tie = timezone.now() - timedelta(days=1)
+        WFHRequest.objects.filter(id__in=[wfh.id for wfh in wfhs[1:6]]).update(created_at=tie)
+
+        self.expected = list(
+            WFHRequest.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def get(self, **params):
+        return self.client.get(self.URL, params)
+
+    def test_cursor_round_trip_continues_on_id_within_a_tie(self):
+        seen = []
+        cursor = None
+        pages = 0
+
+        while True:
+            params = {"page_size": 2}
+            if cursor:
+                params["cursor"] = cursor
+
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 200)
+
+            seen.extend(row["wfh_id"] for row in response.data["results"])
+            pages += 1
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 4)
+
+    def test_last_page_has_no_next_cursor(self):
+        response = self.get(page_size=7)
+
+        self.assertEqual(response.data["count"], 7)
+        self.assertIsNone(response.data["next_cursor"])
+        self.assertFalse(response.data["has_more"])
+
+        first = self.get(page_size=6)
+        self.assertTrue(first.data["has_more"])
+
+        last = self.get(page_size=6, cursor=first.data["next_cursor"])
+        self.assertEqual([row["wfh_id"] for row in last.data["results"]], self.expected[6:])
+        self.assertIsNone(last.data["next_cursor"])
+
+    def test_malformed_or_tampered_cursor_is_rejected(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+        for cursor in (
+            "not a cursor!",
+            encode("not json"),
+            encode('{"created_at": "2026-01-01T00:00:00"}'),
+            encode('["yesterday", 5]'),
+            encode('["2026-01-01T00:00:00+05:30", "five"]'),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.get(cursor=cursor)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {"error": "Invalid cursor"})
+
+
+# =====================================================
+# LEAVE SUMMARY (ETag / 304 + cached aggregate)
+# =====================================================
+
+class LeaveSummaryETagTests(TestCase):
+    """
+    The ETag is Max(updated_at) + Count of the user's leave rows: an edit
+    moves the first, a delete of an older row only the second.
+    """
+
+    URL = "/api/employee/leave/summary/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("etag@buzzhire.in", "etag@buzzhire.in", name="ETag")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        today = timezone.localdate()
+        self.older = LeaveRequest.objects.create(
+            user=self.user, start_date=today, end_date=today, total_days=1, reason="older"
+        )
+        self.newer = LeaveRequest.objects.create(
+            user=self.user, start_date=today + timedelta(days=7), end_date=today + timedelta(days=7),
+            total_days=1, reason="newer"
+        )
+
+    def get_etag(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_repeated_if_none_match_gets_empty_304(self):
+        etag = self.get_etag()
+
+        for _ in range(2):
+            response = self.client.get(self.URL, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(response["ETag"], etag)
+
+    def test_etag_changes_when_a_leave_is_updated(self):
+        etag = self.get_etag()
+
+        self.older.reason = "edited"
+        self.older.save()
+
+        response = self.client.get(self.URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_etag_changes_when_an_older_leave_is_deleted(self):
+        etag = self.get_etag()
+
+        # Max(updated_at) stays the newer row's: only the count moves
+        self.older.delete()
+
+        response = self.client.get(self.URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(LEAVE_SUMMARY_LOCAL_CACHE_TIMEOUT=300)
+class LeaveSummaryCacheTests(TestCase):
+    """
+    The per-user aggregate is cached and dropped once a leave row change
+    commits.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("leave-cache@buzzhire.in", "leave-cache@buzzhire.in", name="Leave Cache")
+        self.today = timezone.localdate()
+
+    def test_second_read_is_served_from_cache(self):
+        get_leave_summary(self.user)
+
+        with self.assertNumQueries(0):
+            summary = get_leave_summary(self.user)
+
+        self.assertEqual(summary["leave_stats"]["pending_days"], 0)
+
+    def test_committed_leave_change_invalidates_the_summary(self):
+        get_leave_summary(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            leave = LeaveRequest.objects.create(
+                user=self.user, start_date=self.today, end_date=self.today + timedelta(days=1),
+                total_days=2, reason="trip"
+            )
+            # still cached until the commit
+            self.assertEqual(get_leave_summary(self.user)["leave_stats"]["pending_days"], 0)
+
+        self.assertTrue(callbacks)
+        self.assertEqual(get_leave_summary(self.user)["leave_stats"]["pending_days"], 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            leave.status = "APPROVED"
+            leave.save()
+
+        stats = get_leave_summary(self.user)["leave_stats"]
+        self.assertEqual((stats["pending_days"], stats["approved_days"]), (0, 2))
+
+
+# =====================================================
+# ADMIN ATTENDANCE REPORT (grid + streamed exports)
+# =====================================================
+
+class AttendanceReportGridTests(TestCase):
+    """
+    The rollup-based grid must match the old per-employee, per-day
+    Attendance lookup cell for cell over a fixture month.
+    """
+
+    START = date(2026, 3, 1)
+    END = date(2026, 3, 31)
+    HOLIDAY = date(2026, 3, 4)
+
+    def setUp(self):
+        self.admin = User.objects.create_user("grid-admin@buzzhire.in", "grid-admin@buzzhire.in", name="Admin", is_staff=True)
+        self.user = User.objects.create_user("grid@buzzhire.in", "grid@buzzhire.in", name="Grid")
+        self.absent = User.objects.create_user("grid-absent@buzzhire.in", "grid-absent@buzzhire.in", name="Absent")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyWorkingRules.objects.create(
+                company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+                daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+            )
+            CompanyHoliday.objects.create(name="Holi", date=self.HOLIDAY, holiday_type="FIXED")
+
+            # present, open punch, (holiday), leave, WFH; the 9th is absent
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 2), work_status="WFO", **self.punch(date(2026, 3, 2), time(9, 30), time(18, 30)))
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 3), work_status="WFO", **self.punch(date(2026, 3, 3), time(10, 0)))
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 5), work_status="LEAVE")
+            Attendance.objects.create(user=self.user, date=date(2026, 3, 6), work_status="WFH", **self.punch(date(2026, 3, 6), time(9, 15), time(19, 0)))
+
+    def punch(self, day, start, end=None):
+        return {
+            "punch_in_time": timezone.make_aware(datetime.combine(day, start)),
+            "punch_out_time": timezone.make_aware(datetime.combine(day, end)) if end else None,
+        }
+
+    def legacy_cells(self, employee):
+        # the report before the rollup: one Attendance lookup per day
+        cells = []
+        current_date = self.START
+        while current_date <= self.END:
+            attendance = Attendance.objects.filter(
+                user=employee,
+                punch_in_time__range=(
+                    timezone.make_aware(datetime.combine(current_date, time.min)),
+                    timezone.make_aware(datetime.combine(current_date, time.max)),
+                )
+            ).order_by("-id").first()
+
+            punch_in = punch_out = total_time = None
+            if attendance:
+                if attendance.punch_in_time:
+                    punch_in = timezone.localtime(attendance.punch_in_time)
+                if attendance.punch_out_time:
+                    punch_out = timezone.localtime(attendance.punch_out_time)
+                if punch_in and punch_out:
+                    total_time = seconds_to_hh_mm(int((punch_out - punch_in).total_seconds()))
+
+            cells.append({
+                "date": current_date.isoformat(),
+                "punch_in": punch_in.strftime("%H:%M") if punch_in else None,
+                "punch_out": punch_out.strftime("%H:%M") if punch_out else None,
+                "total_time": total_time,
+            })
+            current_date += timedelta(days=1)
+
+        return cells
+
+    def test_grid_matches_per_day_lookup(self):
+        response = self.client.get(
+            "/api/admin/emp-total-details/",
+            {"start_date": self.START.isoformat(), "end_date": self.END.isoformat()}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        emps = response.data["emps"]
+        self.assertEqual([emp["emp_id"] for emp in emps], [self.user.id, self.absent.id])
+
+        for emp, employee in zip(emps, (self.user, self.absent)):
+            self.assertEqual(emp["employee_name"], employee.name)
+            self.assertEqual(emp["attendance"], self.legacy_cells(employee))
+
+        cells = {cell["date"]: cell for cell in emps[0]["attendance"]}
+        empty = (None, None, None)
+
+        def values(day):
+            cell = cells[day.isoformat()]
+            return cell["punch_in"], cell["punch_out"], cell["total_time"]
+
+        self.assertEqual(values(date(2026, 3, 2)), ("09:30", "18:30", "9:00"))  # present
+        self.assertEqual(values(date(2026, 3, 3)), ("10:00", None, None))       # still punched in
+        self.assertEqual(values(self.HOLIDAY), empty)                           # holiday
+        self.assertEqual(values(date(2026, 3, 5)), empty)                       # leave
+        self.assertEqual(values(date(2026, 3, 6)), ("09:15", "19:00", "9:45"))  # WFH
+        self.assertEqual(values(date(2026, 3, 9)), empty)                       # absent
+        self.assertTrue(all(
+            (cell["punch_in"], cell["punch_out"], cell["total_time"]) == empty
+            for cell in emps[1]["attendance"]
+        ))
+
+
+class AttendanceReportExportTests(TestCase):
+    """
+    ?format=csv / ?format=xlsx stream the same employee x date grid the
+    JSON report returns.
+    """
+
+    PARAMS = {"start_date": "2026-03-02", "end_date": "2026-03-04"}
+
+    def setUp(self):
+        self.admin = User.objects.create_user("report-admin@buzzhire.in", "report-admin@buzzhire.in", name="Admin", is_staff=True)
+        self.user = User.objects.create_user("report@buzzhire.in", "report@buzzhire.in", name="Report, \"Quoted\" & <Co>")
+        self.idle = User.objects.create_user("report-idle@buzzhire.in", "report-idle@buzzhire.in", name="Idle")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyWorkingRules.objects.create(
+                company_name="BuzzHire", working_days=["MON", "TUE", "WED", "THU", "FRI"],
+                daily_work_hours=8, weekly_work_hours=40, monthly_work_hours=176
+            )
+            # closed day, open punch, no row on the 4th
+            Attendance.objects.create(
+                user=self.user, date=date(2026, 3, 2), work_status="WFO",
+                punch_in_time=timezone.make_aware(datetime(2026, 3, 2, 9, 30)),
+                punch_out_time=timezone.make_aware(datetime(2026, 3, 2, 18, 45))
+            )
+            Attendance.objects.create(
+                user=self.user, date=date(2026, 3, 3), work_status="WFO",
+                punch_in_time=timezone.make_aware(datetime(2026, 3, 3, 10, 0))
+            )
+
+    def grid_rows(self):
+        response = self.client.get("/api/admin/emp-total-details/", self.PARAMS)
+        self.assertEqual(response.status_code, 200)
+
+        return [
+            [emp["emp_id"], emp["employee_name"], cell["date"], cell["punch_in"], cell["punch_out"], cell["total_time"]]
+            for emp in response.data["emps"]
+            for cell in emp["attendance"]
+        ]
+
+    def export(self, export_format):
+        response = self.client.get("/api/admin/emp-total-details/", {**self.PARAMS, "format": export_format})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            response["Content-Disposition"],
+            f'attachment; filename="attendance_2026-03-02_2026-03-04.{export_format}"'
+        )
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_matches_json_grid(self):
+        grid = self.grid_rows()
+        self.assertEqual(len(grid), 2 * 3)
+        self.assertEqual(grid[0][3:], ["09:30", "18:45", "9:15"])
+
+        response, content = self.export("csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        header, *rows = csv.reader(io.StringIO(content.decode()))
+        self.assertEqual(header, REPORT_EXPORT_HEADER)
+        # csv writes None as an empty field
+        self.assertEqual(rows, [["" if value is None else str(value) for value in row] for row in grid])
+
+    def test_xlsx_is_a_valid_workbook_matching_json_grid(self):
+        grid = self.grid_rows()
+
+        # one drain per row: every chunk boundary goes through the sink
+        with mock.patch("buzz.utils.report_export.EXPORT_CHUNK_ROWS", 1):
+            response, content = self.export("xlsx")
+
+        self.assertEqual(response["Content-Type"], XLSX_CONTENT_TYPE)
+        with zipfile.ZipFile(io.BytesIO(content)) as workbook:
+            self.assertIsNone(workbook.testzip())
+            self.assertIn("xl/workbook.xml", workbook.namelist())
+            self.assertIn('name="Attendance"', workbook.read("xl/workbook.xml").decode())
+            sheet = ElementTree.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+
+        ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        rows = [
+            [cell.findtext("s:is/s:t", namespaces=ns) or cell.findtext("s:v", namespaces=ns) for cell in row]
+            for row in sheet.iterfind("s:sheetData/s:row", ns)
+        ]
+
+        self.assertEqual(rows[0], REPORT_EXPORT_HEADER)
+        self.assertEqual(rows[1:], [[None if value is None else str(value) for value in row] for row in grid])
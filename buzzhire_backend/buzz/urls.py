@@ -1,5 +1,6 @@
 from django.urls import path
-from .views import PunchInView, PunchOutView, TodayAttendanceView, TotalWorkingTimeView, TotalHoursView, AdminAttendanceReportView, CreateAttendanceRegularizationRequest, AdminCorrectionDetail, AdminApproveRejectCorrection, AdminAttendanceCorrectionList, EmployeeAttendanceCorrectionRequests, EmployeeCancelAttendanceCorrectionRequest, AdminLeaveListView, AdminLeaveActionView, ApplyLeaveView, EmployeeLeaveSummaryView, EmployeeWFHRequestsView, ApplyWFHView, AdminWFHListView, AdminWFHActionView, AdminCompanyWorkingRulesView,AdminCompanyWorkingRulesDetailView, AdminHolidayListCreateView, AdminHolidayDetailView, AdminHolidayOverrideListCreateView, AdminHolidayOverrideDeleteView
+from . import async_views
+from .views import PunchInView, PunchOutView, TodayAttendanceView, TotalWorkingTimeView, AttendanceTimerView, PunchEventView, PunchEventDetailView, TotalHoursView, AdminAttendanceReportView, AdminMonthlyAttendanceView, CreateAttendanceRegularizationRequest, AdminCorrectionDetail, AdminApproveRejectCorrection, AdminCorrectionBulkActionView, AdminAttendanceCorrectionList, EmployeeAttendanceCorrectionRequests, EmployeeCancelAttendanceCorrectionRequest, AdminLeaveListView, AdminLeaveActionView, AdminLeaveBulkActionView, AdminLeaveImportView, ApplyLeaveView, EmployeeLeaveSummaryView, EmployeeWFHRequestsView, ApplyWFHView, AdminWFHListView, AdminWFHActionView, AdminWFHBulkActionView, AdminWFHBatchActionView, AdminCompanyWorkingRulesView,AdminCompanyWorkingRulesDetailView, AdminHolidayListCreateView, AdminHolidayDetailView, AdminHolidayOverrideListCreateView, AdminHolidayOverrideDeleteView, AdminBranchListCreateView, AdminBranchDetailView
 from .views import GoogleAuthView
 
 
@@ -11,8 +12,19 @@ urlpatterns = [
     path("punch-out/", PunchOutView.as_view(), name="punch-out"),
     path("today/", TodayAttendanceView.as_view()),
     path('total-working-time/', TotalWorkingTimeView.as_view()),
+    path("timer/", AttendanceTimerView.as_view(), name="attendance-timer"),
+    path("punch-events/", PunchEventView.as_view(), name="punch-events"),
+    path("punch-events/<str:idempotency_key>/", PunchEventDetailView.as_view(), name="punch-event-detail"),
     path("total-hours/", TotalHoursView.as_view()),
+
+    # Attendence (async, for the ASGI deployment)
+    path("async/punch-in/", async_views.punch_in, name="async-punch-in"),
+    path("async/punch-out/", async_views.punch_out, name="async-punch-out"),
+    path("async/today/", async_views.today_attendance, name="async-today"),
+    path("timer/stream/", async_views.timer_stream, name="attendance-timer-stream"),
+
     path("api/admin/emp-total-details/", AdminAttendanceReportView.as_view(), name = "emps-total-details"),
+    path("api/admin/monthly-summary/", AdminMonthlyAttendanceView.as_view(), name="admin-monthly-summary"),
     path("api/attendance-correction/request/", CreateAttendanceRegularizationRequest.as_view(), name="attendance-correction-request"),
     path(
         "api/attendance-regularization/my-requests/", EmployeeAttendanceCorrectionRequests.as_view(), name="my-attendance-correction-requests",
@@ -28,8 +40,13 @@ urlpatterns = [
     path(
         "api/admin/attendance-regularization/requests/", AdminAttendanceCorrectionList.as_view(), name="admin-attendance-correction-list",
     ),
+    path(
+        "api/admin/attendance-regularization/bulk-action/", AdminCorrectionBulkActionView.as_view(), name="admin-attendance-correction-bulk-action",
+    ),
     path("api/admin/leaves/", AdminLeaveListView.as_view()), # master list of leaves for admin
     path( "api/admin/leaves/<int:leave_id>/action/", AdminLeaveActionView.as_view()),  # admin ke liye leave approve/reject karne,
+    path("api/admin/leaves/bulk-action/", AdminLeaveBulkActionView.as_view()),  # ek saath kai leaves approve/reject
+    path("api/admin/leaves/import/", AdminLeaveImportView.as_view()),  # HR sheet se leaves import
 
     path("api/employee/leave/apply/", ApplyLeaveView.as_view(), name="apply-leave"),
 
@@ -43,6 +60,10 @@ urlpatterns = [
 
     path("wfh/admin/action/<int:wfh_id>/", AdminWFHActionView.as_view(), name="admin-wfh-action"),
 
+    path("wfh/admin/bulk-action/", AdminWFHBulkActionView.as_view(), name="admin-wfh-bulk-action"),
+
+    path("wfh/admin/batch/<uuid:batch_id>/action/", AdminWFHBatchActionView.as_view(), name="admin-wfh-batch-action"),
+
     # Working rules
     path("admin/working-rules/", AdminCompanyWorkingRulesView.as_view()),
     path("admin/working-rules/<int:rule_id>/", AdminCompanyWorkingRulesDetailView.as_view()),
@@ -55,4 +76,8 @@ urlpatterns = [
     path("admin/overrides/", AdminHolidayOverrideListCreateView.as_view()),
     path("admin/overrides/<int:override_id>/", AdminHolidayOverrideDeleteView.as_view()),
 
+    # Branches (punch geofences)
+    path("admin/branches/", AdminBranchListCreateView.as_view()),
+    path("admin/branches/<int:branch_id>/", AdminBranchDetailView.as_view()),
+
 ]
\ No newline at end of file
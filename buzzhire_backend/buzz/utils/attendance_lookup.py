@@ -0,0 +1,56 @@
+from django.utils import timezone
+from buzz.models import Attendance
+
+
+# attribute on the underlying HttpRequest holding {(user_id, date): Attendance | None}
+ATTENDANCE_MEMO_ATTR = "_attendance_memo"
+
+
+def get_request_memo(request):
+    """
+    Per-request attendance memo; shared by the DRF Request and the
+    Django HttpRequest it wraps
+    """
+    http_request = getattr(request, "_request", request)
+
+    memo = getattr(http_request, ATTENDANCE_MEMO_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(http_request, ATTENDANCE_MEMO_ATTR, memo)
+
+    return memo
+
+
+def get_attendance_for_day(request, day=None, user_id=None):
+    """
+    Attendance row of (user, day) looked up through the unique
+    (user, date) index. Defaults to the requesting user and today (IST).
+    Repeated calls within one request hit the memo, not the database.
+    """
+    if day is None:
+        day = timezone.localdate()
+    if user_id is None:
+        user_id = request.user.id
+
+    memo = get_request_memo(request)
+    key = (user_id, day)
+
+    if key not in memo:
+        memo[key] = Attendance.objects.filter(
+            user_id=user_id,
+            date=day
+        ).first()
+
+    return memo[key]
+
+
+def get_today_attendance(request):
+    return get_attendance_for_day(request)
+
+
+def remember_attendance(request, attendance):
+    """
+    Records a row the view just created or changed, so later lookups in
+    the same request see it without another query
+    """
+    get_request_memo(request)[(attendance.user_id, attendance.date)] = attendance
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from buzz.models import DailyAttendanceSummary
+from .attendance_utils import seconds_to_hh_mm
+
+
+def get_report_dates(start_date, end_date):
+    """
+    All dates of the report window (inclusive)
+    """
+    days = (end_date - start_date).days + 1
+    return [start_date + timedelta(days=i) for i in range(days)]
+
+
+def build_attendance_cell(current_date, punch_in_time, punch_out_time, worked_seconds):
+    """
+    One employee-day entry of the admin report, from the daily rollup
+    (local punch times + worked seconds)
+    """
+    return {
+        "date": current_date.isoformat(),
+        "punch_in": punch_in_time.strftime("%H:%M") if punch_in_time else None,
+        "punch_out": punch_out_time.strftime("%H:%M") if punch_out_time else None,
+        "total_time": seconds_to_hh_mm(worked_seconds),
+    }
+
+
+EMPTY_CELL = (None, None, None)
+
+
+def iter_attendance_report(employees, start_date, end_date):
+    """
+    Yields one report entry per employee for the date window.
+
+    Reads only the DailyAttendanceSummary rollup: employees and summary
+    rows are read with one query each; summary rows come back ordered by
+    (user_id, date) and are merged against the employee list, so the
+    employee x date grid is built in a single pass.
+    """
+    dates = get_report_dates(start_date, end_date)
+
+    employee_rows = list(
+        employees.order_by("id").values_list("id", "name")
+    )
+
+    summary_rows = (
+        DailyAttendanceSummary.objects
+        .filter(
+            user_id__in=[emp_id for emp_id, _ in employee_rows],
+            date__range=(start_date, end_date),
+            punch_in_time__isnull=False,
+        )
+        .order_by("user_id", "date")
+        .values_list("user_id", "date", "punch_in_time", "punch_out_time", "worked_seconds")
+        .iterator(chunk_size=2000)
+    )
+
+    pending = next(summary_rows, None)
+
+    for emp_id, emp_name in employee_rows:
+        by_day = {}
+
+        while pending is not None and pending[0] == emp_id:
+            by_day[pending[1]] = pending[2:]
+            pending = next(summary_rows, None)
+
+        attendance = []
+        for current_date in dates:
+            attendance.append(
+                build_attendance_cell(current_date, *by_day.get(current_date, EMPTY_CELL))
+            )
+
+        yield {
+            "emp_id": emp_id,
+            "employee_name": emp_name,
+            "attendance": attendance,
+        }
+
+
+REPORT_EXPORT_HEADER = ["emp_id", "employee_name", "date", "punch_in", "punch_out", "total_time"]
+
+
+def iter_attendance_report_rows(employees, start_date, end_date):
+    """
+    Flat (one row per employee-day) form of the report for exports
+    """
+    for employee in iter_attendance_report(employees, start_date, end_date):
+        for cell in employee["attendance"]:
+            yield (
+                employee["emp_id"],
+                employee["employee_name"],
+                cell["date"],
+                cell["punch_in"],
+                cell["punch_out"],
+                cell["total_time"],
+            )
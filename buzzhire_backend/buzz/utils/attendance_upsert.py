@@ -0,0 +1,135 @@
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.utils import timezone
+from buzz.models import Attendance
+from .conflict_target import get_conflict_target
+from .today_state import write_today_state, invalidate_today_state
+from .daily_summary import sync_daily_summary, refresh_daily_summaries
+
+
+# conflict target of every upsert: the unique (user, date) row
+UPSERT_UNIQUE_FIELDS = ["user", "date"]
+
+
+def get_upsert_fields():
+    return [field for field in Attendance._meta.concrete_fields if not field.primary_key]
+
+
+def build_upsert_sql(update_fields):
+    """
+    One INSERT that updates update_fields when (user, date) exists:
+    ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT DO UPDATE on
+    PostgreSQL / SQLite. Both variants hand back the row id.
+    """
+    quote = connection.ops.quote_name
+    fields = get_upsert_fields()
+    table = quote(Attendance._meta.db_table)
+    pk_column = quote(Attendance._meta.pk.column)
+
+    columns = ", ".join(quote(field.column) for field in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    update_columns = [quote(Attendance._meta.get_field(name).column) for name in update_fields]
+
+    if connection.vendor == "mysql":
+        # id = LAST_INSERT_ID(id) makes lastrowid the existing id on update
+        assignments = [f"{pk_column} = LAST_INSERT_ID({pk_column})"] + [
+            f"{column} = VALUES({column})" for column in update_columns
+        ]
+        return (
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            f"ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+        )
+
+    conflict = ", ".join(
+        quote(Attendance._meta.get_field(name).column) for name in UPSERT_UNIQUE_FIELDS
+    )
+    # a no-op assignment keeps RETURNING working when nothing is updated
+    assignments = [f"{column} = excluded.{column}" for column in update_columns] or [
+        f"{pk_column} = {table}.{pk_column}"
+    ]
+    return (
+        f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT ({conflict}) DO UPDATE SET {', '.join(assignments)} "
+        f"RETURNING {pk_column}"
+    )
+
+
+def upsert_attendance(attendance, update_fields=None):
+    """
+    Inserts the (user, date) row with every field of `attendance`, or -
+    if it already exists - updates only update_fields (None: all of them,
+    like save()). One statement, no prior read, no duplicate-key race.
+    Sets attendance.pk and returns it.
+
+    Raw SQL skips post_save, so the daily rollup and the today-state
+    cache are updated here, once the transaction commits.
+    """
+    fields = get_upsert_fields()
+    if update_fields is None:
+        update_fields = [
+            field.name for field in fields if field.name not in UPSERT_UNIQUE_FIELDS
+        ]
+
+    params = [
+        field.get_db_prep_save(getattr(attendance, field.attname), connection)
+        for field in fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(build_upsert_sql(update_fields), params)
+
+        if connection.vendor == "mysql":
+            attendance.pk = connection.ops.last_insert_id(
+                cursor, Attendance._meta.db_table, Attendance._meta.pk.column
+            )
+        else:
+            attendance.pk = cursor.fetchone()[0]
+
+    attendance._state.adding = False
+    attendance._state.db = connection.alias
+
+    # the instance mirrors the stored row only if every column was written
+    if set(update_fields) >= {field.name for field in fields} - set(UPSERT_UNIQUE_FIELDS):
+        transaction.on_commit(lambda: sync_daily_summary(attendance))
+        transaction.on_commit(lambda: write_today_state(attendance))
+    else:
+        transaction.on_commit(
+            lambda: refresh_daily_summaries([(attendance.user_id, attendance.date)])
+        )
+        transaction.on_commit(lambda: invalidate_today_state(attendance.user_id, attendance.date))
+
+    return attendance
+
+
+async def aupsert_attendance(attendance, update_fields=None):
+    return await sync_to_async(upsert_attendance)(attendance, update_fields)
+
+
+def bulk_upsert_attendance(attendances, update_fields, batch_size=1000):
+    """
+    upsert_attendance for many unsaved (user, date) rows: one multi-row
+    INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT per batch. Row ids
+    are not set.
+    """
+    if not attendances:
+        return 0
+
+    Attendance.objects.bulk_create(
+        attendances,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=get_conflict_target(UPSERT_UNIQUE_FIELDS),
+        update_fields=update_fields,
+    )
+
+    pairs = [(attendance.user_id, attendance.date) for attendance in attendances]
+    transaction.on_commit(lambda: refresh_daily_summaries(pairs))
+
+    today = timezone.localdate()
+    for attendance in attendances:
+        if attendance.date == today:
+            transaction.on_commit(
+                lambda user_id=attendance.user_id: invalidate_today_state(user_id, today)
+            )
+
+    return len(attendances)
@@ -1,28 +1,41 @@
 from datetime import timedelta
 from buzz.models import Attendance
+from .company_calendar import is_working_day
+from .attendance_upsert import bulk_upsert_attendance
 
 
-def mark_leave_attendance(user, start_date, end_date):
+def get_leave_attendance_rows(user_id, start_date, end_date):
     """
-    Leave approve hone par attendance table me LEAVE mark kare
+    Unsaved LEAVE Attendance rows for the working days of a leave
     """
 
+    leave_dates = []
     current_date = start_date
 
     while current_date <= end_date:
+        if is_working_day(current_date):
+            leave_dates.append(current_date)
+        current_date += timedelta(days=1)
 
-        # agar already attendance hai to skip
-        if not Attendance.objects.filter(
-            user_id=user.id,
-            date=current_date
-        ).exists():
-            Attendance.objects.create(
-                user_id=user.id,
-                date=current_date,
-                work_status="LEAVE"
-            )
+    return [
+        Attendance(user_id=user_id, date=leave_date, work_status="LEAVE")
+        for leave_date in leave_dates
+    ]
 
-        current_date += timedelta(days=1)
+
+def mark_leave_attendance(user, start_date, end_date):
+    """
+    Leave approve hone par attendance table me LEAVE mark kare
+
+    Only working days are marked, all in one bulk upsert: existing rows
+    of the range only get work_status flipped, missing days are
+    inserted. Returns the number of days marked.
+    """
+
+    return bulk_upsert_attendance(
+        get_leave_attendance_rows(user.id, start_date, end_date),
+        update_fields=["work_status"]
+    )
 
 
 def seconds_to_hh_mm(total_seconds):
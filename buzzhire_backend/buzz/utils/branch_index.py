@@ -0,0 +1,171 @@
+import math
+import time
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from buzz.models import Branch
+from .distance_utils import EARTH_RADIUS_M, calculate_distance
+from .cache_scope import is_index_stale
+
+
+# Bumped whenever a Branch changes, so every worker process reloads
+# its grid (see buzz/signals.py). That needs a shared cache backend;
+# with LocMemCache the other workers only catch up after
+# BRANCH_INDEX_LOCAL_TTL seconds (see cache_scope.py).
+BRANCH_INDEX_VERSION_CACHE_KEY = "branch_index:version"
+
+# smallest grid cell edge in degrees (~1.1 km of latitude); the grid
+# grows to the widest geofence so each branch lands in a handful of cells
+GRID_CELL_DEGREES = 0.01
+
+# same sphere as the haversine check, so the bounding box never cuts
+# into the geofence
+METERS_PER_DEGREE_LAT = math.radians(EARTH_RADIUS_M)
+
+
+class BranchLocation:
+    """
+    Active branch with its geofence bounding box (degrees)
+    """
+
+    __slots__ = ("id", "name", "lat", "lon", "radius", "min_lat", "max_lat", "min_lon", "max_lon")
+
+    def __init__(self, branch_id, name, lat, lon, radius):
+        self.id = branch_id
+        self.name = name
+        self.lat = lat
+        self.lon = lon
+        self.radius = radius
+
+        lat_delta = radius / METERS_PER_DEGREE_LAT
+        lon_delta = radius / (METERS_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+
+        self.min_lat = lat - lat_delta
+        self.max_lat = lat + lat_delta
+        self.min_lon = lon - lon_delta
+        self.max_lon = lon + lon_delta
+
+    def box_contains(self, lat, lon):
+        return (
+            self.min_lat <= lat <= self.max_lat
+            and self.min_lon <= lon <= self.max_lon
+        )
+
+
+class BranchGridIndex:
+    """
+    Uniform lat/lon grid over branch geofences.
+
+    Every branch is registered in each cell its bounding box touches, so a
+    punch location only has to look at the branches of its own cell:
+    bounding-box prefilter first, exact haversine only for the survivors.
+    """
+
+    def __init__(self, branches, version=None):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.branches = branches
+        self.cells = defaultdict(list)
+        self.cell_degrees = max(
+            [GRID_CELL_DEGREES] + [branch.max_lat - branch.min_lat for branch in branches]
+        )
+
+        for branch in branches:
+            min_cell = self.grid_cell(branch.min_lat, branch.min_lon)
+            max_cell = self.grid_cell(branch.max_lat, branch.max_lon)
+
+            for lat_cell in range(min_cell[0], max_cell[0] + 1):
+                for lon_cell in range(min_cell[1], max_cell[1] + 1):
+                    self.cells[(lat_cell, lon_cell)].append(branch)
+
+    def grid_cell(self, lat, lon):
+        return (
+            math.floor(lat / self.cell_degrees),
+            math.floor(lon / self.cell_degrees),
+        )
+
+    def locate(self, lat, lon):
+        """
+        Closest branch whose geofence contains the point.
+        Returns (branch, distance) or (None, None)
+        """
+        best_branch = None
+        best_distance = None
+
+        for branch in self.cells.get(self.grid_cell(lat, lon), ()):
+            if not branch.box_contains(lat, lon):
+                continue
+
+            distance = calculate_distance(lat, lon, branch.lat, branch.lon)
+            if distance <= branch.radius and (best_distance is None or distance < best_distance):
+                best_branch = branch
+                best_distance = distance
+
+        return best_branch, best_distance
+
+    def nearest(self, lat, lon):
+        """
+        Closest branch regardless of range; only used to explain an
+        out-of-range punch, so a full scan is acceptable here
+        """
+        best_branch = None
+        best_distance = None
+
+        for branch in self.branches:
+            distance = calculate_distance(lat, lon, branch.lat, branch.lon)
+            if best_distance is None or distance < best_distance:
+                best_branch = branch
+                best_distance = distance
+
+        return best_branch, best_distance
+
+
+_branch_index = None
+
+
+def load_branch_index(version=None):
+    branches = [
+        BranchLocation(branch_id, name, lat, lon, radius)
+        for branch_id, name, lat, lon, radius in (
+            Branch.objects
+            .filter(is_active=True)
+            .order_by("id")
+            .values_list("id", "name", "latitude", "longitude", "radius_m")
+        )
+    ]
+    return BranchGridIndex(branches, version)
+
+
+def get_branch_index():
+    """
+    Returns this process's branch grid, reloading it when a branch
+    changed anywhere
+    """
+    global _branch_index
+
+    version = cache.get(BRANCH_INDEX_VERSION_CACHE_KEY)
+    if is_index_stale(_branch_index, version, "BRANCH_INDEX_LOCAL_TTL"):
+        _branch_index = load_branch_index(version)
+
+    return _branch_index
+
+
+async def aget_branch_index():
+    """
+    get_branch_index for async views: the version check uses the async
+    cache API and only a reload goes through a worker thread
+    """
+    global _branch_index
+
+    version = await cache.aget(BRANCH_INDEX_VERSION_CACHE_KEY)
+    if is_index_stale(_branch_index, version, "BRANCH_INDEX_LOCAL_TTL"):
+        _branch_index = await sync_to_async(load_branch_index)(version)
+
+    return _branch_index
+
+
+def invalidate_branch_index():
+    global _branch_index
+
+    _branch_index = None
+    cache.set(BRANCH_INDEX_VERSION_CACHE_KEY, time.time_ns(), None)
@@ -0,0 +1,303 @@
+from datetime import datetime, time
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from buzz.models import Attendance, AttendanceCorrectionRequest, EmployeeLeaveBucket, LeaveRequest, WFHRequest
+from .attendance_upsert import bulk_upsert_attendance
+from .attendance_utils import get_leave_attendance_rows
+from .company_calendar import is_working_day
+from .leave_summary import invalidate_leave_summary
+
+
+DEFAULT_BULK_ACTION_MAX_IDS = 500
+
+BULK_ACTIONS = ("APPROVE", "REJECT")
+
+# fixed WFH punch timings (IST), same as AdminWFHActionView
+WFH_PUNCH_IN = time(9, 30)
+WFH_PUNCH_OUT = time(19, 0)
+
+
+class InvalidBulkAction(ValueError):
+    pass
+
+
+def get_bulk_action_max_ids():
+    return getattr(settings, "BULK_ACTION_MAX_IDS", DEFAULT_BULK_ACTION_MAX_IDS)
+
+
+def parse_bulk_action(data):
+    """
+    (ids, action) from a {"ids": [...], "action": "APPROVE" | "REJECT"}
+    body; ids are de-duplicated, order kept
+    """
+    action = data.get("action")
+    if action not in BULK_ACTIONS:
+        raise InvalidBulkAction("Invalid action. Use APPROVE or REJECT")
+
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids:
+        raise InvalidBulkAction("ids must be a non-empty list")
+
+    try:
+        ids = list(dict.fromkeys(int(i) for i in ids))
+    except (TypeError, ValueError):
+        raise InvalidBulkAction("ids must be integers")
+
+    if len(ids) > get_bulk_action_max_ids():
+        raise InvalidBulkAction(f"At most {get_bulk_action_max_ids()} ids per request")
+
+    return ids, action
+
+
+def item_ok(item_id, item_status, **extra):
+    return {"id": item_id, "ok": True, "status": item_status, **extra}
+
+
+def item_failed(item_id, error):
+    return {"id": item_id, "ok": False, "error": error}
+
+
+def lock_pending(model, ids, results, not_found, related=()):
+    """
+    Locks the requested rows (one query) and returns the PENDING ones in
+    request order; the rest get a failed result
+    """
+    rows = {
+        row.id: row
+        for row in model.objects.select_for_update().select_related(*related).filter(id__in=ids)
+    }
+
+    pending = []
+    for item_id in ids:
+        row = rows.get(item_id)
+        if row is None:
+            results[item_id] = item_failed(item_id, not_found)
+        elif row.status != "PENDING":
+            results[item_id] = item_failed(item_id, "Already processed")
+        else:
+            pending.append(row)
+
+    return pending
+
+
+def bulk_action_response(action, results):
+    """
+    Response body of the bulk action endpoints
+    """
+    processed = sum(1 for result in results if result["ok"])
+    return {
+        "status": "success",
+        "action": action,
+        "processed": processed,
+        "failed": len(results) - processed,
+        "results": results
+    }
+
+
+def set_status(model, ids, new_status, **fields):
+    # update() skips auto_now and signals: updated_at is set here
+    if ids:
+        model.objects.filter(id__in=ids).update(
+            status=new_status, updated_at=timezone.now(), **fields
+        )
+
+
+# ===========================
+# LEAVE
+# ===========================
+
+def bulk_leave_action(ids, action):
+    """
+    Approve / reject many leave requests in one transaction: one locked
+    read of the requests, one of the buckets, one bucket bulk_update,
+    one attendance bulk upsert and one status UPDATE, whatever the batch
+    size. Returns per-item results in request order.
+    """
+    results = {}
+
+    with transaction.atomic():
+        pending = lock_pending(LeaveRequest, ids, results, "Leave request not found")
+
+        if action == "REJECT":
+            set_status(LeaveRequest, [leave.id for leave in pending], "REJECTED")
+            for leave in pending:
+                results[leave.id] = item_ok(leave.id, "REJECTED")
+
+        else:
+            buckets = {
+                bucket.user_id: bucket
+                for bucket in EmployeeLeaveBucket.objects.select_for_update().filter(
+                    user_id__in={leave.user_id for leave in pending}
+                )
+            }
+
+            approved = []
+            attendance_rows = []
+            for leave in pending:
+                bucket = buckets.get(leave.user_id)
+                if bucket is None:
+                    results[leave.id] = item_failed(leave.id, "Leave bucket not found")
+                    continue
+
+                # NO BALANCE BLOCK, remaining can go negative
+                bucket.taken_leave += leave.total_days
+                bucket.remaining_leave -= leave.total_days
+
+                approved.append(leave)
+                attendance_rows.extend(
+                    get_leave_attendance_rows(leave.user_id, leave.start_date, leave.end_date)
+                )
+                results[leave.id] = item_ok(leave.id, "APPROVED", approved_days=leave.total_days)
+
+            changed_buckets = [buckets[user_id] for user_id in {leave.user_id for leave in approved}]
+            now = timezone.now()
+            for bucket in changed_buckets:
+                bucket.updated_at = now
+            EmployeeLeaveBucket.objects.bulk_update(
+                changed_buckets, ["taken_leave", "remaining_leave", "updated_at"]
+            )
+
+            # overlapping leaves of one user would repeat a day
+            attendance_rows = list({
+                (row.user_id, row.date): row for row in attendance_rows
+            }.values())
+            bulk_upsert_attendance(attendance_rows, update_fields=["work_status"])
+
+            set_status(LeaveRequest, [leave.id for leave in approved], "APPROVED")
+
+            for leave in approved:
+                results[leave.id]["remaining_leave"] = buckets[leave.user_id].remaining_leave
+
+        # bulk writes skip the leave_rows_changed signal
+        user_ids = {leave.user_id for leave in pending}
+        transaction.on_commit(lambda: invalidate_leave_summary(*user_ids))
+
+    return [results[item_id] for item_id in ids]
+
+
+# ===========================
+# WFH
+# ===========================
+
+def bulk_wfh_action(ids, action, working_days_only=False):
+    """
+    Approve / reject many WFH requests in one transaction: one locked
+    read, one status UPDATE and (approve) one attendance bulk upsert.
+    working_days_only skips attendance for non-working days (date-range
+    applications).
+    """
+    results = {}
+
+    with transaction.atomic():
+        pending = lock_pending(WFHRequest, ids, results, "WFH request not found")
+        new_status = "APPROVED" if action == "APPROVE" else "REJECTED"
+
+        set_status(WFHRequest, [wfh.id for wfh in pending], new_status)
+
+        if action == "APPROVE":
+            attendance_rows = {
+                (wfh.user_id, wfh.date): Attendance(
+                    user_id=wfh.user_id,
+                    date=wfh.date,
+                    work_status="WFH",
+                    punch_in_time=timezone.make_aware(datetime.combine(wfh.date, WFH_PUNCH_IN)),
+                    punch_out_time=timezone.make_aware(datetime.combine(wfh.date, WFH_PUNCH_OUT)),
+                )
+                for wfh in pending
+                if not working_days_only or is_working_day(wfh.date)
+            }
+            bulk_upsert_attendance(
+                list(attendance_rows.values()),
+                update_fields=["work_status", "punch_in_time", "punch_out_time"]
+            )
+
+        for wfh in pending:
+            results[wfh.id] = item_ok(wfh.id, new_status, attendance_date=wfh.date.isoformat())
+
+    return [results[item_id] for item_id in ids]
+
+
+# ===========================
+# ATTENDANCE CORRECTION
+# ===========================
+
+def apply_correction(attendance, correction):
+    """
+    Same checks as AdminApproveRejectCorrection, applied in memory.
+    Returns None when applied, else the error message.
+    """
+    requested_time = correction.requested_time
+
+    if correction.request_type == "PUNCH_IN":
+        if attendance.punch_out_time and requested_time >= attendance.punch_out_time:
+            return "Punch-in cannot be after punch-out"
+        attendance.punch_in_time = requested_time
+        return None
+
+    if correction.request_type == "PUNCH_OUT":
+        if attendance.punch_in_time is None or requested_time <= attendance.punch_in_time:
+            return "Punch-out cannot be before punch-in"
+        attendance.punch_out_time = requested_time
+        return None
+
+    return "Invalid request type"
+
+
+def bulk_correction_action(ids, action, admin_comment=""):
+    """
+    Approve / reject many attendance corrections in one transaction: one
+    locked read (with attendance), one attendance bulk upsert and one
+    status UPDATE per outcome. Corrections of the same day are applied
+    in id order.
+    """
+    results = {}
+
+    with transaction.atomic():
+        pending = lock_pending(
+            AttendanceCorrectionRequest, ids, results,
+            "Correction request not found", related=["attendance"]
+        )
+
+        if action == "REJECT":
+            set_status(
+                AttendanceCorrectionRequest, [correction.id for correction in pending],
+                "REJECTED", admin_comment=admin_comment
+            )
+            for correction in pending:
+                results[correction.id] = item_ok(correction.id, "REJECTED")
+
+        else:
+            # one in-memory attendance per day, shared by its corrections
+            attendances = {}
+            approved = []
+            changed = set()
+            for correction in sorted(pending, key=lambda correction: correction.id):
+                attendance = attendances.setdefault(correction.attendance_id, correction.attendance)
+
+                error = apply_correction(attendance, correction)
+                if error:
+                    results[correction.id] = item_failed(correction.id, error)
+                else:
+                    approved.append(correction.id)
+                    changed.add(correction.attendance_id)
+                    results[correction.id] = item_ok(correction.id, "APPROVED")
+
+            bulk_upsert_attendance(
+                [
+                    Attendance(
+                        user_id=attendances[attendance_id].user_id,
+                        date=attendances[attendance_id].date,
+                        punch_in_time=attendances[attendance_id].punch_in_time,
+                        punch_out_time=attendances[attendance_id].punch_out_time,
+                    )
+                    for attendance_id in changed
+                ],
+                update_fields=["punch_in_time", "punch_out_time"]
+            )
+
+            set_status(
+                AttendanceCorrectionRequest, approved, "APPROVED", admin_comment=admin_comment
+            )
+
+    return [results[item_id] for item_id in ids]
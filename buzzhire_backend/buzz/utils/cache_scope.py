@@ -0,0 +1,32 @@
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+# a per-process index rebuilt at least this often when the cache cannot
+# carry its version key to the other workers
+DEFAULT_LOCAL_INDEX_TTL = 30
+
+
+def is_process_local_cache():
+    """
+    LocMemCache lives in one worker process: a version bumped there is
+    never seen by the other workers
+    """
+    return isinstance(caches["default"], LocMemCache)
+
+
+def is_index_stale(index, version, ttl_setting):
+    """
+    True when a per-process index must be rebuilt: missing, version
+    bumped, or (process-local cache only) older than its TTL
+    """
+    if index is None or index.version != version:
+        return True
+
+    if is_process_local_cache():
+        ttl = getattr(settings, ttl_setting, DEFAULT_LOCAL_INDEX_TTL)
+        return time.monotonic() - index.loaded_at >= ttl
+
+    return False
@@ -1,5 +1,16 @@
 import datetime
+import time
+from array import array
+from django.core.cache import cache
 from ..models import CompanyWorkingRules, CompanyHoliday, HolidayOverride
+from .cache_scope import is_index_stale
+
+
+# Bumped whenever rules / holidays / overrides change, so every worker
+# process drops its materialized calendar (see buzz/signals.py). That
+# needs a shared cache backend; with LocMemCache the other workers only
+# catch up after COMPANY_CALENDAR_LOCAL_TTL seconds (see cache_scope.py).
+CALENDAR_VERSION_CACHE_KEY = "company_calendar:version"
 
 
 def get_weekday_code(date):
@@ -9,50 +20,26 @@ def get_weekday_code(date):
     return date.strftime("%a").upper()[:3]
 
 
-def is_working_day(date):
+def resolve_working_day(is_weekday_working, has_holiday, override_type):
     """
-    Final authority to decide if a date is a working day or not
+    Final decision tree for a single date, given what the calendar
+    tables say about it
     """
 
-    # 1️⃣ Load company rules (assume single company for now)
-    rules = CompanyWorkingRules.objects.first()
-
-    if not rules:
-        # Safety fallback: if no rules exist, assume working day
-        return True
-
-    weekday_code = get_weekday_code(date)
-
-    # 2️⃣ Check base working rule (Mon-Fri usually)
-    is_weekday_working = weekday_code in rules.working_days
-
-    # 3️⃣ Check if it's a holiday (active only)
-    holiday = CompanyHoliday.objects.filter(
-        date=date,
-        is_active=True
-    ).first()
-
-    # 4️⃣ Check if override exists for this date
-    override = HolidayOverride.objects.filter(date=date).first()
-
-    # ==========================
-    # FINAL DECISION TREE
-    # ==========================
-
     # Case A: Holiday exists and no override → holiday
-    if holiday and not override:
+    if has_holiday and not override_type:
         return False
 
     # Case B: Holiday exists but cancelled → working day
-    if holiday and override and override.override_type == "CANCELLED":
+    if has_holiday and override_type == "CANCELLED":
         return True
 
     # Case C: Weekend but explicitly marked as working day
-    if not is_weekday_working and override and override.override_type == "WORKING_DAY":
+    if not is_weekday_working and override_type == "WORKING_DAY":
         return True
 
     # Case D: Comp-off override
-    if override and override.override_type == "COMP_OFF":
+    if override_type == "COMP_OFF":
         return False
 
     # Case E: Normal weekday
@@ -61,3 +48,238 @@ def is_working_day(date):
 
     # Case F: Normal weekend
     return False
+
+
+class YearCalendar:
+    """
+    Working-day bitmap of one calendar year plus its prefix sums.
+
+    flags[i] is 1 when day i of the year is a working day and
+    prefix[i] is the number of working days before day i, so any
+    range count inside the year is a single subtraction.
+    """
+
+    def __init__(self, year, flags):
+        self.year = year
+        self.first_day = datetime.date(year, 1, 1)
+        self.flags = flags
+
+        self.prefix = array("I", [0])
+        running = 0
+        for flag in flags:
+            running += flag
+            self.prefix.append(running)
+
+    def is_working_day(self, date):
+        return bool(self.flags[(date - self.first_day).days])
+
+    def count_working_days(self, start_date, end_date):
+        start = (start_date - self.first_day).days
+        end = (end_date - self.first_day).days
+        return self.prefix[end + 1] - self.prefix[start]
+
+
+class CompanyCalendarIndex:
+    """
+    Per-process materialized company calendar.
+
+    Rules are loaded once, years are built lazily (two queries each)
+    and kept until the calendar version changes.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.rules = CompanyWorkingRules.objects.first()
+        self.years = {}
+
+    def get_year(self, year):
+        year_calendar = self.years.get(year)
+        if year_calendar is None:
+            year_calendar = self.build_year(year)
+            self.years[year] = year_calendar
+        return year_calendar
+
+    def build_year(self, year):
+        first_day = datetime.date(year, 1, 1)
+        last_day = datetime.date(year, 12, 31)
+        days = (last_day - first_day).days + 1
+
+        if not self.rules:
+            # Safety fallback: if no rules exist, assume working day
+            return YearCalendar(year, bytearray([1]) * days)
+
+        holiday_dates = set(
+            CompanyHoliday.objects.filter(
+                date__range=(first_day, last_day),
+                is_active=True
+            ).values_list("date", flat=True)
+        )
+
+        # same as HolidayOverride.objects.filter(date=...).first()
+        override_types = {}
+        for override_date, override_type in (
+            HolidayOverride.objects
+            .filter(date__range=(first_day, last_day))
+            .order_by("id")
+            .values_list("date", "override_type")
+        ):
+            override_types.setdefault(override_date, override_type)
+
+        working_weekdays = set(self.rules.working_days)
+
+        flags = bytearray(days)
+        for offset in range(days):
+            date = first_day + datetime.timedelta(days=offset)
+            flags[offset] = resolve_working_day(
+                get_weekday_code(date) in working_weekdays,
+                date in holiday_dates,
+                override_types.get(date),
+            )
+
+        return YearCalendar(year, flags)
+
+
+_calendar_index = None
+
+
+def get_calendar_index():
+    """
+    Returns the calendar index for this process, rebuilding it when
+    another process (or this one) invalidated the calendar
+    """
+    global _calendar_index
+
+    version = cache.get(CALENDAR_VERSION_CACHE_KEY)
+    if is_index_stale(_calendar_index, version, "COMPANY_CALENDAR_LOCAL_TTL"):
+        _calendar_index = CompanyCalendarIndex(version)
+
+    return _calendar_index
+
+
+def invalidate_company_calendar():
+    """
+    Drops the materialized calendar in this process, and in every
+    other one when the cache is shared
+    """
+    global _calendar_index
+
+    _calendar_index = None
+    cache.set(CALENDAR_VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+def is_working_day(date):
+    """
+    Final authority to decide if a date is a working day or not
+    """
+    return get_calendar_index().get_year(date.year).is_working_day(date)
+
+
+def count_working_days(start_date, end_date):
+    """
+    Number of working days between two dates (inclusive)
+    """
+    if start_date > end_date:
+        return 0
+
+    index = get_calendar_index()
+    total = 0
+
+    for year in range(start_date.year, end_date.year + 1):
+        total += index.get_year(year).count_working_days(
+            max(start_date, datetime.date(year, 1, 1)),
+            min(end_date, datetime.date(year, 12, 31)),
+        )
+
+    return total
+
+
+def get_working_dates(start_date, end_date):
+    """
+    Working dates between two dates (inclusive), in order
+    """
+    return [
+        day
+        for day in (
+            start_date + datetime.timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+        )
+        if is_working_day(day)
+    ]
+
+
+def get_working_day_prefix(start_date, end_date):
+    """
+    Cumulative working-day counts over [start_date, end_date].
+
+    prefix[i] is the number of working days before start_date + i days,
+    so the count for any sub-range [a, b] is
+    prefix[b - start + 1] - prefix[a - start].
+    """
+    index = get_calendar_index()
+    # stdlib array: the calendar path does not need NumPy (which the
+    # project only uses for the geofence audit)
+    prefix = array("I", [0])
+    running = 0
+
+    for year in range(start_date.year, end_date.year + 1):
+        year_calendar = index.get_year(year)
+        first = (max(start_date, datetime.date(year, 1, 1)) - year_calendar.first_day).days
+        last = (min(end_date, datetime.date(year, 12, 31)) - year_calendar.first_day).days
+
+        for flag in year_calendar.flags[first:last + 1]:
+            running += flag
+            prefix.append(running)
+
+    return prefix
+
+
+def get_daily_work_seconds():
+    """
+    Expected seconds of work for one working day, from company rules
+    """
+    rules = get_calendar_index().rules
+
+    if not rules:
+        raise ValueError("No daily work hours are mentioned")
+
+    return int(float(rules.daily_work_hours) * 3600)   # 9.5 → 34200 seconds
+
+
+def get_monthly_work_hours():
+    """
+    Contracted monthly hours from company rules (None if no rules yet)
+    """
+    rules = get_calendar_index().rules
+    return float(rules.monthly_work_hours) if rules else None
+
+
+def get_expected_work_seconds_bulk(ranges):
+    """
+    Expected working seconds for many (start_date, end_date) ranges
+    (inclusive) at once.
+
+    One working-day prefix array is built over the union of all ranges
+    and every range is answered with a single subtraction.
+    """
+    ranges = list(ranges)
+    if not ranges:
+        return []
+
+    for start_date, end_date in ranges:
+        if start_date > end_date:
+            raise ValueError("start_date cannot be greater than end_date")
+
+    daily_seconds = get_daily_work_seconds()
+
+    span_start = min(start_date for start_date, _ in ranges)
+    span_end = max(end_date for _, end_date in ranges)
+    prefix = get_working_day_prefix(span_start, span_end)
+
+    return [
+        (
+            prefix[(end_date - span_start).days + 1]
+            - prefix[(start_date - span_start).days]
+        ) * daily_seconds
+        for start_date, end_date in ranges
+    ]
@@ -0,0 +1,13 @@
+from django.db import connection
+
+
+def get_conflict_target(unique_fields):
+    """
+    unique_fields for bulk_create(update_conflicts=True), or None on
+    backends without a conflict target: MySQL's ON DUPLICATE KEY UPDATE
+    fires on the table's unique key by itself, and Django raises
+    NotSupportedError there if unique_fields is passed
+    """
+    if connection.features.supports_update_conflicts_with_target:
+        return unique_fields
+    return None
@@ -0,0 +1,194 @@
+from collections import defaultdict
+from django.db.models import Q
+from django.utils import timezone
+from buzz.models import Attendance, DailyAttendanceSummary
+from .company_calendar import get_daily_work_seconds, get_working_day_prefix
+from .conflict_target import get_conflict_target
+from .monthly_summary import iter_months, refresh_monthly_summaries, refresh_months
+
+
+SUMMARY_UPDATE_FIELDS = [
+    "punch_in_time",
+    "punch_out_time",
+    "worked_seconds",
+    "expected_seconds",
+    "work_status",
+    "branch_name",
+    "updated_at",
+]
+
+ATTENDANCE_SUMMARY_COLUMNS = (
+    "user_id", "date", "punch_in_time", "punch_out_time", "work_status", "branch_name"
+)
+
+
+def get_expected_seconds_by_date(dates):
+    """
+    {date: expected seconds} for the given dates, from one calendar pass
+    """
+    dates = set(dates)
+    if not dates:
+        return {}
+
+    try:
+        daily_seconds = get_daily_work_seconds()
+    except ValueError:
+        # no company rules yet: nothing is expected
+        return dict.fromkeys(dates, 0)
+
+    span_start = min(dates)
+    prefix = get_working_day_prefix(span_start, max(dates))
+
+    expected = {}
+    for day in dates:
+        offset = (day - span_start).days
+        is_working = prefix[offset + 1] - prefix[offset]
+        expected[day] = daily_seconds if is_working else 0
+
+    return expected
+
+
+def build_summary(user_id, day, punch_in, punch_out, work_status, branch_name, expected_seconds):
+    local_in = timezone.localtime(punch_in) if punch_in else None
+    local_out = timezone.localtime(punch_out) if punch_out else None
+
+    worked_seconds = None
+    if punch_in and punch_out:
+        worked_seconds = int((punch_out - punch_in).total_seconds())
+
+    return DailyAttendanceSummary(
+        user_id=user_id,
+        date=day,
+        punch_in_time=local_in.time().replace(microsecond=0) if local_in else None,
+        punch_out_time=local_out.time().replace(microsecond=0) if local_out else None,
+        worked_seconds=worked_seconds,
+        expected_seconds=expected_seconds,
+        work_status=work_status,
+        branch_name=branch_name,
+        updated_at=timezone.now(),
+    )
+
+
+def save_summaries(summaries, batch_size=1000):
+    DailyAttendanceSummary.objects.bulk_create(
+        summaries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=get_conflict_target(["user", "date"]),
+        update_fields=SUMMARY_UPDATE_FIELDS,
+    )
+
+
+def summarize_attendance_rows(rows):
+    """
+    Summary objects for values_list(*ATTENDANCE_SUMMARY_COLUMNS) rows
+    """
+    rows = [row for row in rows if row[1] is not None]
+    expected = get_expected_seconds_by_date(row[1] for row in rows)
+
+    return [
+        build_summary(user_id, day, punch_in, punch_out, work_status, branch_name, expected[day])
+        for user_id, day, punch_in, punch_out, work_status, branch_name in rows
+    ]
+
+
+def sync_daily_summary(attendance):
+    """
+    Rollup row of one Attendance instance that mirrors the stored row
+    (after save()): no read, one upsert, plus its month
+    """
+    if attendance.date is None:
+        return
+
+    save_summaries(summarize_attendance_rows([
+        tuple(getattr(attendance, column) for column in ATTENDANCE_SUMMARY_COLUMNS)
+    ]))
+    refresh_monthly_summaries([(attendance.user_id, attendance.date)])
+
+
+def refresh_daily_summaries(pairs):
+    """
+    Re-derives the rollup rows of (user_id, date) pairs from Attendance:
+    one read, one bulk upsert, one delete for rows that no longer exist,
+    plus the months they fall in
+    """
+    by_user = defaultdict(set)
+    for user_id, day in pairs:
+        if day is not None:
+            by_user[user_id].add(day)
+
+    if not by_user:
+        return
+
+    condition = Q()
+    for user_id, days in by_user.items():
+        condition |= Q(user_id=user_id, date__in=days)
+
+    rows = list(
+        Attendance.objects.filter(condition).values_list(*ATTENDANCE_SUMMARY_COLUMNS)
+    )
+    save_summaries(summarize_attendance_rows(rows))
+
+    found = {(row[0], row[1]) for row in rows}
+    missing = Q()
+    for user_id, days in by_user.items():
+        gone = [day for day in days if (user_id, day) not in found]
+        if gone:
+            missing |= Q(user_id=user_id, date__in=gone)
+
+    if missing:
+        DailyAttendanceSummary.objects.filter(missing).delete()
+
+    refresh_monthly_summaries(
+        (user_id, day) for user_id, days in by_user.items() for day in days
+    )
+
+
+def delete_daily_summary(user_id, day):
+    DailyAttendanceSummary.objects.filter(user_id=user_id, date=day).delete()
+    refresh_monthly_summaries([(user_id, day)])
+
+
+def refresh_expected_seconds(start_date=None, end_date=None, chunk_size=500):
+    """
+    Re-applies the company calendar to expected_seconds, one UPDATE per
+    value per chunk of dates; dates already right are not written.
+    Returns the dates that changed.
+    """
+    summaries = DailyAttendanceSummary.objects.all()
+    if start_date:
+        summaries = summaries.filter(date__gte=start_date)
+    if end_date:
+        summaries = summaries.filter(date__lte=end_date)
+
+    stored = defaultdict(set)
+    for day, value in summaries.order_by().values_list("date", "expected_seconds").distinct():
+        stored[day].add(value)
+
+    expected = get_expected_seconds_by_date(stored)
+    dates = sorted(day for day, values in stored.items() if values != {expected[day]})
+
+    for i in range(0, len(dates), chunk_size):
+        by_value = defaultdict(list)
+        for day in dates[i:i + chunk_size]:
+            by_value[expected[day]].append(day)
+
+        for value, days in by_value.items():
+            DailyAttendanceSummary.objects.filter(date__in=days).update(expected_seconds=value)
+
+    return dates
+
+
+def refresh_calendar_change(ranges):
+    """
+    After a rules / holiday change: expected_seconds of the daily rows in
+    the (start, end) ranges, then the monthly rows of the months those
+    ranges touch - month totals and absent days move even when no daily
+    row did
+    """
+    for start_date, end_date in ranges:
+        refresh_expected_seconds(start_date, end_date)
+
+    return refresh_months(
+        month for start_date, end_date in ranges for month in iter_months(start_date, end_date)
+    )
@@ -1,11 +1,15 @@
 import math
+import numpy as np
+
+EARTH_RADIUS_M = 6371000  # Earth radius in meters
+
 
 def calculate_distance(lat1, lon1, lat2, lon2):
     """
     Calculate distance between two lat/lon coordinates using Haversine formula.
     Returns distance in meters.
     """
-    R = 6371000  # Earth radius in meters
+    R = EARTH_RADIUS_M
 
     phi1 = math.radians(lat1)
     phi2 = math.radians(lat2)
@@ -21,3 +25,52 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
     return R * c
+
+
+def calculate_distances(lats, lons, branch_lats, branch_lons, nearest=False):
+    """
+    Vectorized Haversine between many points and many branches.
+
+    Returns the full (points x branches) distance matrix in meters, or with
+    nearest=True a tuple (branch_index, distance) of arrays with the
+    closest branch per point. Missing coordinates (None / NaN) give NaN
+    distances and branch_index -1.
+    """
+    phi1 = np.radians(np.asarray(lats, dtype=float))[:, np.newaxis]
+    lambda1 = np.radians(np.asarray(lons, dtype=float))[:, np.newaxis]
+    phi2 = np.radians(np.asarray(branch_lats, dtype=float))[np.newaxis, :]
+    lambda2 = np.radians(np.asarray(branch_lons, dtype=float))[np.newaxis, :]
+
+    a = (
+        np.sin((phi2 - phi1) / 2) ** 2 +
+        np.cos(phi1) * np.cos(phi2) *
+        np.sin((lambda2 - lambda1) / 2) ** 2
+    )
+
+    distances = EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    if not nearest:
+        return distances
+
+    return nearest_branches(distances)
+
+
+def nearest_branches(distances):
+    """
+    Closest branch per row of a distance matrix: (branch_index, distance)
+    """
+    rows = distances.shape[0]
+
+    if distances.shape[1] == 0:
+        return np.full(rows, -1), np.full(rows, np.nan)
+
+    safe = np.where(np.isnan(distances), np.inf, distances)
+    branch_index = safe.argmin(axis=1)
+    nearest_distance = safe[np.arange(rows), branch_index]
+
+    missing = np.isinf(nearest_distance)
+
+    return (
+        np.where(missing, -1, branch_index),
+        np.where(missing, np.nan, nearest_distance),
+    )
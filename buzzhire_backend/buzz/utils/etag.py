@@ -0,0 +1,44 @@
+import hashlib
+from django.db.models import Count, Max
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def get_history_etag(request, queryset, *extra):
+    """
+    ETag for a user's history list: changes when a row is added, edited
+    (updated_at) or removed (count), and differs per page / query string.
+    Costs one aggregate query, nothing is serialized.
+    """
+    version = queryset.order_by().aggregate(
+        latest=Max("updated_at"),
+        total=Count("id"),
+    )
+
+    parts = (
+        request.user.id,
+        request.get_full_path(),
+        version["latest"].isoformat() if version["latest"] else None,
+        version["total"],
+        *extra,
+    )
+    return '"' + hashlib.sha1(repr(parts).encode()).hexdigest() + '"'
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # weak and strong validators compare the same for GET
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def not_modified(etag):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response["ETag"] = etag
+    return response
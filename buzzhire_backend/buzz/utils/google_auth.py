@@ -0,0 +1,171 @@
+import re
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.conf import settings
+from django.utils.module_loading import import_string
+from google.auth import exceptions as google_exceptions
+from google.auth import jwt as google_jwt
+
+
+GOOGLE_OAUTH2_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+
+# used when Google sends no usable Cache-Control header
+DEFAULT_CERTS_MAX_AGE = 300
+
+CERTS_FETCH_TIMEOUT = 5  # seconds
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """
+    Process-wide requests session: keeps TLS connections to Google
+    alive between logins and retries transient failures
+    """
+    global _http_session
+
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=16,
+                    max_retries=Retry(
+                        total=2,
+                        backoff_factor=0.2,
+                        status_forcelist=[500, 502, 503, 504],
+                        allowed_methods=["GET"],
+                    ),
+                )
+                session.mount("https://", adapter)
+                _http_session = session
+
+    return _http_session
+
+
+def get_max_age(response):
+    """
+    Seconds the certificate response may be cached for
+    (Cache-Control max-age minus Age)
+    """
+    match = MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+    if not match:
+        return DEFAULT_CERTS_MAX_AGE
+
+    try:
+        age = int(response.headers.get("Age", 0))
+    except ValueError:
+        age = 0
+
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleCertProvider:
+    """
+    Google's token signing certificates, fetched over the pooled session
+    and cached for as long as Cache-Control allows. If a refresh fails
+    the previous certificates keep being served, so a network blip does
+    not turn into failed logins.
+    """
+
+    def __init__(self, certs_url=GOOGLE_OAUTH2_CERTS_URL):
+        self.certs_url = certs_url
+        self.certs = None
+        self.expires_at = 0
+        self.lock = threading.Lock()
+
+    def get_certs(self):
+        if self.certs is not None and time.monotonic() < self.expires_at:
+            return self.certs
+
+        with self.lock:
+            # another thread may have refreshed while we waited
+            if self.certs is not None and time.monotonic() < self.expires_at:
+                return self.certs
+
+            try:
+                response = get_http_session().get(self.certs_url, timeout=CERTS_FETCH_TIMEOUT)
+                response.raise_for_status()
+                certs = response.json()
+            except (requests.RequestException, ValueError) as e:
+                if self.certs is not None:
+                    return self.certs
+                raise google_exceptions.TransportError(
+                    f"Could not fetch certificates at {self.certs_url}: {e}"
+                ) from e
+
+            self.certs = certs
+            self.expires_at = time.monotonic() + get_max_age(response)
+
+            return self.certs
+
+
+class StaticCertProvider:
+    """
+    Fixed {key id: certificate / public key} mapping. Lets tests and
+    offline setups verify tokens without any network access.
+    """
+
+    def __init__(self, certs=None):
+        self.certs = certs if certs is not None else getattr(settings, "GOOGLE_STATIC_CERTS", {})
+
+    def get_certs(self):
+        return self.certs
+
+
+_cert_provider = None
+
+
+def get_cert_provider():
+    """
+    Provider configured by settings.GOOGLE_CERT_PROVIDER (dotted path),
+    GoogleCertProvider by default
+    """
+    global _cert_provider
+
+    if _cert_provider is None:
+        provider_path = getattr(
+            settings,
+            "GOOGLE_CERT_PROVIDER",
+            "buzz.utils.google_auth.GoogleCertProvider"
+        )
+        _cert_provider = import_string(provider_path)()
+
+    return _cert_provider
+
+
+def set_cert_provider(provider):
+    """
+    Replaces the process-wide provider (None resets to the configured one)
+    """
+    global _cert_provider
+    _cert_provider = provider
+
+
+def verify_google_id_token(token, audience, clock_skew_in_seconds=0):
+    """
+    Same checks as google.oauth2.id_token.verify_oauth2_token, with
+    certificates coming from the cached provider
+    """
+    info = google_jwt.decode(
+        token,
+        certs=get_cert_provider().get_certs(),
+        audience=audience,
+        clock_skew_in_seconds=clock_skew_in_seconds
+    )
+
+    if info.get("iss") not in GOOGLE_ISSUERS:
+        raise google_exceptions.GoogleAuthError(
+            f"Wrong issuer. 'iss' should be one of the following: {GOOGLE_ISSUERS}"
+        )
+
+    return info
@@ -0,0 +1,64 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+
+class IntervalSet:
+    """
+    Closed date intervals [start, end] of one user, kept sorted and
+    merged, so "does [a, b] overlap anything?" is one binary search
+    however long the history is.
+    """
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(intervals):
+            self._append(start, end)
+
+    def _append(self, start, end):
+        # only used while building from sorted input
+        if self.ends and start <= self.ends[-1]:
+            self.ends[-1] = max(self.ends[-1], end)
+        else:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def overlaps(self, start, end):
+        # last interval starting on or before `end` is the only candidate
+        i = bisect_right(self.starts, end) - 1
+        return i >= 0 and self.ends[i] >= start
+
+    def add(self, start, end):
+        """
+        Inserts [start, end], merging every interval it touches
+        """
+        # merged intervals are disjoint, so ends are sorted too
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+
+def build_interval_sets(rows):
+    """
+    {user_id: IntervalSet} from (user_id, start, end) rows
+    """
+    by_user = defaultdict(list)
+    for user_id, start, end in rows:
+        by_user[user_id].append((start, end))
+
+    return defaultdict(
+        IntervalSet,
+        {user_id: IntervalSet(intervals) for user_id, intervals in by_user.items()}
+    )
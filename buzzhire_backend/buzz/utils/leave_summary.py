@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from buzz.models import EmployeeLeaveBucket, LeaveRequest
+from .cache_scope import is_process_local_cache
+
+
+LEAVE_SUMMARY_CACHE_KEY = "leave_summary:{user_id}"
+
+LEAVE_STATS_STATUSES = (
+    ("approved_days", "APPROVED"),
+    ("pending_days", "PENDING"),
+    ("rejected_days", "REJECTED"),
+    ("cancelled_days", "CANCELLED"),
+)
+
+
+DEFAULT_LEAVE_SUMMARY_TIMEOUT = 300
+
+# LocMemCache lives in one process: an approval handled by another
+# worker never invalidates it, so entries there may only be a few
+# seconds stale
+PROCESS_LOCAL_LEAVE_SUMMARY_TIMEOUT = 5
+
+
+def get_leave_summary_timeout():
+    """
+    settings.LEAVE_SUMMARY_CACHE_TIMEOUT (seconds, shared cache) or
+    LEAVE_SUMMARY_LOCAL_CACHE_TIMEOUT (LocMemCache); 0 / None turns the
+    per-user cache off
+    """
+    if is_process_local_cache():
+        return getattr(settings, "LEAVE_SUMMARY_LOCAL_CACHE_TIMEOUT", PROCESS_LOCAL_LEAVE_SUMMARY_TIMEOUT)
+    return getattr(settings, "LEAVE_SUMMARY_CACHE_TIMEOUT", DEFAULT_LEAVE_SUMMARY_TIMEOUT)
+
+
+def build_leave_summary(user):
+    """
+    Bucket balance plus per-status day totals; the totals come from one
+    conditional-aggregation query
+    """
+    leave_bucket, _ = EmployeeLeaveBucket.objects.get_or_create(
+        user=user
+    )
+
+    leave_stats = LeaveRequest.objects.filter(user=user).aggregate(**{
+        name: Coalesce(Sum("total_days", filter=Q(status=leave_status)), 0)
+        for name, leave_status in LEAVE_STATS_STATUSES
+    })
+
+    return {
+        "leave_summary": {
+            "total_leave": leave_bucket.total_leave,
+            "taken_leave": leave_bucket.taken_leave,
+            "remaining_leave": leave_bucket.remaining_leave,
+        },
+        "leave_stats": {
+            name: leave_stats[name] for name, _ in LEAVE_STATS_STATUSES
+        },
+    }
+
+
+def get_leave_summary(user):
+    """
+    Cached per user until one of their LeaveRequest / EmployeeLeaveBucket
+    rows changes (see buzz/signals.py)
+    """
+    timeout = get_leave_summary_timeout()
+    if not timeout:
+        return build_leave_summary(user)
+
+    key = LEAVE_SUMMARY_CACHE_KEY.format(user_id=user.id)
+    summary = cache.get(key)
+
+    if summary is None:
+        summary = build_leave_summary(user)
+        cache.set(key, summary, timeout)
+
+    return summary
+
+
+def invalidate_leave_summary(*user_ids):
+    cache.delete_many([
+        LEAVE_SUMMARY_CACHE_KEY.format(user_id=user_id) for user_id in user_ids
+    ])
@@ -0,0 +1,164 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from buzz.models import DailyAttendanceSummary, MonthlyAttendanceSummary
+from .company_calendar import count_working_days, get_expected_work_seconds_bulk
+from .conflict_target import get_conflict_target
+
+
+MONTHLY_UPDATE_FIELDS = [
+    "worked_seconds",
+    "expected_seconds",
+    "present_days",
+    "leave_days",
+    "wfh_days",
+    "absent_days",
+    "as_of",
+    "updated_at",
+]
+
+# a day with any of these is not absent
+COVERED_DAY = (
+    Q(punch_in_time__isnull=False)
+    | Q(work_status__in=["LEAVE", "WFH"])
+)
+
+
+def get_month_start(day):
+    return day.replace(day=1)
+
+
+def get_month_end(month):
+    return month.replace(day=calendar.monthrange(month.year, month.month)[1])
+
+
+def iter_months(start_date, end_date):
+    """
+    First day of every month from start_date's through end_date's
+    """
+    month = get_month_start(start_date)
+    while month <= end_date:
+        yield month
+        month = get_month_end(month) + timedelta(days=1)
+
+
+def get_month_as_of(month):
+    """
+    Last day absent days are counted through: the month end, or today
+    for the running month
+    """
+    return min(get_month_end(month), timezone.localdate())
+
+
+def get_month_expected_seconds(month):
+    try:
+        return get_expected_work_seconds_bulk([(month, get_month_end(month))])[0]
+    except ValueError:
+        # no company rules yet: nothing is expected
+        return 0
+
+
+def get_elapsed_working_days(month):
+    as_of = get_month_as_of(month)
+    if as_of < month:
+        return 0
+    return count_working_days(month, as_of)
+
+
+def refresh_monthly_summaries(pairs):
+    """
+    Re-aggregates the monthly rows of (user_id, month) pairs from the
+    daily rollup: per month, one grouped aggregate, one bulk upsert and
+    one delete for users left without daily rows
+    """
+    by_month = defaultdict(set)
+    for user_id, day in pairs:
+        if day is not None:
+            by_month[get_month_start(day)].add(user_id)
+
+    for month, user_ids in by_month.items():
+        as_of = get_month_as_of(month)
+        expected_seconds = get_month_expected_seconds(month)
+        elapsed_working_days = get_elapsed_working_days(month)
+
+        rows = (
+            DailyAttendanceSummary.objects
+            .filter(user_id__in=user_ids, date__range=(month, get_month_end(month)))
+            .values("user_id")
+            .annotate(
+                worked=Coalesce(Sum("worked_seconds"), 0),
+                present=Count("id", filter=Q(punch_in_time__isnull=False)),
+                leave=Count("id", filter=Q(work_status="LEAVE")),
+                wfh=Count("id", filter=Q(work_status="WFH")),
+                # working days (expected_seconds > 0) covered so far
+                covered=Count("id", filter=COVERED_DAY & Q(expected_seconds__gt=0, date__lte=as_of)),
+            )
+            .order_by()
+        )
+
+        now = timezone.now()
+        summaries = [
+            MonthlyAttendanceSummary(
+                user_id=row["user_id"],
+                month=month,
+                worked_seconds=row["worked"],
+                expected_seconds=expected_seconds,
+                present_days=row["present"],
+                leave_days=row["leave"],
+                wfh_days=row["wfh"],
+                absent_days=max(elapsed_working_days - row["covered"], 0),
+                as_of=as_of,
+                updated_at=now,
+            )
+            for row in rows
+        ]
+
+        MonthlyAttendanceSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=get_conflict_target(["user", "month"]),
+            update_fields=MONTHLY_UPDATE_FIELDS,
+        )
+
+        gone = user_ids - {summary.user_id for summary in summaries}
+        if gone:
+            MonthlyAttendanceSummary.objects.filter(user_id__in=gone, month=month).delete()
+
+
+def refresh_months(months):
+    """
+    refresh_monthly_summaries for every user with daily rows in the given
+    months (calendar change, nightly roll of the running month)
+    """
+    pairs = []
+    for month in {get_month_start(month) for month in months}:
+        user_ids = (
+            DailyAttendanceSummary.objects
+            .filter(date__range=(month, get_month_end(month)))
+            .order_by()
+            .values_list("user_id", flat=True)
+            .distinct()
+        )
+        stale_ids = (
+            MonthlyAttendanceSummary.objects
+            .filter(month=month)
+            .values_list("user_id", flat=True)
+        )
+        pairs.extend((user_id, month) for user_id in {*user_ids, *stale_ids})
+
+    refresh_monthly_summaries(pairs)
+    return len(pairs)
+
+
+def parse_month(value):
+    """
+    "YYYY-MM" -> first day of that month, None if invalid
+    """
+    try:
+        year, month = (int(part) for part in value.split("-"))
+        return date(year, month, 1)
+    except (AttributeError, TypeError, ValueError):
+        return None
@@ -0,0 +1,120 @@
+import base64
+import json
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# approx_total stops counting here, so it never turns into a full COUNT(*)
+APPROX_TOTAL_LIMIT = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id):
+    payload = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def get_page_size(request):
+    default = getattr(settings, "KEYSET_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    maximum = getattr(settings, "KEYSET_MAX_PAGE_SIZE", MAX_PAGE_SIZE)
+
+    try:
+        page_size = int(request.query_params.get("page_size", default))
+    except (TypeError, ValueError):
+        page_size = default
+
+    return min(max(page_size, 1), maximum)
+
+
+class KeysetPage:
+    """
+    One page of a newest-first list, keyed on (created_at, id)
+    """
+
+    def __init__(self, rows, page_size, next_cursor, approx_total=None):
+        self.rows = rows
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.approx_total = approx_total
+
+    def meta(self):
+        meta = {
+            "page_size": self.page_size,
+            "next_cursor": self.next_cursor,
+            "has_more": self.next_cursor is not None,
+        }
+
+        if self.approx_total is not None:
+            total, is_exact = self.approx_total
+            meta["approx_total"] = total
+            meta["total_is_exact"] = is_exact
+
+        return meta
+
+
+def get_approx_total(queryset):
+    """
+    COUNT over at most APPROX_TOTAL_LIMIT + 1 rows: exact for small
+    lists, a lower bound ("1000+") for big ones
+    """
+    limit = getattr(settings, "KEYSET_APPROX_TOTAL_LIMIT", APPROX_TOTAL_LIMIT)
+    total = queryset.order_by()[:limit + 1].count()
+
+    if total > limit:
+        return limit, False
+    return total, True
+
+
+def paginate_keyset(request, queryset):
+    """
+    Newest-first keyset pagination for models with created_at.
+
+    ?cursor=<next_cursor of the previous page>, ?page_size=N,
+    ?include_total=1 adds a bounded approximate total.
+    Raises InvalidCursor for a cursor we did not issue.
+    """
+    page_size = get_page_size(request)
+
+    approx_total = None
+    if request.query_params.get("include_total") in ("1", "true"):
+        approx_total = get_approx_total(queryset)
+
+    queryset = queryset.order_by("-created_at", "-id")
+
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, id__lt=row_id)
+        )
+
+    # one extra row tells us whether another page exists
+    rows = list(queryset[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last["created_at"], last["id"])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+    return KeysetPage(rows, page_size, next_cursor, approx_total)
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from buzz.models import Attendance, PunchEvent
+from .attendance_upsert import bulk_upsert_attendance
+
+
+# Attendance columns a punch event can change
+PUNCH_FIELDS = [
+    "punch_in_time",
+    "punch_in_lat",
+    "punch_in_lon",
+    "punch_out_time",
+    "punch_out_lat",
+    "punch_out_lon",
+    "branch_name",
+    "work_status",
+]
+
+
+def enqueue_punch_event(user_id, kind, idempotency_key, latitude, longitude, branch_name, distance):
+    """
+    Appends a punch to the log and returns (event, created). A retried
+    request with the same key gets the original event back.
+    """
+    return PunchEvent.objects.get_or_create(
+        user_id=user_id,
+        idempotency_key=idempotency_key,
+        defaults={
+            "kind": kind,
+            "occurred_at": timezone.now(),
+            "latitude": latitude,
+            "longitude": longitude,
+            "branch_name": branch_name,
+            "distance": distance,
+        }
+    )
+
+
+def apply_punch_event(attendance, event):
+    """
+    Same rules as PunchInView / PunchOutView, applied in memory.
+    Returns None when applied, else the rejection message.
+    """
+    if event.kind == "IN":
+        if attendance.punch_in_time and attendance.punch_out_time is None:
+            return "You are already punched in today"
+
+        if attendance.punch_in_time:
+            # Punched out before, new punch-in resets the punch out
+            attendance.punch_out_time = None
+            attendance.punch_out_lat = None
+            attendance.punch_out_lon = None
+        else:
+            attendance.branch_name = event.branch_name
+            attendance.work_status = "WFO"
+
+        attendance.punch_in_time = event.occurred_at
+        attendance.punch_in_lat = event.latitude
+        attendance.punch_in_lon = event.longitude
+        return None
+
+    if attendance.punch_in_time is None or attendance.punch_out_time is not None:
+        return "You have not punched in today"
+
+    attendance.punch_out_time = event.occurred_at
+    attendance.punch_out_lat = event.latitude
+    attendance.punch_out_lon = event.longitude
+    return None
+
+
+def apply_punch_events(events):
+    """
+    Folds a batch of pending events (ordered by id) into Attendance, in
+    one transaction: one locked read of the affected (user, date) rows,
+    one bulk upsert per set of changed columns, one bulk_update of the
+    events. Only the punch columns an event changed are written, so a
+    LEAVE / WFH approval that landed meanwhile is kept. Returns
+    (applied, rejected).
+    """
+    if not events:
+        return 0, 0
+
+    by_day = defaultdict(list)
+    for event in events:
+        by_day[(event.user_id, timezone.localdate(event.occurred_at))].append(event)
+
+    processed_at = timezone.now()
+    applied = 0
+
+    with transaction.atomic():
+        existing = {
+            (attendance.user_id, attendance.date): attendance
+            for attendance in Attendance.objects.select_for_update().filter(
+                user_id__in={user_id for user_id, _ in by_day},
+                date__in={day for _, day in by_day}
+            )
+        }
+
+        # {changed columns: fresh instances}, the upsert is keyed on (user, date)
+        changed = defaultdict(list)
+
+        for (user_id, day), day_events in by_day.items():
+            attendance = existing.get((user_id, day)) or Attendance(user_id=user_id, date=day)
+            before = {field: getattr(attendance, field) for field in PUNCH_FIELDS}
+
+            for event in day_events:
+                message = apply_punch_event(attendance, event)
+
+                event.status = "REJECTED" if message else "APPLIED"
+                event.result_message = message or ""
+                event.processed_at = processed_at
+
+                if not message:
+                    applied += 1
+
+            fields = tuple(field for field in PUNCH_FIELDS if getattr(attendance, field) != before[field])
+            if fields:
+                changed[fields].append(Attendance(
+                    user_id=user_id,
+                    date=day,
+                    **{field: getattr(attendance, field) for field in fields}
+                ))
+
+        for fields, attendances in changed.items():
+            bulk_upsert_attendance(attendances, update_fields=list(fields))
+
+        PunchEvent.objects.bulk_update(events, ["status", "result_message", "processed_at"])
+
+    return applied, len(events) - applied
+
+
+def process_pending_punch_events(batch_size=500):
+    """
+    Applies up to batch_size of the oldest pending events
+    """
+    events = list(
+        PunchEvent.objects
+        .filter(status="PENDING")
+        .order_by("id")[:batch_size]
+    )
+    return len(events), *apply_punch_events(events)
@@ -0,0 +1,148 @@
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# rows buffered between two chunks handed to the response
+EXPORT_CHUNK_ROWS = 500
+
+
+class Echo:
+    """
+    Pseudo-buffer for csv.writer: write() just returns the line,
+    so each row can be yielded as soon as it is formatted
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """
+    Yields a CSV document line by line
+    """
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# ===========================
+# XLSX (SpreadsheetML)
+# ===========================
+
+XLSX_STATIC_PARTS = (
+    (
+        "[Content_Types].xml",
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>',
+    ),
+    (
+        "_rels/.rels",
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>',
+    ),
+    (
+        "xl/_rels/workbook.xml.rels",
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>',
+    ),
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+
+XLSX_SHEET_TAIL = '</sheetData></worksheet>'
+
+# characters that are not allowed anywhere in an XML 1.0 document
+XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class ZipSink(io.RawIOBase):
+    """
+    Write-only, non-seekable target for zipfile; collects the compressed
+    bytes until the generator drains them into the response
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+
+    text = escape(XML_INVALID_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+def xlsx_row(row):
+    return "<row>" + "".join(xlsx_cell(value) for value in row) + "</row>"
+
+
+def stream_xlsx(header, rows, sheet_name="Report"):
+    """
+    Yields a single-sheet XLSX workbook chunk by chunk.
+
+    The sheet is written with inline strings straight into a deflate
+    stream, so only the current chunk is ever held in memory.
+    """
+    sink = ZipSink()
+
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in XLSX_STATIC_PARTS:
+            workbook.writestr(name, content)
+        workbook.writestr("xl/workbook.xml", XLSX_WORKBOOK.format(name=escape(sheet_name)))
+
+        with workbook.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_HEAD + xlsx_row(header)).encode())
+
+            for count, row in enumerate(rows, start=1):
+                sheet.write(xlsx_row(row).encode())
+
+                if count % EXPORT_CHUNK_ROWS == 0:
+                    yield sink.drain()
+
+            sheet.write(XLSX_SHEET_TAIL.encode())
+
+    yield sink.drain()
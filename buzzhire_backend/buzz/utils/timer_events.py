@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+from django.conf import settings
+from django.utils import timezone
+from .today_state import aload_today_state
+
+
+# how often an open stream re-reads the cached state (cache only, no DB)
+DEFAULT_STREAM_POLL_SECONDS = 2
+
+# comment line that keeps proxies from closing an idle stream
+DEFAULT_STREAM_HEARTBEAT_SECONDS = 15
+
+# streams end after this long and the client reconnects (EventSource does
+# it on its own), so one connection never stays open for the whole day
+DEFAULT_STREAM_MAX_SECONDS = 300
+
+STREAM_RETRY_MS = 3000
+
+
+def to_epoch(value):
+    return int(value.timestamp()) if value else None
+
+
+def get_timer_payload(state):
+    """
+    What a client needs to tick the clock locally: punch epochs plus the
+    server time, so its own clock offset can be corrected once
+    """
+    return {
+        "is_punched_in": state["punch_in_time"] is not None and state["punch_out_time"] is None,
+        "has_punched_out": state["punch_out_time"] is not None,
+        "punch_in_epoch": to_epoch(state["punch_in_time"]),
+        "punch_out_epoch": to_epoch(state["punch_out_time"]),
+        "server_epoch": to_epoch(timezone.now()),
+        "version": state["version"],
+    }
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def iter_timer_events(user_id, last_event_id=None):
+    """
+    Server-Sent Events for one user's today state: the current timer
+    first (unless the client already has that version, see Last-Event-ID),
+    then one event per change - punch in / out, WFH or correction approval.
+
+    Async generator: waits with asyncio.sleep and reads with cache.aget,
+    so an open stream holds no worker. Needs the ASGI deployment - WSGI
+    would consume the whole stream before sending anything.
+    """
+    poll_seconds = getattr(settings, "TIMER_STREAM_POLL_SECONDS", DEFAULT_STREAM_POLL_SECONDS)
+    heartbeat_seconds = getattr(settings, "TIMER_STREAM_HEARTBEAT_SECONDS", DEFAULT_STREAM_HEARTBEAT_SECONDS)
+    max_seconds = getattr(settings, "TIMER_STREAM_MAX_SECONDS", DEFAULT_STREAM_MAX_SECONDS)
+
+    day = timezone.localdate()
+    started = time.monotonic()
+    last_sent = started
+    last_punches = None
+
+    yield f"retry: {STREAM_RETRY_MS}\n\n"
+
+    while True:
+        state = await aload_today_state(user_id, day)
+
+        # a rebuilt cache entry gets a new version with the same punches;
+        # only a real change is pushed
+        punches = (state["punch_in_time"], state["punch_out_time"])
+        if last_punches is None and str(state["version"]) == str(last_event_id):
+            last_punches = punches
+
+        if punches != last_punches:
+            last_punches = punches
+            last_sent = time.monotonic()
+            yield format_event("timer", get_timer_payload(state), event_id=state["version"])
+
+        elif time.monotonic() - last_sent >= heartbeat_seconds:
+            last_sent = time.monotonic()
+            yield ": heartbeat\n\n"
+
+        # stop at the time limit or when the day rolls over
+        if time.monotonic() - started >= max_seconds or timezone.localdate() != day:
+            return
+
+        await asyncio.sleep(poll_seconds)
@@ -0,0 +1,157 @@
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from buzz.models import Attendance
+from buzz.serializers import ATTENDANCE_FAST_VALUES, serialize_attendance_row
+from .attendance_lookup import get_today_attendance
+
+
+# Write-through only reaches other worker processes through a shared
+# backend (Redis / Memcached); see get_today_state_timeout for LocMemCache.
+TODAY_STATE_CACHE_KEY = "today_state:{user_id}:{day}"
+
+# the key carries the date, so this only bounds how long yesterday's
+# entries linger in the cache
+DEFAULT_TODAY_STATE_TIMEOUT = 60 * 60 * 24
+
+# LocMemCache lives in one process: a punch handled by another worker
+# never reaches it, so entries there may only be a few seconds stale
+PROCESS_LOCAL_TODAY_STATE_TIMEOUT = 5
+
+
+def get_today_state_timeout():
+    if isinstance(caches["default"], LocMemCache):
+        return getattr(settings, "TODAY_STATE_LOCAL_CACHE_TIMEOUT", PROCESS_LOCAL_TODAY_STATE_TIMEOUT)
+    return getattr(settings, "TODAY_STATE_CACHE_TIMEOUT", DEFAULT_TODAY_STATE_TIMEOUT)
+
+
+def get_today_state_key(user_id, day):
+    return TODAY_STATE_CACHE_KEY.format(user_id=user_id, day=day.isoformat())
+
+
+def build_today_state(attendance):
+    """
+    Everything the punch-status polling endpoints need, so they never
+    have to load the Attendance row themselves. "version" changes on
+    every rebuild; the timer stream watches it.
+    """
+    return build_today_state_row(vars(attendance) if attendance is not None else None)
+
+
+def build_today_state_row(row):
+    """
+    build_today_state from a values(*ATTENDANCE_FAST_VALUES) row
+    """
+    if row is None:
+        return {
+            "version": time.time_ns(),
+            "punch_in_time": None,
+            "punch_out_time": None,
+            "branch_name": None,
+            "raw": None,
+        }
+
+    return {
+        "version": time.time_ns(),
+        "punch_in_time": row["punch_in_time"],
+        "punch_out_time": row["punch_out_time"],
+        "branch_name": row["branch_name"],
+        "raw": serialize_attendance_row(row),
+    }
+
+
+def get_today_state(request):
+    """
+    Requesting user's state for today (IST); loaded from the database
+    only on a cache miss
+    """
+    key = get_today_state_key(request.user.id, timezone.localdate())
+    state = cache.get(key)
+
+    if state is None:
+        state = build_today_state(get_today_attendance(request))
+        cache.set(key, state, get_today_state_timeout())
+
+    return state
+
+
+def load_today_state(user_id, day):
+    """
+    Cached state of any user, read from the database on a miss. Unlike
+    get_today_state it bypasses the per-request memo, so long-lived
+    responses (the timer stream) see fresh rows.
+    """
+    key = get_today_state_key(user_id, day)
+    state = cache.get(key)
+
+    if state is None:
+        # a values() row: no model instance to build on the miss path
+        state = build_today_state_row(
+            Attendance.objects.filter(user_id=user_id, date=day).values(*ATTENDANCE_FAST_VALUES).first()
+        )
+        cache.set(key, state, get_today_state_timeout())
+
+    return state
+
+
+async def aload_today_state(user_id, day):
+    """
+    load_today_state for async views; a cache hit never leaves the event loop
+    """
+    state = await cache.aget(get_today_state_key(user_id, day))
+
+    if state is None:
+        state = await sync_to_async(load_today_state)(user_id, day)
+
+    return state
+
+
+def get_today_payload(state):
+    """
+    "data" of the today-attendance response
+    """
+    if state["punch_in_time"] is None:
+        # User has not punched in today at all
+        return {
+            "is_punched_in": False,
+            "has_punched_out": False,
+            "punch_in_time": None,
+            "punch_out_time": None,
+            "branch": None,
+            "distance": None
+        }
+
+    return {
+        "is_punched_in": state["punch_out_time"] is None,
+        "has_punched_out": state["punch_out_time"] is not None,
+        "punch_in_time": timezone.localtime(state["punch_in_time"]),
+        "punch_out_time": (
+            timezone.localtime(state["punch_out_time"])
+            if state["punch_out_time"] else None
+        ),
+        "branch": state["branch_name"],
+        "distance": None,   # distance only calculated at punch time
+        "raw": state["raw"]
+    }
+
+
+def write_today_state(attendance):
+    """
+    Write-through after an Attendance row was saved; rows for other
+    days are not cached
+    """
+    if attendance.date != timezone.localdate():
+        return
+
+    cache.set(
+        get_today_state_key(attendance.user_id, attendance.date),
+        build_today_state(attendance),
+        get_today_state_timeout()
+    )
+
+
+def invalidate_today_state(user_id, day=None):
+    cache.delete(get_today_state_key(user_id, day or timezone.localdate()))
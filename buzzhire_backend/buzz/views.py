@@ -1,24 +1,44 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from .models import Attendance, AttendanceCorrectionRequest, LeaveRequest, EmployeeLeaveBucket, WFHRequest, CompanyWorkingRules, CompanyHoliday, HolidayOverride
-from .serializers import AttendanceSerializer, WFHRequestSerializer, CompanyWorkingRulesSerializer, CompanyHolidaySerializer, HolidayOverrideSerializer
-from .utils.attendance_utils import seconds_to_hh_mm, seconds_to_decimal_hours
-from .utils.distance_utils import calculate_distance
-from .utils.company_calendar import is_working_day
-from .constants import BRANCHES, PUNCH_RADIUS
+from rest_framework.settings import api_settings
+from .models import Attendance, DailyAttendanceSummary, PunchEvent, AttendanceCorrectionRequest, LeaveRequest, EmployeeLeaveBucket, WFHRequest, CompanyWorkingRules, CompanyHoliday, HolidayOverride, Branch
+from .serializers import serialize_attendance, WFHRequestSerializer, CompanyWorkingRulesSerializer, CompanyHolidaySerializer, HolidayOverrideSerializer, BranchSerializer
+from .utils.attendance_utils import seconds_to_hh_mm, seconds_to_decimal_hours, mark_leave_attendance
+from .utils.attendance_lookup import get_attendance_for_day, get_today_attendance, remember_attendance
+from .utils.attendance_report import iter_attendance_report, iter_attendance_report_rows, REPORT_EXPORT_HEADER
+from .utils.report_export import stream_csv, stream_xlsx, XLSX_CONTENT_TYPE
+from .renderers import CSVRenderer, XLSXRenderer
+from .utils.company_calendar import count_working_days, get_working_dates, get_expected_work_seconds_bulk, get_monthly_work_hours
+from .utils.monthly_summary import parse_month, get_month_start, get_month_as_of, get_month_expected_seconds, get_elapsed_working_days
+from .utils.branch_index import get_branch_index
+from .utils.google_auth import verify_google_id_token
+from .utils.leave_summary import get_leave_summary, invalidate_leave_summary
+from .utils.intervals import IntervalSet, build_interval_sets
+from .utils.pagination import paginate_keyset, InvalidCursor
+from .utils.etag import get_history_etag, etag_matches, not_modified
+from .utils.today_state import get_today_state, get_today_payload
+from .utils.timer_events import get_timer_payload
+from .utils.punch_events import enqueue_punch_event
+from .utils.attendance_upsert import upsert_attendance
+from .utils.bulk_actions import parse_bulk_action, InvalidBulkAction, bulk_leave_action, bulk_wfh_action, bulk_correction_action, bulk_action_response, get_bulk_action_max_ids
 from rest_framework import status
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from rest_framework_simplejwt.tokens import RefreshToken
-from datetime import datetime, time, timedelta
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from datetime import date, datetime, time, timedelta
 from django.utils import timezone
 from django.utils.dateparse import parse_date
-from django.db.models import Sum
+from django.db.models import Q, FilteredRelation
+from django.http import StreamingHttpResponse
 from django.db import transaction
 import calendar
+import uuid
+
+
+# longest date range one WFH application may cover
+DEFAULT_WFH_MAX_RANGE_DAYS = 31
 
 
 def get_expected_work_hours(start_date, end_date):
@@ -27,29 +47,39 @@ def get_expected_work_hours(start_date, end_date):
     based on company rules and holiday calendar
     """
 
-    if start_date > end_date:
-        raise ValueError("start_date cannot be greater than end_date")
+    return get_expected_work_hours_bulk([(start_date, end_date)])[0]
+
+
+def get_expected_work_hours_bulk(ranges):
+    """
+    Returns expected working hours ("HH:MM") for many
+    (start_date, end_date) ranges in one pass over the company calendar
+    """
+
+    return [
+        seconds_to_hh_mm(total_seconds)
+        for total_seconds in get_expected_work_seconds_bulk(ranges)
+    ]
 
-    rules = CompanyWorkingRules.objects.first()
 
-    if not rules:
-        # fallback: assume 8 hours/day
-        raise ValueError("No daily work hours are mentioned")
-    else:
-        daily_hours = float(rules.daily_work_hours)
-        daily_seconds = int(daily_hours * 3600)   # 9.5 → 34200 seconds
+# Weekly Auto Calculated Work hours
 
-    total_seconds  = 0
-    current_date = start_date
+def get_expected_weekly_hours(start_date):
+    """
+    start_date should be the first day of the week (Monday ideally)
+    """
+    end_date = start_date + timedelta(days=6)
+    return get_expected_work_hours(start_date, end_date)
 
-    while current_date <= end_date:
 
-        if is_working_day(current_date):
-            total_seconds += daily_seconds
+# Monthly Auto Calculated Work hours
 
-        current_date += timedelta(days=1)
+def get_expected_monthly_hours(year, month):
+    start_date = date(year, month, 1)
+    last_day = calendar.monthrange(year, month)[1]
+    end_date = date(year, month, last_day)
 
-    return seconds_to_hh_mm(total_seconds)
+    return get_expected_work_hours(start_date, end_date)
 
 
 def get_ist_day_range():
@@ -67,9 +97,8 @@ class GoogleAuthView(APIView):
             return Response({"error": "id_token required"}, status=400)
 
         try:
-            info = id_token.verify_oauth2_token(
-                token, 
-                requests.Request(), 
+            info = verify_google_id_token(
+                token,
                 settings.GOOGLE_CLIENT_ID,
                 clock_skew_in_seconds=300
             )
@@ -97,7 +126,7 @@ class GoogleAuthView(APIView):
             refresh = RefreshToken.for_user(user)
             refresh["email"] = user.email
             refresh["name"] = user.name
-            refresh["picture"] = user.picture
+            refresh["picture"] = picture
 
 
             return Response({
@@ -123,14 +152,10 @@ def detect_branch(user_lat, user_lon):
     Else returns (False, None, None)
     """
 
-    for branch in BRANCHES:
-        dist = calculate_distance(
-            user_lat, user_lon,
-            branch["lat"], branch["lon"]
-        )
+    branch, dist = get_branch_index().locate(user_lat, user_lon)
 
-        if dist <= PUNCH_RADIUS:
-            return True, branch["name"], dist
+    if branch:
+        return True, branch.name, dist
 
     return False, None, None
 
@@ -150,43 +175,31 @@ class PunchInView(APIView):
         user_lat = float(request.data.get("latitude"))
         user_lon = float(request.data.get("longitude"))
 
-        # 1️⃣ Check for today's attendance (latest record)
-        today = timezone.localdate()
+        # 1️⃣ Check for today's attendance (unique user + date row)
+        attendance = get_today_attendance(request)
 
-        start_of_day, end_of_day = get_ist_day_range()
-
-        attendance = Attendance.objects.filter(
-            user=user,
-            punch_in_time__range=(start_of_day, end_of_day)
-        ).order_by('-id').first()  # get latest attendance record
-
-        # 2️⃣ Find nearest branch
-
-        nearest_branch = None
-        nearest_distance = float("inf")
-        for b in BRANCHES:
-            dist = calculate_distance(user_lat, user_lon, b["lat"], b["lon"])
-            if dist < nearest_distance:
-                nearest_distance = dist
-                nearest_branch = b
+        # 2️⃣ Find the branch whose geofence contains the user
+        branch_index = get_branch_index()
+        nearest_branch, nearest_distance = branch_index.locate(user_lat, user_lon)
 
         # 2.1️⃣ Check if user is in range
-        if nearest_distance > PUNCH_RADIUS:
+        if nearest_branch is None:
+            nearest_branch, nearest_distance = branch_index.nearest(user_lat, user_lon)
             return Response({
                 "status": "failed",
                 "message": "You are out of range",
-                "nearest_branch": nearest_branch["name"],
-                "distance": round(nearest_distance, 2)
+                "nearest_branch": nearest_branch.name if nearest_branch else None,
+                "distance": round(nearest_distance, 2) if nearest_branch else None
             }, status=400)
 
         # 3️⃣ Handle punch-in logic
-        if attendance:
+        if attendance and attendance.punch_in_time:
             if attendance.punch_out_time is None:
                 # Already punched in
                 return Response({
                     "status": "failed",
                     "message": "You are already punched in today",
-                    "data": AttendanceSerializer(attendance).data
+                    "data": serialize_attendance(attendance)
                 }, status=400)
             else:
                 # Punched out before, update with new punch-in
@@ -196,28 +209,39 @@ class PunchInView(APIView):
                 attendance.punch_out_time = None  # reset punch out
                 attendance.punch_out_lat = None
                 attendance.punch_out_lon = None
-                attendance.save()
+                upsert_attendance(attendance)
                 message = "Punch in updated successfully"
+        elif attendance:
+            # Row exists for today without a punch (e.g. leave / absent marker)
+            attendance.punch_in_time = timezone.now()
+            attendance.punch_in_lat = user_lat
+            attendance.punch_in_lon = user_lon
+            attendance.branch_name = nearest_branch.name
+            attendance.work_status = "WFO"
+            upsert_attendance(attendance)
+            message = "Punch in successful"
         else:
-            # No attendance today, create new record
-            attendance = Attendance.objects.create(
+            # No attendance today: insert, or take over a row a parallel
+            # tap just created (single-statement upsert, no duplicate key)
+            attendance = upsert_attendance(Attendance(
                 user=user,
                 date = timezone.localdate(),
                 punch_in_time=timezone.now(),
                 punch_in_lat=user_lat,
                 punch_in_lon=user_lon,
-                branch_name = nearest_branch["name"],
+                branch_name = nearest_branch.name,
                 work_status = "WFO"
-            )
+            ))
             message = "Punch in successful"
-            print(attendance.date)
+
+        remember_attendance(request, attendance)
 
         return Response({
             "status": "success",
-            "message": message + f" at {nearest_branch['name']}",
-            "branch": nearest_branch["name"],
+            "message": message + f" at {nearest_branch.name}",
+            "branch": nearest_branch.name,
             "distance": round(nearest_distance, 2),
-            "data": AttendanceSerializer(attendance).data
+            "data": serialize_attendance(attendance)
         }, status=201)
 
 
@@ -226,8 +250,6 @@ class PunchOutView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        user = request.user
-
         # 1️⃣ Validate inputs
         if "latitude" not in request.data or "longitude" not in request.data:
             return Response(
@@ -238,41 +260,31 @@ class PunchOutView(APIView):
         user_lat = float(request.data.get("latitude"))
         user_lon = float(request.data.get("longitude"))
 
-        start_of_day, end_of_day = get_ist_day_range()
-
         # 2️⃣ Find today’s active punch-in
-        today = timezone.localdate()
-        attendance = Attendance.objects.filter(
-            user=user,
-            punch_in_time__range=(start_of_day, end_of_day),
-            punch_out_time__isnull=True
-        ).first()
+        attendance = get_today_attendance(request)
 
-        if not attendance:
+        if (
+            not attendance
+            or attendance.punch_in_time is None
+            or attendance.punch_out_time is not None
+        ):
             return Response({
                 "status": "failed",
                 "message": "You have not punched in today"
             }, status=400)
 
-        # 3️⃣ Find nearest branch
-        nearest_branch = None
-        min_distance = float("inf")
-
-        for branch in BRANCHES:
-            dist = calculate_distance(user_lat, user_lon, branch["lat"], branch["lon"])
-            if dist < min_distance:
-                min_distance = dist
-                nearest_branch = branch
-
-        distance = min_distance
+        # 3️⃣ Find the branch whose geofence contains the user
+        branch_index = get_branch_index()
+        nearest_branch, distance = branch_index.locate(user_lat, user_lon)
 
         # Range check
-        if distance > PUNCH_RADIUS:
+        if nearest_branch is None:
+            nearest_branch, distance = branch_index.nearest(user_lat, user_lon)
             return Response({
                 "status": "failed",
-                "message": f"You are out of range for {nearest_branch['name']}",
-                "distance": round(distance, 2),
-                "branch": nearest_branch["name"]
+                "message": f"You are out of range for {nearest_branch.name if nearest_branch else 'any branch'}",
+                "distance": round(distance, 2) if nearest_branch else None,
+                "branch": nearest_branch.name if nearest_branch else None
             }, status=400)
 
         # 4️⃣ Save punch-out
@@ -284,102 +296,183 @@ class PunchOutView(APIView):
         return Response({
             "status": "success",
             "message": f"Punch out successful",
-            "branch": nearest_branch["name"],
+            "branch": nearest_branch.name,
             "distance": round(distance, 2),
-            "data": AttendanceSerializer(attendance).data
+            "data": serialize_attendance(attendance)
         }, status=200)
 
 class TodayAttendanceView(APIView):
+    # polled every few seconds: user comes from the token claims and the
+    # state from the today-state cache, so a poll makes no DB query
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        today = timezone.localdate()
+        # Get today's attendance state
+        state = get_today_state(request)
 
-        start_of_day = timezone.make_aware(
-            datetime.combine(today, time.min)
-        )
-        end_of_day = timezone.make_aware(
-            datetime.combine(today, time.max)
-        )
+        return Response({
+            "status": "success",
+            "data": get_today_payload(state)
+        }, status=200)
 
-        # Get latest attendance for today
-        attendance = Attendance.objects.filter(
-            user=user,
-            punch_in_time__range=(start_of_day, end_of_day)
-        ).order_by('-id').first()
 
-        if not attendance:
-            # User has not punched in today at all
+class TotalWorkingTimeView(APIView):
+    # polled like TodayAttendanceView: no DB query per poll
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        state = get_today_state(request)
+
+        if state["punch_in_time"] is None:
             return Response({
-                "status": "success",
-                "data": {
-                    "is_punched_in": False,
-                    "has_punched_out": False,
-                    "punch_in_time": None,
-                    "punch_out_time": None,
-                    "branch": None,
-                    "distance": None
-                }
+                "total_working_time": "0.00"
             }, status=200)
-        
-        punch_in_time = timezone.localtime(attendance.punch_in_time)
-        punch_out_time = (
-            timezone.localtime(attendance.punch_out_time)
-            if attendance.punch_out_time else None
-        )
 
-        # Determine status flags
-        is_punched_in = attendance.punch_in_time is not None
-        has_punched_out = attendance.punch_out_time is not None
+        start = timezone.localtime(state["punch_in_time"])
+        end = timezone.localtime(state["punch_out_time"] or timezone.now())
+
+        total_seconds = max(0, int((end - start).total_seconds()))
+
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
 
-        print("punchInTime:", attendance.punch_in_time)
-        print("punchOutTime:", attendance.punch_out_time)
+        formatted_time = f"{hours}.{minutes:02}"
 
         return Response({
-            "status": "success",
-            "data": {
-                "is_punched_in": attendance.punch_out_time is None,
-                "has_punched_out": attendance.punch_out_time is not None,
-                "punch_in_time": punch_in_time,
-                "punch_out_time": punch_out_time,
-                "branch": getattr(attendance, "branch_name", None),  # optional, safe
-                "distance": None,   # distance only calculated at punch time
-                "raw": AttendanceSerializer(attendance).data
-            }
+            "total_working_time": formatted_time
         }, status=200)
 
 
-class TotalWorkingTimeView(APIView):
+
+class AttendanceTimerView(APIView):
+    """
+    Punch epochs + server time, fetched once; the client ticks the
+    clock itself instead of polling TotalWorkingTimeView
+    """
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        today = timezone.localdate()
+        state = get_today_state(request)
 
-        start_of_day, end_of_day = get_ist_day_range()
+        return Response({
+            "status": "success",
+            "data": get_timer_payload(state)
+        }, status=200)
 
-        attendance = Attendance.objects.filter(
-            user=user,
-            punch_in_time__range=(start_of_day, end_of_day)
-        ).order_by("-id").first()
 
-        start = timezone.localtime(attendance.punch_in_time)
-        end = timezone.localtime(attendance.punch_out_time or timezone.now())
+def punch_event_data(event):
+    return {
+        "id": event.id,
+        "idempotency_key": event.idempotency_key,
+        "type": event.kind,
+        "status": event.status,
+        "message": event.result_message or None,
+        "occurred_at": timezone.localtime(event.occurred_at).isoformat(),
+        "processed_at": (
+            timezone.localtime(event.processed_at).isoformat()
+            if event.processed_at else None
+        ),
+    }
 
-        total_seconds = max(0, int((end - start).total_seconds()))
 
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
+class PunchEventView(APIView):
+    """
+    Write-behind punch: validates + geofences, appends a PunchEvent and
+    answers 202; the process_punch_events worker updates Attendance.
+    Retries with the same idempotency key return the original event.
+    """
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
 
-        formatted_time = f"{hours}.{minutes:02}"
+    def post(self, request):
+        # 0️⃣ Validate input
+        kind = request.data.get("type")
+        if kind not in ["IN", "OUT"]:
+            return Response(
+                {"status": "failed", "message": "type must be IN or OUT"},
+                status=400
+            )
+
+        idempotency_key = (
+            request.headers.get("Idempotency-Key")
+            or request.data.get("idempotency_key")
+        )
+        if not idempotency_key or len(idempotency_key) > 64:
+            return Response(
+                {"status": "failed", "message": "idempotency_key (max 64 chars) is required"},
+                status=400
+            )
+
+        if "latitude" not in request.data or "longitude" not in request.data:
+            return Response(
+                {"status": "failed", "message": "latitude & longitude are required"},
+                status=400
+            )
 
-        print("START TIME:", start)
-        print("END TIME:", end)
-        print("Work TIME:", formatted_time)
+        try:
+            user_lat = float(request.data.get("latitude"))
+            user_lon = float(request.data.get("longitude"))
+        except (TypeError, ValueError):
+            return Response(
+                {"status": "failed", "message": "latitude & longitude must be numbers"},
+                status=400
+            )
+
+        # 1️⃣ Geofence check stays synchronous (in-memory index, no DB)
+        branch_index = get_branch_index()
+        branch, distance = branch_index.locate(user_lat, user_lon)
+
+        if branch is None:
+            branch, distance = branch_index.nearest(user_lat, user_lon)
+            return Response({
+                "status": "failed",
+                "message": "You are out of range",
+                "nearest_branch": branch.name if branch else None,
+                "distance": round(distance, 2) if branch else None
+            }, status=400)
+
+        # 2️⃣ Enqueue + ack
+        event, created = enqueue_punch_event(
+            int(request.user.id),
+            kind,
+            idempotency_key,
+            user_lat,
+            user_lon,
+            branch.name,
+            round(distance, 2)
+        )
 
         return Response({
-            "total_working_time": formatted_time
+            "status": "accepted",
+            "duplicate": not created,
+            "branch": event.branch_name,
+            "distance": event.distance,
+            "event": punch_event_data(event)
+        }, status=202)
+
+
+class PunchEventDetailView(APIView):
+    authentication_classes = [JWTStatelessUserAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, idempotency_key):
+        event = PunchEvent.objects.filter(
+            user_id=request.user.id,
+            idempotency_key=idempotency_key
+        ).first()
+
+        if not event:
+            return Response(
+                {"status": "failed", "message": "Punch event not found"},
+                status=404
+            )
+
+        return Response({
+            "status": "success",
+            "event": punch_event_data(event)
         }, status=200)
 
 
@@ -409,11 +502,12 @@ class TotalHoursView(APIView):
                 status=400
             )
 
-        # Fetch attendance records
-        attendances = Attendance.objects.filter(
+        # Fetch the daily rollup rows
+        summaries = DailyAttendanceSummary.objects.filter(
             user=user,
-            date__range=(start_date, end_date)
-        ).order_by("date")
+            date__range=(start_date, end_date),
+            punch_in_time__isnull=False
+        ).values_list("date", "punch_in_time", "punch_out_time", "worked_seconds")
 
         # 1️⃣ Prepare all dates
         result = {}
@@ -428,27 +522,12 @@ class TotalHoursView(APIView):
             current_date += timedelta(days=1)
 
         # 2️⃣ Fill attendance data
-        for att in attendances:
-            local_punch_in = timezone.localtime(att.punch_in_time)
-            day = local_punch_in.date().isoformat()
-
-            punch_out = (
-                timezone.localtime(att.punch_out_time)
-                if att.punch_out_time else None
-            )
-
-            working_time = None
-            if punch_out:
-                total_seconds = int((punch_out - local_punch_in).total_seconds())
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                working_time = f"{hours}:{minutes:02}"
-
-            result[day] = {
-                "date": day,
-                "punch_in_time": local_punch_in.strftime("%H:%M"),
-                "punch_out_time": punch_out.strftime("%H:%M") if punch_out else None,
-                "working_time": working_time
+        for day, punch_in_time, punch_out_time, worked_seconds in summaries:
+            result[day.isoformat()] = {
+                "date": day.isoformat(),
+                "punch_in_time": punch_in_time.strftime("%H:%M"),
+                "punch_out_time": punch_out_time.strftime("%H:%M") if punch_out_time else None,
+                "working_time": seconds_to_hh_mm(worked_seconds)
             }
 
         return Response({
@@ -464,6 +543,7 @@ class TotalHoursView(APIView):
 
 class AdminAttendanceReportView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer, XLSXRenderer]
 
     def get(self, request):
         # 1️⃣ Read start_date (MANDATORY)
@@ -492,61 +572,32 @@ class AdminAttendanceReportView(APIView):
         else:
             employees = User.objects.filter(is_staff=False)
 
-        response_data = []
-
-        total_hours = get_expected_work_hours(start_date, end_date)
+        # 4️⃣ Streaming export (?format=csv / ?format=xlsx)
+        export_format = request.accepted_renderer.format
+        if export_format in ("csv", "xlsx"):
+            rows = iter_attendance_report_rows(employees, start_date, end_date)
 
-        # 4️⃣ Loop employees
-        for employee in employees:
-            employee_data = {
-                "emp_id": employee.id,
-                "employee_name": employee.name,
-                "attendance": []
-            }
-
-            current_date = start_date
-            while current_date <= end_date:
-
-                # IST day range
-                day_start = timezone.make_aware(
-                    datetime.combine(current_date, time.min)
+            if export_format == "csv":
+                response = StreamingHttpResponse(
+                    stream_csv(REPORT_EXPORT_HEADER, rows),
+                    content_type="text/csv"
                 )
-                day_end = timezone.make_aware(
-                    datetime.combine(current_date, time.max)
+            else:
+                response = StreamingHttpResponse(
+                    stream_xlsx(REPORT_EXPORT_HEADER, rows, sheet_name="Attendance"),
+                    content_type=XLSX_CONTENT_TYPE
                 )
 
-                attendance = Attendance.objects.filter(
-                    user=employee,
-                    punch_in_time__range=(day_start, day_end)
-                ).order_by("-id").first()
-
-                punch_in = None
-                punch_out = None
-                total_time = None
-
-                if attendance:
-                    if attendance.punch_in_time:
-                        punch_in = timezone.localtime(attendance.punch_in_time)
+            filename = f"attendance_{start_date.isoformat()}_{end_date.isoformat()}.{export_format}"
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return response
 
-                    if attendance.punch_out_time:
-                        punch_out = timezone.localtime(attendance.punch_out_time)
-
-                    if punch_in and punch_out:
-                        total_seconds = int((punch_out - punch_in).total_seconds())
-                        total_time = seconds_to_hh_mm(total_seconds)
-                        # decimal_hours = seconds_to_decimal_hours(total_seconds)
-
-                employee_data["attendance"].append({
-                    "date": current_date.isoformat(),
-                    "punch_in": punch_in.strftime("%H:%M") if punch_in else None,
-                    "punch_out": punch_out.strftime("%H:%M") if punch_out else None,
-                    "total_time": total_time,
-                    # "decimal_hours": decimal_hours
-                })
-
-                current_date += timedelta(days=1)
+        total_hours = get_expected_work_hours(start_date, end_date)
 
-            response_data.append(employee_data)
+        # 5️⃣ Build employee x date grid (constant number of queries)
+        response_data = list(
+            iter_attendance_report(employees, start_date, end_date)
+        )
 
         return Response({
             "status": "success",
@@ -558,6 +609,85 @@ class AdminAttendanceReportView(APIView):
 
 
 
+class AdminMonthlyAttendanceView(APIView):
+    """
+    Whole company's month from the monthly rollup: one query, every
+    non-staff employee LEFT JOINed to their (user, month) row
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # 1️⃣ Read month (YYYY-MM, default: running month)
+        month_param = request.query_params.get("month")
+        month = parse_month(month_param) if month_param else get_month_start(timezone.localdate())
+        if not month:
+            return Response(
+                {"error": "month must be YYYY-MM"},
+                status=400
+            )
+
+        # 2️⃣ Read optional employee IDs
+        employees = User.objects.filter(is_staff=False)
+        ids_param = request.query_params.get("ids")
+        if ids_param:
+            ids_list = [int(i) for i in ids_param.split(",") if i.isdigit()]
+            employees = employees.filter(id__in=ids_list)
+
+        # 3️⃣ Employees + their month row (LEFT JOIN on the unique (user, month) key)
+        rows = (
+            employees
+            .annotate(
+                summary=FilteredRelation(
+                    "monthly_summaries",
+                    condition=Q(monthly_summaries__month=month)
+                )
+            )
+            .order_by("id")
+            .values(
+                "id",
+                "name",
+                "summary__worked_seconds",
+                "summary__present_days",
+                "summary__leave_days",
+                "summary__wfh_days",
+                "summary__absent_days",
+                "summary__as_of",
+            )
+        )
+
+        # 4️⃣ Calendar figures, same for everyone
+        expected_seconds = get_month_expected_seconds(month)
+        elapsed_working_days = get_elapsed_working_days(month)
+
+        emps = []
+        for row in rows:
+            has_summary = row["summary__as_of"] is not None
+            worked_seconds = row["summary__worked_seconds"] or 0
+
+            emps.append({
+                "emp_id": row["id"],
+                "employee_name": row["name"],
+                "worked_time": seconds_to_hh_mm(worked_seconds),
+                "worked_hours": seconds_to_decimal_hours(worked_seconds),
+                "present_days": row["summary__present_days"] or 0,
+                "leave_days": row["summary__leave_days"] or 0,
+                "wfh_days": row["summary__wfh_days"] or 0,
+                # no rollup row: nothing recorded, every working day so far is absent
+                "absent_days": row["summary__absent_days"] if has_summary else elapsed_working_days,
+                "as_of": (row["summary__as_of"] or get_month_as_of(month)).isoformat(),
+            })
+
+        return Response({
+            "status": "success",
+            "month": month.strftime("%Y-%m"),
+            "monthly_work_hours": get_monthly_work_hours(),
+            "expected_time": seconds_to_hh_mm(expected_seconds),
+            "expected_hours": seconds_to_decimal_hours(expected_seconds),
+            "count": len(emps),
+            "emps": emps
+        }, status=status.HTTP_200_OK)
+
+
 class CreateAttendanceRegularizationRequest(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -597,20 +727,10 @@ class CreateAttendanceRegularizationRequest(APIView):
                 status=400
             )
 
-        # 3️⃣ Build IST day range
-        start_of_day = timezone.make_aware(
-            datetime.combine(req_date, time.min)
-        )
-        end_of_day = timezone.make_aware(
-            datetime.combine(req_date, time.max)
-        )
-
-        attendance = Attendance.objects.filter(
-            user=user,
-            punch_in_time__range=(start_of_day, end_of_day)
-        ).order_by("-id").first()
+        # 3️⃣ Find that day's attendance (unique user + date row)
+        attendance = get_attendance_for_day(request, req_date)
 
-        if not attendance:
+        if not attendance or attendance.punch_in_time is None:
             return Response(
                 {"status": "failed", "message": "No attendance found for this date"},
                 status=404
@@ -775,18 +895,51 @@ class AdminApproveRejectCorrection(APIView):
         })
 
 
+class AdminCorrectionBulkActionView(APIView):
+    """
+    Approve / reject many attendance corrections at once, results per id.
+    Body: {"ids": [...], "action": "APPROVE" | "REJECT", "admin_comment": ""}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # 1️⃣ Validate body
+        try:
+            ids, action = parse_bulk_action(request.data)
+        except InvalidBulkAction as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 2️⃣ One transaction, set-based writes
+        results = bulk_correction_action(
+            ids, action, admin_comment=request.data.get("admin_comment", "")
+        )
+
+        return Response(bulk_action_response(action, results), status=status.HTTP_200_OK)
+
+
 class EmployeeAttendanceCorrectionRequests(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
 
-        requests = AttendanceCorrectionRequest.objects.filter(
-            user=user
-        ).select_related("attendance").order_by("-created_at")
+        requests = AttendanceCorrectionRequest.objects.filter(user=user)
+
+        # unchanged since the client's copy → 304, nothing serialized
+        etag = get_history_etag(request, requests)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        try:
+            page = paginate_keyset(request, requests)
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
 
         data = []
-        for req in requests:
+        for req in page.rows:
             requested_time_ist = timezone.localtime(req.requested_time)
 
             data.append({
@@ -800,10 +953,13 @@ class EmployeeAttendanceCorrectionRequests(APIView):
                 "created_at": timezone.localtime(req.created_at).isoformat()
             })
 
-        return Response({
+        response = Response({
             "status": "success",
+            **page.meta(),
             "data": data
         })
+        response["ETag"] = etag
+        return response
     
 
 class AdminAttendanceCorrectionList(APIView):
@@ -815,15 +971,19 @@ class AdminAttendanceCorrectionList(APIView):
 
         status_filter = request.query_params.get("status")  # PENDING / APPROVED / REJECTED
 
-        qs = AttendanceCorrectionRequest.objects.select_related(
-            "user", "attendance"
-        ).order_by("-created_at")
+        qs = AttendanceCorrectionRequest.objects.select_related("user")
 
         if status_filter:
             qs = qs.filter(status=status_filter)
 
+        # newest first, one keyset page at a time
+        try:
+            page = paginate_keyset(request, qs)
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
         data = []
-        for req in qs:
+        for req in page.rows:
             requested_time_ist = timezone.localtime(req.requested_time)
 
             data.append({
@@ -841,6 +1001,7 @@ class AdminAttendanceCorrectionList(APIView):
         return Response({
             "status": "success",
             "count": len(data),
+            **page.meta(),
             "data": data
         })
     
@@ -864,7 +1025,7 @@ class EmployeeCancelAttendanceCorrectionRequest(APIView):
             )
 
         req.status = "CANCELLED"
-        req.save(update_fields=["status"])
+        req.save(update_fields=["status", "updated_at"])
 
         return Response({
             "status": "success",
@@ -914,19 +1075,32 @@ class ApplyLeaveView(APIView):
                 status=400
             )
         
-        if LeaveRequest.objects.filter(
-            user=user,
-            start_date=start_date,
-            end_date=end_date,
-            status__in=["PENDING", "APPROVED"]
-        ).exists():
+        # ❌ Any overlap with a pending / approved leave (range index)
+        overlapping = list(
+            LeaveRequest.objects.filter(
+                user=user,
+                status__in=["PENDING", "APPROVED"],
+                start_date__lte=end_date,
+                end_date__gte=start_date
+            ).values("id", "start_date", "end_date", "status")[:10]
+        )
+        if overlapping:
             return Response(
-                {"message": "Leave already applied for these dates"},
+                {
+                    "message": "Leave already applied for these dates",
+                    "overlapping": overlapping
+                },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 4️⃣ Calculate total days (inclusive)
-        total_days = (end_date - start_date).days + 1
+        # 4️⃣ Calculate total days: working days only (weekends, holidays
+        # and overrides from the cached calendar, O(1) per year touched)
+        total_days = count_working_days(start_date, end_date)
+        if total_days == 0:
+            return Response(
+                {"message": "No working days in this range"},
+                status=400
+            )
 
         # 5️⃣ Create leave request
         leave = LeaveRequest.objects.create(
@@ -954,59 +1128,50 @@ class EmployeeLeaveSummaryView(APIView):
     def get(self, request):
         user = request.user
 
-        # ---------- 1️⃣ Fetch leave bucket ----------
-        leave_bucket, _ = EmployeeLeaveBucket.objects.get_or_create(
-            user=user
-        )
+        leaves_qs = LeaveRequest.objects.filter(user=user)
 
-        # ---------- 2️⃣ Fetch leave requests ----------
-        leave_requests = LeaveRequest.objects.filter(
+        # ---------- 1️⃣ Nothing changed since the client's copy → 304 ----------
+        bucket_updated_at = EmployeeLeaveBucket.objects.filter(
             user=user
-        ).order_by("-created_at")
-
-        # ---------- 3️⃣ Aggregate leave stats ----------
-        def get_days_by_status(status):
-            return (
-                leave_requests
-                .filter(status=status)
-                .aggregate(total=Sum("total_days"))
-                .get("total") or 0
-            )
+        ).values_list("updated_at", flat=True).first()
+
+        etag = get_history_etag(request, leaves_qs, bucket_updated_at)
+        if etag_matches(request, etag):
+            return not_modified(etag)
 
-        approved_days = get_days_by_status("APPROVED")
-        pending_days = get_days_by_status("PENDING")
-        rejected_days = get_days_by_status("REJECTED")
-        cancelled_days = get_days_by_status("CANCELLED")
+        # ---------- 2️⃣ Bucket + leave stats (cached per user) ----------
+        summary = get_leave_summary(user)
+
+        # ---------- 3️⃣ Fetch & serialize one page of leave requests ----------
+        try:
+            page = paginate_keyset(request, leaves_qs.values(
+                "id", "start_date", "end_date", "total_days", "reason", "status", "created_at"
+            ))
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # ---------- 4️⃣ Serialize leave requests ----------
         requests_data = []
-        for leave in leave_requests:
+        for leave in page.rows:
             requests_data.append({
-                "id": leave.id,
-                "start_date": leave.start_date.isoformat(),
-                "end_date": leave.end_date.isoformat(),
-                "total_days": leave.total_days,
-                "reason": leave.reason,
-                "status": leave.status,
-                "applied_on": leave.created_at.date().isoformat()
+                "id": leave["id"],
+                "start_date": leave["start_date"].isoformat(),
+                "end_date": leave["end_date"].isoformat(),
+                "total_days": leave["total_days"],
+                "reason": leave["reason"],
+                "status": leave["status"],
+                "applied_on": leave["created_at"].date().isoformat()
             })
 
-        # ---------- 5️⃣ Final response ----------
-        return Response({
+        # ---------- 4️⃣ Final response ----------
+        response = Response({
             "status": "success",
-            "leave_summary": {
-                "total_leave": leave_bucket.total_leave,
-                "taken_leave": leave_bucket.taken_leave,
-                "remaining_leave": leave_bucket.remaining_leave,
-            },
-            "leave_stats": {
-                "approved_days": approved_days,
-                "pending_days": pending_days,
-                "rejected_days": rejected_days,
-                "cancelled_days": cancelled_days,
-            },
+            "leave_summary": summary["leave_summary"],
+            "leave_stats": summary["leave_stats"],
+            **page.meta(),
             "leave_requests": requests_data
         })
+        response["ETag"] = etag
+        return response
 
 
 
@@ -1071,29 +1236,8 @@ class AdminLeaveActionView(APIView):
                 bucket.remaining_leave -= days  # can go negative
                 bucket.save()
 
-                # 🟢 MARK ATTENDANCE AS LEAVE (INLINE LOGIC)
-                current_date = leave.start_date
-
-                while current_date <= leave.end_date:
-
-                    attendance = Attendance.objects.filter(
-                        user=user,
-                        date=current_date
-                    ).first()
-
-                    if attendance:
-                        # Update existing attendance
-                        attendance.work_status = "LEAVE"
-                        attendance.save(update_fields=["work_status"])
-                    else:
-                        # Create new attendance entry
-                        Attendance.objects.create(
-                            user=user,
-                            date=current_date,
-                            work_status="LEAVE"
-                        )
-
-                    current_date += timedelta(days=1)
+                # 🟢 MARK ATTENDANCE AS LEAVE (working days, bulk)
+                mark_leave_attendance(user, leave.start_date, leave.end_date)
 
                 # ✅ Approve leave
                 leave.status = "APPROVED"
@@ -1122,6 +1266,145 @@ class AdminLeaveActionView(APIView):
         )
 
 
+class AdminLeaveBulkActionView(APIView):
+    """
+    Approve / reject many leave requests at once, results per id.
+    Body: {"ids": [...], "action": "APPROVE" | "REJECT"}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # 1️⃣ Validate body
+        try:
+            ids, action = parse_bulk_action(request.data)
+        except InvalidBulkAction as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 2️⃣ One transaction, set-based writes
+        results = bulk_leave_action(ids, action)
+
+        return Response(bulk_action_response(action, results), status=status.HTTP_200_OK)
+
+
+class AdminLeaveImportView(APIView):
+    """
+    Creates many leave requests at once (e.g. from an HR sheet).
+    Body: {"leaves": [{"user_id", "start_date", "end_date", "reason"}, ...]}
+
+    Every row is checked against existing pending / approved leave and
+    against the rows before it, with one query and one in-memory
+    interval set per user; valid rows are bulk-created as PENDING.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        rows = request.data.get("leaves")
+
+        # 1️⃣ Validate body
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {"error": "leaves must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_rows = get_bulk_action_max_ids()
+        if len(rows) > max_rows:
+            return Response(
+                {"error": f"At most {max_rows} leaves per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 2️⃣ Parse rows
+        results = [None] * len(rows)
+        parsed = []
+        for index, row in enumerate(rows):
+            row = row if isinstance(row, dict) else {}
+            start_date = parse_date(str(row.get("start_date") or ""))
+            end_date = parse_date(str(row.get("end_date") or ""))
+            user_id = int(row["user_id"]) if str(row.get("user_id", "")).isdigit() else None
+            reason = row.get("reason")
+
+            if not all([user_id, start_date, end_date, reason]):
+                results[index] = {"index": index, "ok": False, "error": "user_id, start_date, end_date and reason are required"}
+            elif start_date > end_date:
+                results[index] = {"index": index, "ok": False, "error": "start_date cannot be greater than end_date"}
+            else:
+                parsed.append((index, user_id, start_date, end_date, reason))
+
+        # 3️⃣ One query each: known employees, their overlapping leave
+        user_ids = set()
+        existing = []
+        if parsed:
+            user_ids = set(
+                User.objects.filter(
+                    id__in={user_id for _, user_id, _, _, _ in parsed},
+                    is_staff=False
+                ).values_list("id", flat=True)
+            )
+            existing = LeaveRequest.objects.filter(
+                user_id__in=user_ids,
+                status__in=["PENDING", "APPROVED"],
+                start_date__lte=max(end_date for _, _, _, end_date, _ in parsed),
+                end_date__gte=min(start_date for _, _, start_date, _, _ in parsed)
+            ).values_list("user_id", "start_date", "end_date")
+
+        taken = build_interval_sets(existing)
+
+        # 4️⃣ Validate against history + earlier rows of this import
+        leaves = []
+        for index, user_id, start_date, end_date, reason in parsed:
+            if user_id not in user_ids:
+                results[index] = {"index": index, "ok": False, "error": "Employee not found"}
+                continue
+
+            if taken[user_id].overlaps(start_date, end_date):
+                results[index] = {"index": index, "ok": False, "error": "Leave already applied for these dates"}
+                continue
+
+            total_days = count_working_days(start_date, end_date)
+            if total_days == 0:
+                results[index] = {"index": index, "ok": False, "error": "No working days in this range"}
+                continue
+
+            taken[user_id].add(start_date, end_date)
+
+            leaves.append(LeaveRequest(
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date,
+                total_days=total_days,
+                reason=reason,
+                status="PENDING"
+            ))
+            results[index] = {
+                "index": index,
+                "ok": True,
+                "user_id": user_id,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "requested_days": total_days
+            }
+
+        # 5️⃣ One insert; bulk_create skips the leave summary signal
+        with transaction.atomic():
+            LeaveRequest.objects.bulk_create(leaves)
+            imported_user_ids = {leave.user_id for leave in leaves}
+            transaction.on_commit(lambda: invalidate_leave_summary(*imported_user_ids))
+
+        return Response(
+            {
+                "status": "success",
+                "created": len(leaves),
+                "failed": len(rows) - len(leaves),
+                "results": results
+            },
+            status=status.HTTP_201_CREATED if leaves else status.HTTP_200_OK
+        )
+
+
 class AdminLeaveListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1136,7 +1419,7 @@ class AdminLeaveListView(APIView):
         status_filter = request.query_params.get("status")
 
         # 🔹 base queryset (optimized)
-        leaves_qs = LeaveRequest.objects.select_related("user").order_by("-created_at")
+        leaves_qs = LeaveRequest.objects.select_related("user")
 
         # 🔹 optional status filter
         if status_filter:
@@ -1147,9 +1430,15 @@ class AdminLeaveListView(APIView):
                 )
             leaves_qs = leaves_qs.filter(status=status_filter)
 
+        # 🔹 newest first, one keyset page at a time
+        try:
+            page = paginate_keyset(request, leaves_qs)
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
         data = []
 
-        for leave in leaves_qs:
+        for leave in page.rows:
             data.append({
                 "leave_id": leave.id,
                 "user_id": leave.user.id,
@@ -1166,6 +1455,7 @@ class AdminLeaveListView(APIView):
         return Response(
             {
                 "count": len(data),
+                **page.meta(),
                 "results": data
             },
             status=status.HTTP_200_OK
@@ -1173,65 +1463,130 @@ class AdminLeaveListView(APIView):
 
 
 class ApplyWFHView(APIView):
+    """
+    WFH for one `date`, or for every working day of `start_date` ..
+    `end_date` (one request row per day, sharing a batch_id)
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
         user = request.user
 
         date_str = request.data.get("date")
+        start_str = request.data.get("start_date")
+        end_str = request.data.get("end_date")
 
         # 1️⃣ Validate input
-        if not date_str:
+        if not date_str and not (start_str and end_str):
             return Response(
-                {"message": "date is required"},
+                {"message": "date (or start_date and end_date) is required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        wfh_date = parse_date(date_str)
-        if not wfh_date:
+        is_range = not date_str
+        start_date = parse_date(start_str if is_range else date_str)
+        end_date = parse_date(end_str) if is_range else start_date
+        if not start_date or not end_date:
             return Response(
                 {"message": "Invalid date format (YYYY-MM-DD required)"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if start_date > end_date:
+            return Response(
+                {"message": "start_date cannot be greater than end_date"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_days = getattr(settings, "WFH_MAX_RANGE_DAYS", DEFAULT_WFH_MAX_RANGE_DAYS)
+        if (end_date - start_date).days + 1 > max_days:
+            return Response(
+                {"message": f"WFH can be applied for at most {max_days} days at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         # 2️⃣ Prevent past dates
-        if wfh_date < timezone.localdate():
+        if start_date < timezone.localdate():
             return Response(
                 {"message": "Cannot apply WFH for past dates"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 3️⃣ Prevent duplicate request
-        if WFHRequest.objects.filter(user=user, date=wfh_date).exists():
+        # a range covers its working days only
+        wfh_dates = get_working_dates(start_date, end_date) if is_range else [start_date]
+        if not wfh_dates:
             return Response(
-                {"message": "WFH already applied for this date"},
+                {"message": "No working days in this range"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 4️⃣ Prevent WFH on approved leave
-        if LeaveRequest.objects.filter(
-            user=user,
-            status="APPROVED",
-            start_date__lte=wfh_date,
-            end_date__gte=wfh_date
-        ).exists():
+        # 3️⃣ Prevent duplicate request (one query for the whole range)
+        applied = set(
+            WFHRequest.objects.filter(
+                user=user,
+                date__range=(start_date, end_date)
+            ).values_list("date", flat=True)
+        )
+        duplicates = [d for d in wfh_dates if d in applied]
+        if duplicates:
             return Response(
-                {"message": "Cannot apply WFH on an approved leave"},
+                {
+                    "message": "WFH already applied for this date",
+                    "dates": [d.isoformat() for d in duplicates]
+                },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 5️⃣ Create WFH request
-        wfh = WFHRequest.objects.create(
-            user=user,
-            date=wfh_date,
-            status="PENDING"
+        # 4️⃣ Prevent WFH on approved leave (one interval-overlap query)
+        leaves = IntervalSet(
+            LeaveRequest.objects.filter(
+                user=user,
+                status="APPROVED",
+                start_date__lte=end_date,
+                end_date__gte=start_date
+            ).values_list("start_date", "end_date")
         )
+        on_leave = [d for d in wfh_dates if leaves.overlaps(d, d)]
+        if on_leave:
+            return Response(
+                {
+                    "message": "Cannot apply WFH on an approved leave",
+                    "dates": [d.isoformat() for d in on_leave]
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 5️⃣ Create WFH request(s)
+        if not is_range:
+            wfh = WFHRequest.objects.create(
+                user=user,
+                date=start_date,
+                status="PENDING"
+            )
+
+            # 6️⃣ Notify (async recommended later)
+            # send_wfh_apply_email(user, wfh)
+
+            return Response(
+                WFHRequestSerializer(wfh).data,
+                status=status.HTTP_201_CREATED
+            )
+
+        batch_id = uuid.uuid4()
+        WFHRequest.objects.bulk_create([
+            WFHRequest(user=user, date=wfh_date, status="PENDING", batch_id=batch_id)
+            for wfh_date in wfh_dates
+        ])
 
-        # 6️⃣ Notify (async recommended later)
-        # send_wfh_apply_email(user, wfh)
+        # re-read: bulk_create does not set ids on MySQL
+        created = WFHRequest.objects.filter(batch_id=batch_id).select_related("user").order_by("date")
 
         return Response(
-            WFHRequestSerializer(wfh).data,
+            {
+                "batch_id": batch_id,
+                "count": len(wfh_dates),
+                "results": WFHRequestSerializer(created, many=True).data
+            },
             status=status.HTTP_201_CREATED
         )
 
@@ -1242,17 +1597,25 @@ class EmployeeWFHRequestsView(APIView):
     def get(self, request):
         user = request.user
 
-        wfh_requests = (
-            WFHRequest.objects
-            .filter(user=user)
-            .order_by("-created_at")
-        )
+        wfh_requests = WFHRequest.objects.filter(user=user)
+
+        # 1️⃣ Unchanged since the client's copy → 304, nothing serialized
+        etag = get_history_etag(request, wfh_requests)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        # 2️⃣ One keyset page, newest first
+        try:
+            page = paginate_keyset(request, wfh_requests)
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
 
         data = []
 
-        for wfh in wfh_requests:
+        for wfh in page.rows:
             data.append({
                 "wfh_id": wfh.id,
+                "batch_id": wfh.batch_id,
                 "date": wfh.date.isoformat(),
                 "status": wfh.status,
                 "applied_at": timezone.localtime(wfh.created_at).isoformat(),
@@ -1263,13 +1626,16 @@ class EmployeeWFHRequestsView(APIView):
                 )
             })
 
-        return Response(
+        response = Response(
             {
                 "count": len(data),
+                **page.meta(),
                 "results": data
             },
             status=status.HTTP_200_OK
         )
+        response["ETag"] = etag
+        return response
 
 class AdminWFHActionView(APIView):
     permission_classes = [IsAuthenticated]
@@ -1347,26 +1713,17 @@ class AdminWFHActionView(APIView):
                 datetime.combine(wfh_date, time(19, 0))
             )
 
-            attendance = Attendance.objects.filter(
-                user=wfh.user,
-                date=wfh_date
-            ).first()
-
-            if attendance:
-                attendance.work_status = "WFH"
-                attendance.punch_in_time = punch_in
-                attendance.punch_out_time = punch_out
-                attendance.save(
-                    update_fields=["work_status", "punch_in_time", "punch_out_time"]
-                )
-            else:
-                Attendance.objects.create(
+            # Create the day's row or overwrite its status + timings (one upsert)
+            upsert_attendance(
+                Attendance(
                     user=wfh.user,
                     date=wfh_date,
                     work_status="WFH",
                     punch_in_time=punch_in,
                     punch_out_time=punch_out
-                )
+                ),
+                update_fields=["work_status", "punch_in_time", "punch_out_time"]
+            )
 
         return Response(
             {
@@ -1379,6 +1736,60 @@ class AdminWFHActionView(APIView):
         )
 
 
+class AdminWFHBulkActionView(APIView):
+    """
+    Approve / reject many WFH requests at once, results per id.
+    Body: {"ids": [...], "action": "APPROVE" | "REJECT"}
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        # 1️⃣ Validate body
+        try:
+            ids, action = parse_bulk_action(request.data)
+        except InvalidBulkAction as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 2️⃣ One transaction, set-based writes
+        results = bulk_wfh_action(ids, action)
+
+        return Response(bulk_action_response(action, results), status=status.HTTP_200_OK)
+
+
+class AdminWFHBatchActionView(APIView):
+    """
+    Approve / reject every pending day of one date-range WFH application
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, batch_id):
+        action = request.data.get("action")  # APPROVE / REJECT
+        if action not in ["APPROVE", "REJECT"]:
+            return Response(
+                {"error": "Invalid action. Use APPROVE or REJECT"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = list(
+            WFHRequest.objects.filter(batch_id=batch_id)
+            .order_by("date")
+            .values_list("id", flat=True)
+        )
+        if not ids:
+            return Response(
+                {"error": "WFH batch not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # attendance only for days that are (still) working days
+        results = bulk_wfh_action(ids, action, working_days_only=True)
+
+        return Response(bulk_action_response(action, results), status=status.HTTP_200_OK)
+
+
 class AdminWFHListView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -1393,11 +1804,7 @@ class AdminWFHListView(APIView):
         status_filter = request.query_params.get("status")
 
         # 🔹 Base queryset (optimized)
-        wfh_qs = (
-            WFHRequest.objects
-            .select_related("user")
-            .order_by("-created_at")
-        )
+        wfh_qs = WFHRequest.objects.select_related("user")
 
         # 🔹 Optional status filter
         if status_filter:
@@ -1408,14 +1815,21 @@ class AdminWFHListView(APIView):
                 )
             wfh_qs = wfh_qs.filter(status=status_filter)
 
+        # 🔹 Newest first, one keyset page at a time
+        try:
+            page = paginate_keyset(request, wfh_qs)
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
         data = []
 
-        for wfh in wfh_qs:
+        for wfh in page.rows:
             data.append({
                 "wfh_id": wfh.id,
                 "user_id": wfh.user.id,
                 "user_name": wfh.user.name,
                 "user_email": wfh.user.email,
+                "batch_id": wfh.batch_id,
                 "date": wfh.date.isoformat(),
                 "status": wfh.status,
                 "applied_at": timezone.localtime(wfh.created_at).isoformat(),
@@ -1429,6 +1843,7 @@ class AdminWFHListView(APIView):
         return Response(
             {
                 "count": len(data),
+                **page.meta(),
                 "results": data
             },
             status=status.HTTP_200_OK
@@ -1581,23 +1996,55 @@ class AdminHolidayOverrideDeleteView(APIView):
         return Response({"message": "Override deleted successfully"})
 
 
-# Weekly Auto Calculated Work hours
+class AdminBranchListCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    # 🔐 Admin-only access
+        # if request.user.role != "ADMIN":
+        #     return Response(
+        #         {"error": "Forbidden"},
+        #         status=status.HTTP_403_FORBIDDEN
+        #     )
 
-# def get_expected_weekly_hours(start_date):
-#     """
-#     start_date should be the first day of the week (Monday ideally)
-#     """
-#     end_date = start_date + datetime.timedelta(days=6)
-#     return get_expected_work_hours(start_date, end_date)
+    def get(self, request):
+        branches = Branch.objects.all().order_by("name")
+        serializer = BranchSerializer(branches, many=True)
+        return Response(serializer.data)
 
+    def post(self, request):
+        serializer = BranchSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=201)
+        return Response(serializer.errors, status=400)
 
-# Monthly Auto Calculated Work hours
 
-# def get_expected_monthly_hours(year, month):
-#     start_date = datetime.date(year, month, 1)
-#     last_day = calendar.monthrange(year, month)[1]
-#     end_date = datetime.date(year, month, last_day)
+class AdminBranchDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    # 🔐 Admin-only access
+        # if request.user.role != "ADMIN":
+        #     return Response(
+        #         {"error": "Forbidden"},
+        #         status=status.HTTP_403_FORBIDDEN
+        #     )
+
+    def put(self, request, branch_id):
+        branch = Branch.objects.filter(id=branch_id).first()
+        if not branch:
+            return Response({"error": "Branch not found"}, status=404)
 
-#     return get_expected_work_hours(start_date, end_date)
+        serializer = BranchSerializer(branch, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+
+        return Response(serializer.errors, status=400)
 
+    def delete(self, request, branch_id):
+        branch = Branch.objects.filter(id=branch_id).first()
+        if not branch:
+            return Response({"error": "Branch not found"}, status=404)
 
+        branch.delete()
+        return Response({"message": "Branch deleted successfully"})
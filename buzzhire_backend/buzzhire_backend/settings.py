@@ -31,6 +31,10 @@ ALLOWED_HOSTS = ["*","http://localhost:3000" ,"http://192.168.1.123:3000",]
 
 GOOGLE_CLIENT_ID = "848116300203-bsq9l9i5gu9tcqc13h2i0jlns8encv9i.apps.googleusercontent.com"
 
+# Source of Google's ID-token signing certs. Use
+# "buzz.utils.google_auth.StaticCertProvider" (+ GOOGLE_STATIC_CERTS) to verify offline
+GOOGLE_CERT_PROVIDER = "buzz.utils.google_auth.GoogleCertProvider"
+
 # Application definition
 
 INSTALLED_APPS = [